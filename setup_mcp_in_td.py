@@ -3,7 +3,7 @@ TouchDesigner MCP — Automated Project Setup
 =============================================
 Run this script inside TouchDesigner's Textport (Dialogs > Textport)
 or via a Script DAT to automatically create the entire MCP WebServer
-component with all 28 API handlers.
+component with all of its API handlers.
 
 Usage:
   1. Open TouchDesigner 2025
@@ -14,10 +14,15 @@ Usage:
 What it creates:
   /project1/mcp_server          (Base COMP — the container)
   /project1/mcp_server/webserver (Web Server DAT — port 9981)
-  /project1/mcp_server/callbacks (Text DAT — all 28 API handlers)
+  /project1/mcp_server/callbacks (Text DAT — the API handlers)
+  /project1/mcp_server/execute   (Execute DAT — Frame Start → background work)
   /project1/mcp_server/info      (Text DAT — status/version info)
 
 It will skip creation if /project1/mcp_server already exists.
+
+The embedded sources are copies of td_component/mcp_webserver_callbacks.py
+and td_component/mcp_execute_callbacks.py — keep them identical. Set
+EXPORT_TOX_PATH to also save the finished COMP as td_component/mcp_server.tox.
 """
 
 # ═══════════════════════════════════════════════════════════════
@@ -27,16 +32,27 @@ It will skip creation if /project1/mcp_server already exists.
 MCP_PORT = 9981
 COMP_NAME = 'mcp_server'
 PARENT_PATH = '/project1'
+EXPORT_TOX_PATH = None      # e.g. '/path/to/touchdesigner-mcp/td_component/mcp_server.tox'
 
 # ═══════════════════════════════════════════════════════════════
-# Callbacks source code (embedded)
+# Callbacks source code (embedded — copies of td_component/*.py)
 # ═══════════════════════════════════════════════════════════════
 
 CALLBACKS_CODE = r'''"""
 TouchDesigner MCP WebServer DAT Callbacks
 ==========================================
-Auto-generated by setup_mcp_in_td.py
-28 API handlers for full MCP server functionality.
+Paste this into the callbacks DAT attached to your WebServer DAT.
+This is the TD-side router that receives HTTP requests from the
+FastMCP server and executes operations using the TD Python API.
+
+Setup:
+  1. Create a Base COMP named 'mcp_server'
+  2. Inside it, create a WebServer DAT (port 9981, Active=On)
+  3. Attach this script as the callbacks DAT
+  4. Optionally add a Movie File Out TOP named 'mcp_screenshot' for captures
+  5. Add an Execute DAT (Frame Start=On) with mcp_execute_callbacks.py so
+     background jobs advance every frame
+
 Compatible with TouchDesigner 2025.30000+
 """
 
@@ -44,8 +60,19 @@ import json
 import traceback
 import sys
 import os
+import io
 import base64
+import fnmatch
+import hashlib
+import heapq
+import itertools
+import logging
+import re
+import threading
 import time
+from collections import deque, OrderedDict
+
+import numpy as np
 
 # ─────────────────────────────────────────────────────────────
 # Configuration
@@ -54,14 +81,61 @@ import time
 API_VERSION = "1.0.0"
 SCREENSHOT_TEMP_PATH = "/tmp/td_mcp_screenshot.png"
 
+STATS_RING_SIZE = 256       # Recent request records kept for /api/diagnostics
+SLOW_REQUEST_MS = 50.0      # Requests slower than this land in the slow log
+SLOW_LOG_SIZE = 64
+
+JOB_SLICE_MS = 4.0          # Per-frame time budget shared by all running jobs
+JOB_KEEP_FINISHED = 64      # Finished jobs kept around for collection
+JOB_POLL_PUMP_S = 1.0       # Advance jobs from polls if no frame tick for this long
+
+INDEX_SWEEP_PER_FRAME = 50  # Most COMPs the scene index reconciles per frame
+INDEX_SLICE_MS = 1.0        # Per-frame time budget of the scene index sweep
+INDEX_IDLE_S = 300.0        # Stop reconciling the scene index when unused for this long
+
+OP_RECORD_CACHE_MAX = 8192  # Serialized operator records kept for reuse
+
+SPATIAL_CELL = 400          # Grid cell size (network units) of the placement index
+SPATIAL_REFRESH_FRAMES = 60 # Rebuild a COMP's placement grid at most this often
+
+CURSOR_SNAPSHOTS = 32       # Sorted result snapshots kept for cursor paging
+
+LOG_RING_SIZE = 2000        # Captured stdout/stderr/logging lines kept for /api/logs
+LOG_LINE_MAX = 2000         # Longer lines are truncated
+
+ERROR_SCAN_PER_FRAME = 200  # Most operators the background error pass checks per frame
+ERROR_SLICE_MS = 1.0        # Per-frame time budget of error tracking
+ERROR_IDLE_S = 60.0         # Pause error tracking when no errors request came for this long
+ERROR_EVENTS_SIZE = 2000    # Error transitions kept for /api/errors/changes
+
+RESOURCE_VERSION_MS = 2.0   # Time budget of one resources/versions poll; the rest wait for the next
+
+CHOP_SUMMARY_CACHE = 256    # CHOP channel summaries kept until their CHOP cooks again
+CHOP_BLOCK_MAX = 16777216   # Most float32 values one binary chop/data response may carry
+CHOP_MAX_POINTS = 1000      # Default samples per channel in JSON chop/data before downsampling
+
+STATUS_REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    404: 'Not Found',
+    500: 'Internal Server Error',
+}
+
 # ─────────────────────────────────────────────────────────────
 # Main HTTP Router
 # ─────────────────────────────────────────────────────────────
+# The route table (ROUTES) and the middleware pipeline (_PIPELINE) are
+# built once, at the bottom of this module, after all handlers exist.
 
 def onHTTPRequest(webServerDAT, request, response):
+    """
+    Main entry point for all MCP server requests.
+    Routes to handler functions based on URI path.
+    """
     uri = request.get('uri', '/')
     method = request.get('method', 'GET')
 
+    # Parse JSON body
     body = {}
     raw_data = request.get('data', None)
     if raw_data:
@@ -73,137 +147,944 @@ def onHTTPRequest(webServerDAT, request, response):
         except (json.JSONDecodeError, UnicodeDecodeError):
             body = {}
 
+    # CORS headers for local development
     response['Access-Control-Allow-Origin'] = '*'
     response['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
     response['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
 
+    # Handle OPTIONS preflight
     if method == 'OPTIONS':
         response['statusCode'] = 204
         response['statusReason'] = 'No Content'
         response['data'] = ''
         return response
 
-    try:
-        routes = {
-            '/api/health':              handle_health,
-            '/api/info':                handle_info,
-            '/api/nodes':               handle_get_nodes,
-            '/api/node/detail':         handle_get_node_detail,
-            '/api/node/params':         handle_get_params,
-            '/api/node/params/set':     handle_set_params,
-            '/api/node/create':         handle_create_node,
-            '/api/node/delete':         handle_delete_node,
-            '/api/node/connect':        handle_connect_nodes,
-            '/api/node/disconnect':     handle_disconnect_nodes,
-            '/api/node/connections':    handle_get_connections,
-            '/api/node/errors':         handle_get_errors,
-            '/api/node/content':        handle_get_content,
-            '/api/node/content/set':    handle_set_content,
-            '/api/node/copy':           handle_copy_node,
-            '/api/node/rename':         handle_rename_node,
-            '/api/exec':                handle_exec_python,
-            '/api/screenshot':          handle_screenshot,
-            '/api/chop/data':           handle_chop_data,
-            '/api/sop/data':            handle_sop_data,
-            '/api/cooking':             handle_cooking_info,
-            '/api/search':              handle_search_nodes,
-            '/api/families':            handle_list_families,
-            '/api/python/help':         handle_python_help,
-            '/api/python/classes':      handle_python_classes,
-            '/api/timeline':            handle_timeline,
-            '/api/timeline/set':        handle_timeline_set,
-            '/api/pulse':               handle_pulse_param,
+    ctx = {
+        'uri': uri,
+        'body': body,
+        'raw': raw_data,
+        'request': request,
+        'response': response,
+        'handler': ROUTES.get(uri),
+        'status': 200,
+        'result': None,
+    }
+    _PIPELINE(ctx)
+    return response
+
+
+# ─────────────────────────────────────────────────────────────
+# Middleware
+# ─────────────────────────────────────────────────────────────
+# Each middleware is called as mw(ctx, call_next). The chain runs
+# outermost-first: stats → serialize → conditional → errors → handler dispatch.
+
+_route_stats = {}
+_recent_requests = deque(maxlen=STATS_RING_SIZE)
+_slow_requests = deque(maxlen=SLOW_LOG_SIZE)
+
+
+def _stats_middleware(ctx, call_next):
+    """Time the whole request and record it in the diagnostics buffers."""
+    start = time.perf_counter()
+    call_next(ctx)
+    total_ms = (time.perf_counter() - start) * 1000.0
+
+    route = ctx['uri'] if ctx['handler'] is not None else '<unknown>'
+    handler_ms = ctx.get('handler_ms', 0.0)
+    serialize_ms = ctx.get('serialize_ms', 0.0)
+    size = ctx.get('size', 0)
+
+    stats = _route_stats.get(route)
+    if stats is None:
+        stats = _route_stats[route] = {
+            'calls': 0, 'errors': 0,
+            'handler_ms': 0.0, 'max_handler_ms': 0.0,
+            'serialize_ms': 0.0, 'bytes': 0, 'max_bytes': 0,
+            'not_modified': 0,
         }
+    stats['calls'] += 1
+    if ctx['status'] == 304:
+        stats['not_modified'] += 1
+    if ctx['status'] >= 400 or (isinstance(ctx['result'], dict) and 'error' in ctx['result']):
+        stats['errors'] += 1
+    stats['handler_ms'] += handler_ms
+    stats['max_handler_ms'] = max(stats['max_handler_ms'], handler_ms)
+    stats['serialize_ms'] += serialize_ms
+    stats['bytes'] += size
+    stats['max_bytes'] = max(stats['max_bytes'], size)
 
-        handler = routes.get(uri)
-        if handler:
-            result = handler(body)
-        else:
-            result = {'error': f'Unknown endpoint: {uri}', 'available': list(routes.keys())}
-            response['statusCode'] = 404
-            response['statusReason'] = 'Not Found'
-            _send_json(response, result)
-            return response
+    record = {
+        'route': route,
+        'status': ctx['status'],
+        'handler_ms': round(handler_ms, 3),
+        'serialize_ms': round(serialize_ms, 3),
+        'total_ms': round(total_ms, 3),
+        'bytes': size,
+        'frame': absTime.frame,
+        'time': time.time(),
+    }
+    _recent_requests.append(record)
+
+    if total_ms >= SLOW_REQUEST_MS:
+        raw = ctx['raw'] or b''
+        if isinstance(raw, str):
+            raw = raw.encode('utf-8')
+        slow = dict(record)
+        slow['body_digest'] = hashlib.sha1(raw).hexdigest()[:16]
+        slow['body_bytes'] = len(raw)
+        _slow_requests.append(slow)
 
-        response['statusCode'] = 200
-        response['statusReason'] = 'OK'
-        _send_json(response, result)
 
+def _serialize_middleware(ctx, call_next):
+    """Encode ctx['result'] as the JSON response body (bytes results go out as-is)."""
+    call_next(ctx)
+    response = ctx['response']
+    status = ctx['status']
+    response['statusCode'] = status
+    response['statusReason'] = STATUS_REASONS.get(status, '')
+
+    if status == 304:
+        response['data'] = b''
+        ctx['size'] = 0
+        return
+
+    start = time.perf_counter()
+    if isinstance(ctx['result'], (bytes, bytearray)):
+        response['data'] = bytes(ctx['result'])
+        response['content-type'] = 'application/octet-stream'
+    else:
+        _send_json(response, ctx['result'])
+    ctx['serialize_ms'] = (time.perf_counter() - start) * 1000.0
+    ctx['size'] = len(response['data'])
+
+
+def _conditional_middleware(ctx, call_next):
+    """
+    ETag / If-None-Match for routes listed in ETAG_ROUTES. The route's tag
+    function returns a cheap version of the resource; when the client
+    already holds that version, answer 304 without running the handler.
+    """
+    tagger = ETAG_ROUTES.get(ctx['uri'])
+    if tagger is None:
+        call_next(ctx)
+        return
+
+    try:
+        version = tagger(ctx['body'])
+    except Exception:
+        version = None
+    if version is None:
+        call_next(ctx)
+        return
+
+    digest = hashlib.sha1(ctx['uri'].encode('utf-8'))
+    digest.update(json.dumps(ctx['body'], sort_keys=True, default=str).encode('utf-8'))
+    digest.update(repr(version).encode('utf-8'))
+    etag = f'"{digest.hexdigest()[:20]}"'
+
+    if etag in _if_none_match(ctx['request']):
+        ctx['status'] = 304
+        ctx['result'] = None
+        ctx['response']['ETag'] = etag
+        return
+
+    call_next(ctx)
+    result = ctx['result']
+    if ctx['status'] == 200 and not (isinstance(result, dict) and 'error' in result):
+        ctx['response']['ETag'] = etag
+
+
+def _if_none_match(request):
+    """ETags listed in the request's If-None-Match header (any capitalisation)."""
+    for key, value in request.items():
+        if isinstance(key, str) and key.lower() == 'if-none-match' and value:
+            return {t.strip()[2:] if t.strip().startswith('W/') else t.strip() for t in str(value).split(',')}
+    return set()
+
+
+def _error_middleware(ctx, call_next):
+    """Turn uncaught handler exceptions into a 500 JSON error."""
+    try:
+        call_next(ctx)
     except Exception as e:
-        error_result = {
+        ctx['status'] = 500
+        ctx['result'] = {
             'error': str(e),
             'type': type(e).__name__,
             'traceback': traceback.format_exc()
         }
-        response['statusCode'] = 500
-        response['statusReason'] = 'Internal Server Error'
-        _send_json(response, error_result)
 
-    return response
+
+def _dispatch(ctx):
+    """Innermost step: run the route handler."""
+    handler = ctx['handler']
+    if handler is None:
+        ctx['status'] = 404
+        ctx['result'] = {'error': f'Unknown endpoint: {ctx["uri"]}', 'available': list(ROUTES.keys())}
+        return
+
+    start = time.perf_counter()
+    try:
+        ctx['result'] = handler(ctx['body'])
+    finally:
+        ctx['handler_ms'] = (time.perf_counter() - start) * 1000.0
+
+
+def _build_pipeline(middleware, endpoint):
+    """Compose middleware around the endpoint into a single callable."""
+    def link(mw, call_next):
+        return lambda ctx: mw(ctx, call_next)
+
+    call = endpoint
+    for mw in reversed(middleware):
+        call = link(mw, call)
+    return call
 
 
 def _send_json(response, data):
+    """Helper to serialize and set JSON response."""
     response['data'] = json.dumps(data, default=str).encode('utf-8')
     response['content-type'] = 'application/json'
 
 
-def _serialize_op(node, include_params=False):
-    info = {
-        'name': node.name,
-        'path': node.path,
-        'type': node.type,
-        'family': node.family,
-        'label': getattr(node, 'label', ''),
-        'nodeX': node.nodeX,
-        'nodeY': node.nodeY,
-        'isCOMP': node.isCOMP,
-        'isTOP': node.isTOP,
-        'isCHOP': node.isCHOP,
-        'isSOP': node.isSOP,
-        'isDAT': node.isDAT,
-        'isMAT': node.isMAT,
-        'bypass': node.bypass,
-        'lock': node.lock,
-        'display': node.display if hasattr(node, 'display') else False,
-        'render': node.render if hasattr(node, 'render') else False,
-        'errors': node.errors(recurse=False) if hasattr(node, 'errors') else '',
-        'warnings': node.warnings(recurse=False) if hasattr(node, 'warnings') else '',
-    }
+# ─────────────────────────────────────────────────────────────
+# Operator Resolution (path or numeric id)
+# ─────────────────────────────────────────────────────────────
+# Every operator has a numeric `id` that stays the same across renames
+# and moves. Responses include it, and every endpoint accepts it as an
+# alternative to a path. Resolved operators are kept in a small cache so
+# repeated calls on the same nodes skip the op() lookup.
+
+OP_CACHE_MAX = 4096
+_op_cache = {}
+
+
+def _remember_op(node):
+    """Add an operator to the id cache, evicting everything when full."""
+    if len(_op_cache) >= OP_CACHE_MAX:
+        _op_cache.clear()
+    _op_cache[node.id] = node
+    return node
+
+
+def _op_by_id(op_id):
+    """Look up an operator by numeric id, using the cache when possible."""
+    try:
+        op_id = int(op_id)
+    except (TypeError, ValueError):
+        return None
+    node = _op_cache.get(op_id)
+    if node is not None:
+        if node.valid:
+            return node
+        del _op_cache[op_id]
+    node = op(op_id)
+    if node is None:
+        return None
+    return _remember_op(node)
+
+
+def _resolve_op(body, path_key='path', id_key='id', default=None):
+    """
+    Resolve an operator from a request body.
+    The id field takes precedence over the path field.
+    Returns (node, ref) — ref describes what was asked for (for error
+    messages) and is None when neither field was provided.
+    """
+    op_id = body.get(id_key)
+    if op_id is not None:
+        return _op_by_id(op_id), f'id {op_id}'
+
+    path = body.get(path_key) or default
+    if not path:
+        return None, None
+    node = op(path)
+    if node is not None:
+        _remember_op(node)
+    return node, path
+
+
+# ─── Field Projection ───────────────────────────────────────
+#
+# Serialization is table-driven so a request's 'fields' list decides
+# which attributes TD actually reads — errors()/warnings() and p.eval()
+# are the expensive ones. 'id' is always returned.
+
+OP_FIELDS = {
+    'id':       lambda n: n.id,
+    'name':     lambda n: n.name,
+    'path':     lambda n: n.path,
+    'type':     lambda n: n.type,
+    'family':   lambda n: n.family,
+    'label':    lambda n: getattr(n, 'label', ''),
+    'nodeX':    lambda n: n.nodeX,
+    'nodeY':    lambda n: n.nodeY,
+    'isCOMP':   lambda n: n.isCOMP,
+    'isTOP':    lambda n: n.isTOP,
+    'isCHOP':   lambda n: n.isCHOP,
+    'isSOP':    lambda n: n.isSOP,
+    'isDAT':    lambda n: n.isDAT,
+    'isMAT':    lambda n: n.isMAT,
+    'isPOP':    lambda n: getattr(n, 'isPOP', False),
+    'bypass':   lambda n: n.bypass,
+    'lock':     lambda n: n.lock,
+    'display':  lambda n: n.display if hasattr(n, 'display') else False,
+    'render':   lambda n: n.render if hasattr(n, 'render') else False,
+    'errors':   lambda n: n.errors(recurse=False) if hasattr(n, 'errors') else '',
+    'warnings': lambda n: n.warnings(recurse=False) if hasattr(n, 'warnings') else '',
+}
+
+NODE_FIELDS = tuple(OP_FIELDS) + ('parameters',)
+DETAIL_FIELDS = NODE_FIELDS + ('inputs', 'outputs', 'children_count', 'child_names')
+
+
+def _parse_fields(body, allowed):
+    """
+    Read the optional 'fields' selector (list or comma-separated string).
+    Returns (fields, error): fields is None when every field is wanted.
+    """
+    raw = body.get('fields')
+    if not raw:
+        return None, None
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    fields = tuple(f.strip() for f in raw if f and f.strip())
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        return None, {'error': f"Unknown field(s): {', '.join(unknown)}", 'available': list(allowed)}
+    return fields, None
+
+
+# ─── Operator Record Cache ──────────────────────────────────
+#
+# Serialized records (without parameters) are reused while the operator's
+# change signature — path, cook frame, placement and flags — is the same.
+# Errors and warnings only change when a node cooks, so the cook frame
+# covers them; parameters are always read fresh. Bounded LRU.
+
+_op_records = OrderedDict()
+_op_record_stats = {'hits': 0, 'misses': 0}
+
+
+def _op_signature(node):
+    """Cheap state that changes whenever a cached record would go stale."""
+    return (node.path, node.cookFrame, node.nodeX, node.nodeY, node.bypass, node.lock,
+            getattr(node, 'display', False), getattr(node, 'render', False),
+            getattr(node, 'label', ''))
+
+
+def _op_record(node, fields):
+    """Serialized attributes of node (cached when errors/warnings are involved)."""
+    cacheable = fields is None or 'errors' in fields or 'warnings' in fields
+    if cacheable:
+        key = (node.id, fields)
+        signature = _op_signature(node)
+        entry = _op_records.get(key)
+        if entry is not None and entry[0] == signature:
+            _op_records.move_to_end(key)
+            _op_record_stats['hits'] += 1
+            return dict(entry[1])
+        _op_record_stats['misses'] += 1
+
+    if fields is None:
+        info = {name: get(node) for name, get in OP_FIELDS.items()}
+    else:
+        info = {'id': node.id}
+        for name in fields:
+            get = OP_FIELDS.get(name)
+            if get is not None:
+                info[name] = get(node)
+
+    if cacheable:
+        _op_records[key] = (signature, dict(info))
+        _op_records.move_to_end(key)
+        while len(_op_records) > OP_RECORD_CACHE_MAX:
+            _op_records.popitem(last=False)
+    return info
+
+
+def _serialize_op(node, include_params=False, schema_ref=False, fields=None):
+    """Serialize a TD operator to a dict (only `fields`, plus id, when given)."""
+    info = _op_record(node, fields)
+    if fields is not None:
+        include_params = include_params or 'parameters' in fields
     if include_params:
-        info['parameters'] = _serialize_params(node)
+        info['parameters'] = _serialize_params(node, schema_ref=schema_ref)
+        if schema_ref:
+            info['schema_id'] = _param_schema_id(node)
+    return info
+
+
+# ─── Parameter Schemas ──────────────────────────────────────
+#
+# A parameter's label, page, style, default, range and menu entries are
+# the same for every operator of a given type in a given TD build — only
+# the value and expression differ per node. Clients that pass
+# schema: 'ref' get values only plus a 'schema_id', and fetch the static
+# part once per id from /api/node/params/schema.
+#
+# Some parameters differ from node to node, so they are never part of a
+# type schema and always come back with their full metadata: custom
+# parameters, menus filled from a menuSource (their entries depend on
+# what the source points at), and parameters of a sequence block (the
+# number of blocks and their contents are per node).
+
+_param_schemas = {}
+
+
+def _param_schema_id(node):
+    """Identifier of the built-in parameter schema of node's type in this TD build."""
+    return f'{node.type}@{app.version}.{app.build}'
+
+
+PARAM_STATIC_FIELDS = {
+    'default':     lambda p: p.default,
+    'label':       lambda p: p.label,
+    'page':        lambda p: p.page.name if p.page else '',
+    'style':       lambda p: p.style,
+    'min':         lambda p: p.min if hasattr(p, 'min') else None,
+    'max':         lambda p: p.max if hasattr(p, 'max') else None,
+    'readOnly':    lambda p: p.readOnly,
+    'isPulse':     lambda p: p.isPulse,
+    'isMomentary': lambda p: p.isMomentary,
+    'isToggle':    lambda p: p.isToggle,
+    'isMenu':      lambda p: p.isMenu,
+    'menuNames':   lambda p: list(p.menuNames) if p.isMenu else [],
+    'menuLabels':  lambda p: list(p.menuLabels) if p.isMenu else [],
+}
+
+PARAM_FIELDS = ('value', 'expr', 'mode') + tuple(PARAM_STATIC_FIELDS)
+
+
+def _param_instance_specific(p):
+    """True for parameters whose static metadata is not shared by the whole type."""
+    if getattr(p, 'isCustom', False):
+        return True
+    try:
+        return bool(getattr(p, 'menuSource', '')) or getattr(p, 'sequence', None) is not None
+    except Exception:
+        return True
+
+
+def _param_static(p, fields=None):
+    """Static metadata of one parameter (everything but its value)."""
+    return {
+        name: get(p) for name, get in PARAM_STATIC_FIELDS.items()
+        if fields is None or name in fields
+    }
+
+
+def _param_state(p, fields=None):
+    """Per-node state of one parameter: value, expression and mode."""
+    info = {}
+    if fields is None or 'value' in fields:
+        info['value'] = p.eval()
+    if fields is None or 'expr' in fields or 'mode' in fields:
+        # Include expression info — this tells the AI whether a param
+        # is static or driven by an expression/export
+        try:
+            expr, mode = (p.expr if p.expr else ''), str(p.mode)
+        except:
+            expr, mode = '', 'CONSTANT'
+        if fields is None or 'expr' in fields:
+            info['expr'] = expr
+        if fields is None or 'mode' in fields:
+            info['mode'] = mode
     return info
 
 
-def _serialize_params(node):
+def _param_schema(node):
+    """Built-in parameter schema of node's type, computed once per type."""
+    schema_id = _param_schema_id(node)
+    schema = _param_schemas.get(schema_id)
+    if schema is None:
+        schema = {}
+        for p in node.pars():
+            if _param_instance_specific(p):
+                continue
+            try:
+                schema[p.name] = _param_static(p)
+            except Exception:
+                continue
+        _param_schemas[schema_id] = schema
+    return schema_id, schema
+
+
+def _serialize_params(node, pars=None, schema_ref=False, fields=None):
+    """
+    Serialize parameters of a node (all of them unless pars is given),
+    restricted to `fields` when given. With schema_ref, parameters covered
+    by the type schema carry only their value/expr/mode.
+    """
     params = {}
-    for p in node.pars():
+    for p in node.pars() if pars is None else pars:
         try:
-            params[p.name] = {
-                'value': p.eval(),
-                'default': p.default,
-                'label': p.label,
-                'page': p.page.name if p.page else '',
-                'style': p.style,
-                'min': p.min if hasattr(p, 'min') else None,
-                'max': p.max if hasattr(p, 'max') else None,
-                'readOnly': p.readOnly,
-                'isPulse': p.isPulse,
-                'isMomentary': p.isMomentary,
-                'isToggle': p.isToggle,
-                'isMenu': p.isMenu,
-                'menuNames': list(p.menuNames) if p.isMenu else [],
-                'menuLabels': list(p.menuLabels) if p.isMenu else [],
-            }
+            info = _param_state(p, fields)
+            if not schema_ref or _param_instance_specific(p):
+                info.update(_param_static(p, fields))
+            params[p.name] = info
         except Exception:
             params[p.name] = {'value': str(p), 'error': 'Could not fully serialize'}
     return params
 
 
+def _walk(root, recurse=True, stats=None):
+    """
+    Iterate root and (optionally) all of its descendants, depth-first in
+    the same order as a recursive walk. Uses an explicit stack, so deep
+    component nests never hit Python's recursion limit.
+
+    A job may pause between two nodes for frames, so nodes deleted in the
+    meantime are dropped — and counted in stats['skipped'], when given.
+    """
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        if not n.valid:
+            _walk_skip(stats)
+            continue
+        yield n
+        if recurse and n.valid and n.isCOMP:
+            stack.extend(reversed(n.children))
+
+
+def _walk_skip(stats, count=1):
+    if stats is not None and count:
+        stats['skipped'] = stats.get('skipped', 0) + count
+
+
+def _run_task(task):
+    """Drive a task generator to completion and return its result."""
+    try:
+        while True:
+            next(task)
+    except StopIteration as stop:
+        return stop.value
+
+
+# ─────────────────────────────────────────────────────────────
+# Cursors (stable pagination)
+# ─────────────────────────────────────────────────────────────
+# Listings page with an opaque next_cursor instead of re-walking and
+# slicing. A cursor records where the last page stopped — the last
+# operator id of a listing, the pending frames of a walk, or the last
+# path of an index search — so the next page resumes from there.
+#
+# Walks visit children in operator-id (creation) order: nodes created
+# between pages come after everything already seen, and deleted ones just
+# drop out, so nothing repeats or gets skipped. Sorted results that would
+# change under the client's feet (cook times) are snapshotted instead and
+# kept for the next CURSOR_SNAPSHOTS pages.
+
+_cursor_snapshots = OrderedDict()
+_cursor_seq = itertools.count(1)
+
+CURSOR_PAGING_KEYS = ('cursor', 'limit', 'offset', 'fields')
+
+
+def _cursor_query_hash(body):
+    """Short digest of a request minus its paging keys."""
+    query = {k: v for k, v in body.items() if k not in CURSOR_PAGING_KEYS}
+    return hashlib.sha1(json.dumps(query, sort_keys=True, default=str).encode()).hexdigest()[:8]
+
+
+def _cursor_encode(kind, body, state):
+    raw = json.dumps(dict(state, k=kind, q=_cursor_query_hash(body)), separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _cursor_decode(kind, body):
+    """
+    State stored in body['cursor'] — (None, None) for a first page,
+    (None, error) for a cursor that is malformed or from another query.
+    """
+    token = body.get('cursor')
+    if not token:
+        return None, None
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except Exception:
+        return None, {'error': 'Invalid cursor'}
+    if not isinstance(state, dict) or state.get('k') != kind:
+        return None, {'error': f'Cursor does not belong to this request ({kind})'}
+    if state.get('q') != _cursor_query_hash(body):
+        return None, {'error': 'Cursor was issued for different request parameters; start again without a cursor'}
+    return state, None
+
+
+def _cursor_snapshot(rows):
+    """Keep rows for later pages; returns the snapshot id."""
+    snap_id = next(_cursor_seq)
+    _cursor_snapshots[snap_id] = rows
+    while len(_cursor_snapshots) > CURSOR_SNAPSHOTS:
+        _cursor_snapshots.popitem(last=False)
+    return snap_id
+
+
+def _children_by_id(comp):
+    return sorted(comp.children, key=lambda c: c.id)
+
+
+def _walk_frames(root, position=None):
+    """
+    Frames for _walk_ids: a fresh walk below root, or the walk resumed at a
+    cursor position ([[comp_id, last_child_id], ...]). Frames of COMPs that
+    have since been deleted are dropped — their subtree is gone anyway.
+    """
+    if position is None:
+        return [[root, _children_by_id(root), 0]] if root.isCOMP else []
+    frames = []
+    for comp_id, last_id in position:
+        comp = root if comp_id == root.id else _op_by_id(comp_id)
+        if comp is None or not comp.isCOMP:
+            continue
+        children = _children_by_id(comp)
+        index = 0
+        while index < len(children) and children[index].id <= last_id:
+            index += 1
+        frames.append([comp, children, index])
+    return frames
+
+
+def _walk_ids(frames, recurse=True, stats=None):
+    """
+    Preorder walk driven by (and advancing) frames from _walk_frames.
+    _walk_position(frames) after any yield resumes right after that node.
+    Deleted nodes are dropped as in _walk.
+    """
+    while frames:
+        frame = frames[-1]
+        comp, children, index = frame
+        if index >= len(children):
+            frames.pop()
+            continue
+        n = children[index]
+        frame[2] = index + 1
+        if not n.valid:
+            _walk_skip(stats)
+            continue
+        if recurse and n.isCOMP:
+            frames.append([n, _children_by_id(n), 0])
+        yield n
+
+
+def _walk_position(frames):
+    return [[comp.id, children[index - 1].id if index else -1] for comp, children, index in frames]
+
+
+# ─────────────────────────────────────────────────────────────
+# Scene Index
+# ─────────────────────────────────────────────────────────────
+# A maintained index of every operator, keyed by name tokens, name
+# trigrams, type, family and parent. Search, families and filtered
+# listings answer from it instead of walking the project.
+#
+# It is kept current two ways: the mutation handlers update it directly,
+# and a background sweep (a frame hook) reconciles COMPs against TD within
+# INDEX_SLICE_MS per frame, picking up edits made outside the API.
+# Hits are re-validated against the live operator before being returned.
+#
+# The sweep only runs while the index is used: it starts with the first
+# query and stops when none came for INDEX_IDLE_S. The index is then not
+# trusted again until a fresh pass has reconciled it.
+
+_index_entries = {}     # id -> {'name', 'path', 'type', 'family', 'parent'}
+_index_tokens = {}      # name token -> ids
+_index_trigrams = {}    # trigram of a lowercase name -> lowercase names
+_index_names = {}       # lowercase name -> ids
+_index_types = {}       # type -> ids
+_index_families = {}    # family -> ids
+_index_children = {}    # parent id -> child ids
+_index_state = {'ready': False, 'sweep': None, 'passes': 0, 'ready_frame': None, 'used': None}
+
+_TOKEN_RE = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+')
+
+
+def _name_tokens(name):
+    """Lowercase name plus its camelCase / snake_case / digit parts."""
+    tokens = {name.lower()}
+    tokens.update(t.lower() for t in _TOKEN_RE.findall(name))
+    return tokens
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _multi_add(table, key, value):
+    bucket = table.get(key)
+    if bucket is None:
+        bucket = table[key] = set()
+    bucket.add(value)
+
+
+def _multi_discard(table, key, value):
+    bucket = table.get(key)
+    if bucket is not None:
+        bucket.discard(value)
+        if not bucket:
+            del table[key]
+
+
+def _index_add(node):
+    """Index a single operator (not its children)."""
+    if node.id in _index_entries:
+        _index_update(node)
+        return
+    parent_node = node.parent()
+    entry = {
+        'name': node.name,
+        'path': node.path,
+        'type': node.type,
+        'family': node.family,
+        'parent': parent_node.id if parent_node is not None else None,
+    }
+    _index_entries[node.id] = entry
+    _index_link(node.id, entry)
+
+
+def _index_link(op_id, entry):
+    lower = entry['name'].lower()
+    for token in _name_tokens(entry['name']):
+        _multi_add(_index_tokens, token, op_id)
+    if lower not in _index_names:
+        for gram in _trigrams(lower):
+            _multi_add(_index_trigrams, gram, lower)
+    _multi_add(_index_names, lower, op_id)
+    _multi_add(_index_types, entry['type'], op_id)
+    _multi_add(_index_families, entry['family'], op_id)
+    if entry['parent'] is not None:
+        _multi_add(_index_children, entry['parent'], op_id)
+
+
+def _index_unlink(op_id, entry):
+    lower = entry['name'].lower()
+    for token in _name_tokens(entry['name']):
+        _multi_discard(_index_tokens, token, op_id)
+    _multi_discard(_index_names, lower, op_id)
+    if lower not in _index_names:
+        for gram in _trigrams(lower):
+            _multi_discard(_index_trigrams, gram, lower)
+    _multi_discard(_index_types, entry['type'], op_id)
+    _multi_discard(_index_families, entry['family'], op_id)
+    if entry['parent'] is not None:
+        _multi_discard(_index_children, entry['parent'], op_id)
+
+
+def _index_add_subtree(node):
+    """Index an operator and everything below it."""
+    for n in _walk(node):
+        _index_add(n)
+
+
+def _index_remove(op_id):
+    """Drop an operator and all of its indexed descendants."""
+    stack = [op_id]
+    while stack:
+        current = stack.pop()
+        entry = _index_entries.pop(current, None)
+        if entry is not None:
+            _index_unlink(current, entry)
+        stack.extend(_index_children.pop(current, ()))
+
+
+def _index_update(node):
+    """Refresh an operator after a rename or move, including descendant paths."""
+    entry = _index_entries.get(node.id)
+    if entry is None:
+        _index_add(node)
+        return
+    _index_unlink(node.id, entry)
+    parent_node = node.parent()
+    entry['name'] = node.name
+    entry['path'] = node.path
+    entry['parent'] = parent_node.id if parent_node is not None else None
+    _index_link(node.id, entry)
+
+    stack = [node.id]
+    while stack:
+        current = stack.pop()
+        base = _index_entries[current]['path'].rstrip('/')
+        for child_id in _index_children.get(current, ()):
+            child = _index_entries.get(child_id)
+            if child is not None:
+                child['path'] = f"{base}/{child['name']}"
+                stack.append(child_id)
+
+
+def _index_sync_children(comp):
+    """Reconcile the indexed children of one COMP with TD."""
+    actual = {c.id: c for c in comp.children}
+    known = _index_children.get(comp.id, set())
+    for child_id in known - actual.keys():
+        _index_remove(child_id)
+    for child_id, child in actual.items():
+        entry = _index_entries.get(child_id)
+        if entry is None:
+            _index_add(child)
+        elif entry['name'] != child.name or entry['parent'] != comp.id:
+            _index_update(child)
+
+
+def _index_sweep():
+    """One full reconciliation pass over the project — yields once per COMP."""
+    root = op('/')
+    _index_add(root)
+    stack = [root]
+    while stack:
+        comp = stack.pop()
+        if not comp.valid:
+            continue
+        _index_sync_children(comp)
+        stack.extend(c for c in comp.children if c.isCOMP)
+        yield
+    _index_state['passes'] += 1
+    if not _index_state['ready']:
+        _index_state['ready'] = True
+        _index_state['ready_frame'] = absTime.frame
+
+
+def _index_active():
+    used = _index_state['used']
+    return used is not None and time.time() - used < INDEX_IDLE_S
+
+
+def _index_tick(frame):
+    """Frame hook: while the index is in use, advance the background sweep
+    within INDEX_SLICE_MS, starting a new pass when one is done."""
+    if not _index_active():
+        return
+    deadline = time.perf_counter() + INDEX_SLICE_MS / 1000.0
+    for _ in range(INDEX_SWEEP_PER_FRAME):
+        if time.perf_counter() >= deadline:
+            break
+        if _index_state['sweep'] is None:
+            _index_state['sweep'] = _index_sweep()
+        try:
+            next(_index_state['sweep'])
+        except StopIteration:
+            _index_state['sweep'] = None
+            break
+
+
+def _index_ready():
+    """
+    True when queries can be answered from the index. Marks the index as
+    used, which keeps the background sweep running. If no Execute DAT is
+    ticking the sweep, the index is built synchronously on first use.
+    """
+    if not _index_active():
+        # Unused for a while: edits made outside the API were not reconciled
+        _index_state['ready'] = False
+        _index_state['sweep'] = None
+    _index_state['used'] = time.time()
+    if not _index_state['ready'] and time.time() - _last_frame_tick > JOB_POLL_PUMP_S:
+        _run_task(_index_sweep())
+        _index_state['sweep'] = None
+    return _index_state['ready']
+
+
+def _index_name_matches(query_lower):
+    """Ids whose name contains query_lower (exact-token hits are O(1))."""
+    ids = set(_index_tokens.get(query_lower, ()))
+    if len(query_lower) >= 3:
+        grams = sorted(_trigrams(query_lower), key=lambda g: len(_index_trigrams.get(g, ())))
+        candidates = set(_index_trigrams.get(grams[0], ()))
+        for gram in grams[1:]:
+            candidates &= _index_trigrams.get(gram, set())
+    else:
+        candidates = _index_names.keys()
+    for name in candidates:
+        if query_lower in name:
+            ids |= _index_names[name]
+    return ids
+
+
+def _index_subtree_ids(root_id):
+    """Ids of root_id and all of its indexed descendants."""
+    ids = []
+    stack = [root_id]
+    while stack:
+        current = stack.pop()
+        ids.append(current)
+        stack.extend(_index_children.get(current, ()))
+    return ids
+
+
+def _index_live(op_id):
+    """Resolve an indexed id to a live operator, repairing stale entries."""
+    node = _op_by_id(op_id)
+    if node is None:
+        _index_remove(op_id)
+        return None
+    entry = _index_entries.get(op_id)
+    if entry is not None and entry['name'] != node.name:
+        _index_update(node)
+    return node
+
+
+def _index_search(query_lower, search_type, root, after=None):
+    """Yield live operators under root matching the query, in path order
+    (only paths sorting after `after`, when given)."""
+    ids = set()
+    if search_type in ('name', 'all'):
+        ids |= _index_name_matches(query_lower)
+    if search_type in ('type', 'all'):
+        for op_type, bucket in _index_types.items():
+            if query_lower in op_type.lower():
+                ids |= bucket
+    if search_type in ('family', 'all'):
+        for family, bucket in _index_families.items():
+            if query_lower in family.lower():
+                ids |= bucket
+
+    prefix = root.path.rstrip('/') + '/'
+    hits = []
+    for op_id in ids:
+        entry = _index_entries.get(op_id)
+        if entry is not None and (op_id == root.id or entry['path'].startswith(prefix)):
+            if after is None or entry['path'] > after:
+                hits.append((entry['path'], op_id))
+    hits.sort()
+
+    for _, op_id in hits:
+        node = _index_live(op_id)
+        if node is not None and _search_match(node, query_lower, search_type):
+            yield node
+
+
+def _index_filtered_children(comp, family=None, op_type=None):
+    """Children of comp matching family/type, answered from the index."""
+    ids = _index_children.get(comp.id, set())
+    if len(ids) != len(comp.children):
+        _index_sync_children(comp)
+        ids = _index_children.get(comp.id, set())
+    if family:
+        ids = ids & _index_families.get(family, set())
+    if op_type:
+        ids = ids & _index_types.get(op_type, set())
+    nodes = [_index_live(i) for i in sorted(ids)]
+    return [n for n in nodes if n is not None]
+
+
+def _index_status():
+    return {
+        'ready': _index_state['ready'],
+        'ready_frame': _index_state['ready_frame'],
+        'passes': _index_state['passes'],
+        'operators': len(_index_entries),
+        'name_tokens': len(_index_tokens),
+        'types': len(_index_types),
+    }
+
+
 # ─────────────────────────────────────────────────────────────
 # Handlers
 # ─────────────────────────────────────────────────────────────
 
 def handle_health(body):
+    """Health check endpoint."""
     return {
         'status': 'ok',
         'api_version': API_VERSION,
@@ -212,13 +1093,13 @@ def handle_health(body):
 
 
 def handle_info(body):
+    """Get TouchDesigner environment info."""
     return {
         'version': app.version,
         'build': app.build,
         'osName': app.osName,
         'osVersion': app.osVersion,
         'product': app.product,
-        'launchDir': app.launchDir,
         'project_name': project.name,
         'project_folder': project.folder,
         'fps': project.cookRate,
@@ -232,516 +1113,2756 @@ def handle_info(body):
 
 
 def handle_get_nodes(body):
-    path = body.get('path', '/')
+    """
+    List children of a path, with optional filtering, in operator-id
+    (creation) order. Page with offset or, stable across edits, with the
+    returned next_cursor. With depth > 1, returns the subtree down to that
+    many levels (see _get_tree).
+    """
     family_filter = body.get('family', None)
     type_filter = body.get('type', None)
+    depth = max(1, int(body.get('depth', 1)))
     include_params = body.get('include_params', False)
     limit = body.get('limit', 100)
     offset = body.get('offset', 0)
 
-    target = op(path)
+    target, ref = _resolve_op(body, default='/')
     if target is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+
     if not target.isCOMP:
-        return {'error': f'Node is not a COMP (cannot have children): {path}', 'node_type': target.type}
+        return {'error': f'Node is not a COMP (cannot have children): {ref}', 'node_type': target.type}
+
+    fields, error = _parse_fields(body, NODE_FIELDS)
+    if error:
+        return error
 
-    children = target.children
     if family_filter:
         family_filter = family_filter.upper()
-        children = [c for c in children if c.family == family_filter]
-    if type_filter:
-        children = [c for c in children if c.type == type_filter]
+
+    if depth > 1:
+        return _get_tree(target, depth, body, family_filter, type_filter, fields)
+
+    cursor, error = _cursor_decode('nodes', body)
+    if error:
+        return error
+
+    if (family_filter or type_filter) and _index_ready():
+        children = _index_filtered_children(target, family_filter, type_filter)
+    else:
+        children = _children_by_id(target)
+
+        # Apply filters
+        if family_filter:
+            children = [c for c in children if c.family == family_filter]
+        if type_filter:
+            children = [c for c in children if c.type == type_filter]
 
     total = len(children)
+    if cursor is not None:
+        offset = 0
+        while offset < total and children[offset].id <= cursor['a']:
+            offset += 1
     children = children[offset:offset + limit]
-    nodes = [_serialize_op(c, include_params=include_params) for c in children]
+
+    nodes = [_serialize_op(c, include_params=include_params, fields=fields) for c in children]
+
+    result = {
+        'path': target.path,
+        'id': target.id,
+        'total': total,
+        'count': len(nodes),
+        'offset': offset,
+        'has_more': total > offset + len(nodes),
+        'nodes': nodes,
+    }
+    if result['has_more']:
+        result['next_cursor'] = _cursor_encode('nodes', body, {'a': children[-1].id})
+    return result
+
+
+def _get_tree(target, depth, body, family_filter=None, type_filter=None, fields=None):
+    """
+    Breadth-first subtree listing, down to `depth` levels below target.
+
+    Iterative (a queue, no recursion), with pagination per level: the
+    target's own children are windowed by offset/limit, every deeper COMP
+    by its first child_limit children. COMPs are always kept so the
+    hierarchy stays intact; family/type filters apply to the other nodes.
+    max_nodes bounds the whole response.
+
+    tree_format 'nested' puts each COMP's listing in its 'children' field;
+    'flat' returns one list with 'depth' and 'parent_id' on every node.
+    """
+    tree_format = body.get('tree_format', 'nested')
+    include_params = body.get('include_params', False)
+    limit = body.get('limit', 100)
+    offset = body.get('offset', 0)
+    child_limit = body.get('child_limit', 50)
+    max_nodes = body.get('max_nodes', 1000)
+    nested = tree_format != 'flat'
+
+    def keep(c):
+        if c.isCOMP:
+            return True
+        if family_filter and c.family != family_filter:
+            return False
+        if type_filter and c.type != type_filter:
+            return False
+        return True
+
+    nodes = []
+    top_total = 0
+    count = 0
+    truncated = False
+    queue = deque([(target, 1, None)])
+
+    while queue:
+        comp, level, parent_info = queue.popleft()
+        children = [c for c in comp.children if keep(c)]
+        if parent_info is None:
+            top_total = len(children)
+            window = children[offset:offset + limit]
+            siblings = nodes
+        else:
+            window = children[:child_limit]
+            parent_info['children_total'] = len(children)
+            parent_info['children_has_more'] = len(children) > child_limit
+            siblings = parent_info.setdefault('children', []) if nested else None
+
+        for c in window:
+            if count >= max_nodes:
+                truncated = True
+                break
+            info = _serialize_op(c, include_params=include_params, fields=fields)
+            count += 1
+            if not nested:
+                info['depth'] = level
+                info['parent_id'] = comp.id
+                nodes.append(info)
+            else:
+                siblings.append(info)
+
+            if c.isCOMP:
+                if level < depth:
+                    queue.append((c, level + 1, info))
+                else:
+                    info['children_count'] = len(c.children)
+        if truncated:
+            break
 
     return {
-        'path': path, 'total': total, 'count': len(nodes),
-        'offset': offset, 'has_more': total > offset + len(nodes), 'nodes': nodes,
+        'path': target.path,
+        'id': target.id,
+        'depth': depth,
+        'tree_format': 'nested' if nested else 'flat',
+        'total': top_total,
+        'count': count,
+        'offset': offset,
+        'has_more': top_total > offset + limit,
+        'truncated': truncated,
+        'nodes': nodes,
     }
 
 
 def handle_get_node_detail(body):
-    path = body.get('path')
-    if not path:
-        return {'error': 'Missing required field: path'}
-    node = op(path)
+    """Get detailed info about a single node."""
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
 
-    detail = _serialize_op(node, include_params=True)
-    detail['inputs'] = []
-    for conn in node.inputConnectors:
-        for c in conn.connections:
-            detail['inputs'].append({'from': c.owner.path, 'from_index': c.index, 'to_index': conn.index})
-    detail['outputs'] = []
-    for conn in node.outputConnectors:
-        for c in conn.connections:
-            detail['outputs'].append({'to': c.owner.path, 'to_index': c.index, 'from_index': conn.index})
-    if node.isCOMP:
-        detail['children_count'] = len(node.children)
-        detail['child_names'] = [c.name for c in node.children[:50]]
-    return detail
+    fields, error = _parse_fields(body, DETAIL_FIELDS)
+    if error:
+        return error
 
+    def wanted(name):
+        return fields is None or name in fields
 
-def handle_get_params(body):
-    path = body.get('path')
-    if not path:
-        return {'error': 'Missing required field: path'}
-    node = op(path)
+    detail = _serialize_op(node, include_params=fields is None,
+                           schema_ref=body.get('schema') == 'ref', fields=fields)
+
+    # Add connection info
+    if wanted('inputs'):
+        detail['inputs'] = []
+        for conn in node.inputConnectors:
+            for c in conn.connections:
+                detail['inputs'].append({
+                    'from': c.owner.path,
+                    'from_id': c.owner.id,
+                    'from_index': c.index,
+                    'to_index': conn.index,
+                })
+
+    if wanted('outputs'):
+        detail['outputs'] = []
+        for conn in node.outputConnectors:
+            for c in conn.connections:
+                detail['outputs'].append({
+                    'to': c.owner.path,
+                    'to_id': c.owner.id,
+                    'to_index': c.index,
+                    'from_index': conn.index,
+                })
+
+    # Children count if COMP
+    if node.isCOMP:
+        if wanted('children_count'):
+            detail['children_count'] = len(node.children)
+        if wanted('child_names'):
+            detail['child_names'] = [c.name for c in node.children[:50]]
+
+    return detail
+
+
+def handle_get_params(body):
+    """Get parameters for a specific node."""
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+    path = node.path
 
     page_filter = body.get('page', None)
     name_filter = body.get('names', None)
-    params = {}
+
+    schema_ref = body.get('schema') == 'ref'
+    fields, error = _parse_fields(body, PARAM_FIELDS)
+    if error:
+        return error
+
+    pars = [
+        p for p in node.pars()
+        if not (page_filter and p.page and p.page.name != page_filter)
+        and not (name_filter and p.name not in name_filter)
+    ]
+    params = _serialize_params(node, pars, schema_ref=schema_ref, fields=fields)
+
+    result = {'path': path, 'id': node.id, 'type': node.type, 'parameters': params}
+    if schema_ref:
+        result['schema_id'] = _param_schema_id(node)
+    return result
+
+
+def handle_get_param_schema(body):
+    """
+    Static parameter metadata (label, page, style, default, range, menus)
+    for the built-in parameters of a node's type. Identical for every node
+    of that type in this TD build, so clients cache it by schema_id.
+    """
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id'}
+    if node is None:
+        return {'error': f'Node not found: {ref}'}
+
+    schema_id, schema = _param_schema(node)
+    return {
+        'schema_id': schema_id,
+        'type': node.type,
+        'build': f'{app.version}.{app.build}',
+        'parameters': schema,
+    }
+
+
+# ─── Resource Versions (ETags) ──────────────────────────────
+#
+# Tag functions for _conditional_middleware: each returns a cheap value
+# that changes whenever the route's response would, or None to opt out
+# of conditional handling for that request.
+#
+# /api/node/params has no such tag: TD offers no cheap signal that moves
+# when a constant parameter changes (cookFrame does not, on a node nothing
+# pulls), so a tag would have to evaluate every parameter — the same work
+# as the response itself. A 304 would save bandwidth, not TD frame time.
+
+def _version_nodes(body):
+    """Child listing: identity, placement, flags and cook frame of each child."""
+    if int(body.get('depth', 1)) > 1 or body.get('include_params'):
+        return None
+    target, _ = _resolve_op(body, default='/')
+    if target is None or not target.isCOMP:
+        return None
+    return (target.id, target.path, [
+        (c.id, c.name, c.type, c.nodeX, c.nodeY, c.bypass, c.lock,
+         getattr(c, 'display', False), getattr(c, 'render', False),
+         getattr(c, 'label', ''), c.cookFrame)
+        for c in target.children
+    ])
+
+
+def _version_params(body):
+    """
+    Parameters: mode, expression and current value of every parameter.
+    Evaluates them all, so it is not an ETag — only part of the version of
+    subscribed td:// node resources (see _version_node).
+    """
+    node, _ = _resolve_op(body)
+    if node is None:
+        return None
+    state = []
     for p in node.pars():
-        if page_filter and p.page and p.page.name != page_filter:
-            continue
-        if name_filter and p.name not in name_filter:
-            continue
         try:
-            params[p.name] = {
-                'value': p.eval(), 'default': p.default, 'label': p.label,
-                'page': p.page.name if p.page else '', 'style': p.style,
-                'readOnly': p.readOnly, 'isPulse': p.isPulse, 'isMenu': p.isMenu,
-                'menuNames': list(p.menuNames) if p.isMenu else [],
-            }
+            state.append((p.name, str(p.mode), p.expr, p.eval()))
         except Exception:
-            params[p.name] = {'value': str(p), 'error': 'Could not serialize'}
-    return {'path': path, 'type': node.type, 'parameters': params}
+            state.append((p.name, str(p)))
+    return (node.id, node.path, state)
+
+
+def _version_content(body):
+    """DAT content: digest of the DAT's text (tables included)."""
+    node, _ = _resolve_op(body)
+    if node is None or not node.isDAT:
+        return None
+    return (node.id, node.path, _text_hash(node.text))
+
+
+# ─── Resource Subscriptions ─────────────────────────────────
+#
+# The MCP server exposes operators as td:// resources and lets clients
+# subscribe to them. For its subscriptions it polls /api/resources/versions
+# with the version it last saw of each; only the ones that differ come
+# back, so a scene where nothing changes costs one small request per poll.
+#
+# A node version evaluates every parameter and reads the errors, and a
+# content version hashes the whole text — there is no cheaper signal that
+# catches every edit. So each poll checks resources round-robin for at
+# most RESOURCE_VERSION_MS of TD's frame; the rest are checked on the
+# following polls, and many subscriptions only mean slower notifications.
+
+_resource_sweep = {'next': 0}
+
+def _version_node(body):
+    """Node view: operator record, parameters, wiring and child names."""
+    node, _ = _resolve_op(body)
+    if node is None:
+        return None
+    record = tuple(get(node) for get in OP_FIELDS.values())
+    inputs = tuple((conn.index, c.owner.id, c.index)
+                   for conn in node.inputConnectors for c in conn.connections)
+    outputs = tuple((conn.index, c.owner.id, c.index)
+                    for conn in node.outputConnectors for c in conn.connections)
+    children = tuple(c.name for c in node.children) if node.isCOMP else ()
+    return (record, _version_params(body), inputs, outputs, children)
+
+
+def _version_chop(body):
+    """CHOP view: the channel summary (recomputed only after the CHOP cooks)."""
+    node, _ = _resolve_op(body)
+    if node is None or not node.isCHOP:
+        return None
+    return (node.id, node.path, repr(_chop_summary(node)))
+
+
+RESOURCE_VIEWS = {
+    'node':    _version_node,
+    'content': _version_content,
+    'chop':    _version_chop,
+}
+
+
+def handle_resource_versions(body):
+    """
+    Versions of td:// resources that differ from what the client last saw.
+
+    body: resources — [{key, path | id, view, version}], view one of
+    RESOURCE_VIEWS (default 'node'), version the last one seen (null if none).
+    Returns {'frame', 'changed': {key: version}, 'checked', 'total'}; a
+    version of null means the resource no longer resolves (node deleted, or
+    not of that family). Only 'checked' resources, at least one, are looked
+    at within RESOURCE_VERSION_MS; the next poll carries on after them.
+    """
+    resources = body.get('resources') or []
+    for res in resources:
+        if res.get('view', 'node') not in RESOURCE_VIEWS:
+            return {'error': f"Unknown resource view: {res.get('view')}", 'available': list(RESOURCE_VIEWS)}
+
+    deadline = time.perf_counter() + RESOURCE_VERSION_MS / 1000.0
+    start = _resource_sweep['next'] % len(resources) if resources else 0
+    changed = {}
+    checked = 0
+    while checked < len(resources) and (not checked or time.perf_counter() < deadline):
+        res = resources[(start + checked) % len(resources)]
+        checked += 1
+        try:
+            value = RESOURCE_VIEWS[res.get('view', 'node')](res)
+        except Exception:
+            value = None
+        version = None if value is None else hashlib.sha1(repr(value).encode('utf-8')).hexdigest()[:20]
+        if version != res.get('version'):
+            changed[res.get('key') or res.get('path') or str(res.get('id'))] = version
+    _resource_sweep['next'] = start + checked
+    return {'frame': absTime.frame, 'changed': changed, 'checked': checked, 'total': len(resources)}
 
 
 def handle_set_params(body):
-    path = body.get('path')
+    """Set one or more parameters on a node.
+
+    Each param value can be:
+      - A plain value (int, float, str, bool) → sets p.val (static constant)
+      - A dict with 'expr' key → sets p.expr (Python expression that updates every frame)
+        Example: {"seed": {"expr": "absTime.seconds * 10"}}
+        Example: {"tx": {"expr": "op('noise1')['chan1']"}}
+      - A dict with 'val' key → explicitly sets p.val (same as plain value)
+
+    Expressions make networks REACTIVE — the parameter updates every frame.
+    Without expressions, values are static snapshots.
+
+    With 'targets' or 'selector' many nodes are set at once — see _set_params_many.
+    """
+    if 'targets' in body or 'selector' in body:
+        return _set_params_many(body)
+
     params = body.get('params', {})
-    if not path:
-        return {'error': 'Missing required field: path'}
+
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id (or targets / selector)'}
     if not params:
         return {'error': 'Missing required field: params'}
-    node = op(path)
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
 
-    results = {}
-    for name, value in params.items():
-        try:
-            p = getattr(node.par, name, None)
-            if p is None:
-                results[name] = {'success': False, 'error': f'Parameter not found: {name}'}
-                continue
-            if p.readOnly:
-                results[name] = {'success': False, 'error': f'Parameter is read-only: {name}'}
-                continue
+    results = {name: _set_param(node, name, value) for name, value in params.items()}
+    _errors_touch(node)
+    return {'path': node.path, 'id': node.id, 'results': results}
+
+
+def _set_param(node, name, value):
+    """Set one parameter (see handle_set_params for the value forms)."""
+    try:
+        p = getattr(node.par, name, None)
+        if p is None:
+            return {'success': False, 'error': f'Parameter not found: {name}'}
+        if p.readOnly:
+            return {'success': False, 'error': f'Parameter is read-only: {name}'}
+
+        # Expression mode: {"param": {"expr": "absTime.seconds * 10"}}
+        if isinstance(value, dict) and 'expr' in value:
+            p.expr = value['expr']
+            return {
+                'success': True,
+                'mode': 'expression',
+                'expr': value['expr'],
+                'current_value': p.eval(),
+            }
+        # Explicit val mode: {"param": {"val": 42}}
+        if isinstance(value, dict) and 'val' in value:
+            p.val = value['val']
+        # Plain value (backwards compatible)
+        else:
             p.val = value
-            results[name] = {'success': True, 'new_value': p.eval()}
-        except Exception as e:
-            results[name] = {'success': False, 'error': str(e)}
-    return {'path': path, 'results': results}
+        return {'success': True, 'mode': 'constant', 'new_value': p.eval()}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def _set_params_many(body):
+    """
+    Set parameters on many nodes in one callback and one undo block.
+
+    body:
+      targets     [{path | id, params}] — per-node params, merged over 'params'
+      selector    see _select_ops; every match gets 'params'
+      params      shared params. A value {'each': [v0, v1, ...]} gives the
+                  i-th node the i-th value (one per node, in match order)
+      verbose     also return every per-parameter result (default False)
+
+    Only failures are listed by default: {id, path, param, error}.
+    """
+    shared = body.get('params') or {}
+    jobs = []
+    failures = []
+    if 'selector' in body:
+        nodes, response = _bulk_select(body['selector'])
+        if response is not None:
+            return response
+        jobs = [(n, {}) for n in nodes]
+    for target in body.get('targets') or []:
+        node, ref = _resolve_op(target)
+        if node is None:
+            failures.append({'path': target.get('path'), 'id': target.get('id'), 'param': None,
+                             'error': f'Node not found: {ref}' if ref else 'Target needs path or id'})
+            continue
+        jobs.append((node, target.get('params') or {}))
+
+    for name, value in shared.items():
+        if isinstance(value, dict) and 'each' in value and len(value['each']) != len(jobs):
+            return {'error': f"'{name}' has {len(value['each'])} values for {len(jobs)} nodes"}
+    if not jobs:
+        return {'success': not failures, 'targets': 0, 'params_set': 0,
+                'failed': len(failures), 'failures': failures}
+    if not shared and not any(params for _, params in jobs):
+        return {'error': 'Missing required field: params'}
+
+    verbose = body.get('verbose', False)
+    results = []
+    params_set = 0
+    ui.undo.startBlock(f'MCP: set params ({len(jobs)})')
+    try:
+        for i, (node, own) in enumerate(jobs):
+            params = {name: value['each'][i] if isinstance(value, dict) and 'each' in value else value
+                      for name, value in shared.items()}
+            params.update(own)
+            node_results = {}
+            for name, value in params.items():
+                r = node_results[name] = _set_param(node, name, value)
+                if r['success']:
+                    params_set += 1
+                else:
+                    failures.append({'id': node.id, 'path': node.path, 'param': name, 'error': r['error']})
+            _errors_touch(node)
+            if verbose:
+                results.append({'id': node.id, 'path': node.path, 'results': node_results})
+    finally:
+        ui.undo.endBlock()
+
+    result = {
+        'success': not failures,
+        'targets': len(jobs),
+        'params_set': params_set,
+        'failed': len(failures),
+        'failures': failures,
+    }
+    if verbose:
+        result['results'] = results
+    return result
 
 
 def handle_create_node(body):
-    parent_path = body.get('parent_path', '/')
+    """Create a new node with optional positioning.
+
+    With auto_place, the node goes to the nearest free spot — around
+    nodeX/nodeY when given, otherwise just right of the existing network.
+    """
     node_type = body.get('node_type')
     name = body.get('name', None)
+    node_x = body.get('nodeX', None)
+    node_y = body.get('nodeY', None)
+    auto_place = body.get('auto_place', False)
+
     if not node_type:
         return {'error': 'Missing required field: node_type'}
-    parent_node = op(parent_path)
+
+    parent_node, parent_ref = _resolve_op(body, 'parent_path', 'parent_id', default='/')
     if parent_node is None:
-        return {'error': f'Parent node not found: {parent_path}'}
+        return {'error': f'Parent node not found: {parent_ref}'}
+
     if not parent_node.isCOMP:
-        return {'error': f'Parent is not a COMP: {parent_path}'}
+        return {'error': f'Parent is not a COMP: {parent_ref}'}
+
     try:
-        new_node = parent_node.create(node_type, name)
-        return {'success': True, 'node': _serialize_op(new_node)}
+        new_node = _remember_op(parent_node.create(node_type, name))
+        _index_add(new_node)
+
+        # Set position if provided — keeps networks readable
+        if auto_place:
+            x0, y0, x1, y1 = _node_box(new_node)
+            spot = _free_spot(parent_node, x1 - x0, y1 - y0, node_x, node_y,
+                              int(body.get('margin', 20)), exclude={new_node.id})
+            if spot is not None:
+                node_x, node_y = spot[0], spot[1]
+        if node_x is not None:
+            new_node.nodeX = int(node_x)
+        if node_y is not None:
+            new_node.nodeY = int(node_y)
+        _spatial_put(new_node)
+        _errors_touch(new_node)
+
+        return {
+            'success': True,
+            'node': _serialize_op(new_node),
+        }
     except Exception as e:
         return {'error': f'Failed to create node: {str(e)}', 'node_type': node_type}
 
 
 def handle_delete_node(body):
-    path = body.get('path')
-    if not path:
-        return {'error': 'Missing required field: path'}
-    node = op(path)
+    """Delete a node by path (or every node matched by a selector)."""
+    if 'selector' in body:
+        return _bulk_delete(body)
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id (or selector)'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
-    node_info = {'name': node.name, 'path': node.path, 'type': node.type}
+        return {'error': f'Node not found: {ref}'}
+    path = node.path
+
+    node_info = {'id': node.id, 'name': node.name, 'path': node.path, 'type': node.type}
+
     try:
-        node.destroy()
+        _delete_one(node)
         return {'success': True, 'deleted': node_info}
     except Exception as e:
         return {'error': f'Failed to delete node: {str(e)}'}
 
 
 def handle_connect_nodes(body):
-    source_path = body.get('source_path')
-    target_path = body.get('target_path')
+    """Connect output of one node to input of another."""
     source_index = body.get('source_index', 0)
     target_index = body.get('target_index', 0)
-    if not source_path or not target_path:
-        return {'error': 'Missing required fields: source_path and target_path'}
-    source = op(source_path)
-    target = op(target_path)
+
+    source, source_ref = _resolve_op(body, 'source_path', 'source_id')
+    target, target_ref = _resolve_op(body, 'target_path', 'target_id')
+
+    if source_ref is None or target_ref is None:
+        return {'error': 'Missing required fields: source_path/source_id and target_path/target_id'}
     if source is None:
-        return {'error': f'Source node not found: {source_path}'}
+        return {'error': f'Source node not found: {source_ref}'}
     if target is None:
-        return {'error': f'Target node not found: {target_path}'}
+        return {'error': f'Target node not found: {target_ref}'}
+
     try:
         source.outputConnectors[source_index].connect(target.inputConnectors[target_index])
-        return {'success': True, 'connection': {
-            'source': source.path, 'source_index': source_index,
-            'target': target.path, 'target_index': target_index,
-        }}
+        _errors_touch(target)
+        return {
+            'success': True,
+            'connection': {
+                'source': source.path,
+                'source_id': source.id,
+                'source_index': source_index,
+                'target': target.path,
+                'target_id': target.id,
+                'target_index': target_index,
+            }
+        }
     except Exception as e:
         return {'error': f'Failed to connect: {str(e)}'}
 
 
 def handle_disconnect_nodes(body):
-    path = body.get('path')
-    connector_type = body.get('connector_type', 'input')
+    """Disconnect a node's input or output."""
+    connector_type = body.get('connector_type', 'input')  # 'input' or 'output'
     index = body.get('index', 0)
-    if not path:
-        return {'error': 'Missing required field: path'}
-    node = op(path)
+
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+    path = node.path
+
     try:
         if connector_type == 'input':
             node.inputConnectors[index].disconnect()
         else:
             node.outputConnectors[index].disconnect()
-        return {'success': True, 'path': path, 'connector_type': connector_type, 'index': index}
+        _errors_touch(node)
+        return {'success': True, 'path': path, 'id': node.id, 'connector_type': connector_type, 'index': index}
     except Exception as e:
         return {'error': f'Failed to disconnect: {str(e)}'}
 
 
 def handle_get_connections(body):
-    path = body.get('path')
-    if not path:
-        return {'error': 'Missing required field: path'}
-    node = op(path)
+    """Get all connections for a node."""
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+    path = node.path
+
     inputs = []
     for conn in node.inputConnectors:
         for c in conn.connections:
-            inputs.append({'from_path': c.owner.path, 'from_index': c.index, 'to_index': conn.index})
+            inputs.append({
+                'from_path': c.owner.path,
+                'from_id': c.owner.id,
+                'from_index': c.index,
+                'to_index': conn.index,
+            })
+
     outputs = []
     for conn in node.outputConnectors:
         for c in conn.connections:
-            outputs.append({'to_path': c.owner.path, 'to_index': c.index, 'from_index': conn.index})
-    return {'path': path, 'inputs': inputs, 'outputs': outputs}
+            outputs.append({
+                'to_path': c.owner.path,
+                'to_id': c.owner.id,
+                'to_index': c.index,
+                'from_index': conn.index,
+            })
+
+    return {'path': path, 'id': node.id, 'inputs': inputs, 'outputs': outputs}
 
 
 def handle_get_errors(body):
-    path = body.get('path', '/')
+    """Get errors/warnings for a node, optionally recursive."""
+    return _run_task(_errors_task(body))
+
+
+def _errors_task(body):
+    """
+    Task behind handle_get_errors — yields once per visited node.
+
+    changes_seq in the result is the latest error-transition seq: pass it
+    as `after` to /api/errors/changes to get only what changed since.
+
+    With limit, at most that many issues are returned; a full page carries
+    a next_cursor that resumes the walk after its last issue.
+    """
     recurse = body.get('recurse', True)
-    node = op(path)
+    limit = body.get('limit')
+    _errors_use()
+
+    node, ref = _resolve_op(body, default='/')
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+    path, node_id = node.path, node.id
+    cursor, error = _cursor_decode('errors', body)
+    if error:
+        return error
+
+    stats = {}
+    if not recurse:
+        frames, nodes = [], [node]
+    else:
+        frames = _walk_frames(node, cursor['p'] if cursor else None)
+        nodes = _walk_ids(frames, stats=stats)
+        if cursor is None:
+            nodes = itertools.chain([node], nodes)
+
     results = []
-    def collect_errors(n):
+    next_cursor = None
+    for n in nodes:
         errs = n.errors(recurse=False) if hasattr(n, 'errors') else ''
         warns = n.warnings(recurse=False) if hasattr(n, 'warnings') else ''
         if errs or warns:
-            results.append({'path': n.path, 'name': n.name, 'type': n.type, 'errors': errs, 'warnings': warns})
-        if recurse and n.isCOMP:
-            for child in n.children:
-                collect_errors(child)
-    collect_errors(node)
-    return {'path': path, 'recurse': recurse, 'count': len(results), 'issues': results}
+            results.append({
+                'id': n.id,
+                'path': n.path,
+                'name': n.name,
+                'type': n.type,
+                'errors': errs,
+                'warnings': warns,
+            })
+            if limit is not None and len(results) >= limit and frames:
+                next_cursor = _cursor_encode('errors', body, {'p': _walk_position(frames)})
+                break
+        yield
+
+    result = {'path': path, 'id': node_id, 'recurse': recurse, 'count': len(results), 'issues': results,
+              'changes_seq': _errors_latest_seq()}
+    if stats:
+        result['skipped'] = stats['skipped']
+    if next_cursor:
+        result['has_more'] = True
+        result['next_cursor'] = next_cursor
+    return result
+
+
+# window key -> smallest accepted value
+CONTENT_WINDOW_KEYS = {
+    'row_offset':  0,
+    'row_limit':   0,
+    'row_step':    1,
+    'col_offset':  0,
+    'col_limit':   0,
+    'line_offset': 0,
+    'line_limit':  0,
+}
 
 
 def handle_get_content(body):
-    path = body.get('path')
-    if not path:
-        return {'error': 'Missing required field: path'}
-    node = op(path)
+    """Get text/table content from a DAT.
+
+    Tables: row_offset / row_limit / row_step and col_offset / col_limit
+    select a window (row_step samples every Nth row), header_only returns
+    just row 0. Text: line_offset / line_limit return a range of lines.
+    count_only returns only the size, for either format.
+    """
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+    path = node.path
+
     if not node.isDAT:
         return {'error': f'Node is not a DAT: {path} (type: {node.type})'}
+
+    for key, minimum in CONTENT_WINDOW_KEYS.items():
+        value = body.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < minimum):
+            return {'error': f'{key} must be an integer >= {minimum}, got {value!r}'}
+
     try:
+        # Try table format first
         if hasattr(node, 'numRows') and node.numRows > 0:
-            rows = []
-            for r in range(node.numRows):
-                row = []
-                for c in range(node.numCols):
-                    row.append(node[r, c].val)
-                rows.append(row)
-            return {'path': path, 'format': 'table', 'numRows': node.numRows, 'numCols': node.numCols, 'data': rows}
-        else:
-            return {'path': path, 'format': 'text', 'text': node.text}
-    except Exception:
-        return {'path': path, 'format': 'text', 'text': node.text if hasattr(node, 'text') else ''}
+            return _table_content(node, body)
+    except tdError:
+        # A DAT whose cells TD will not hand out — read it as text instead
+        pass
+    return _text_content(node, body)
+
+
+def _table_content(node, body):
+    """Table read — whole rows via node.row(), sliced to the requested window."""
+    num_rows, num_cols = node.numRows, node.numCols
+    result = {
+        'path': node.path,
+        'id': node.id,
+        'format': 'table',
+        'numRows': num_rows,
+        'numCols': num_cols,
+    }
+    if body.get('count_only'):
+        return result
+
+    if body.get('header_only'):
+        row_range = range(0, 1)
+    else:
+        row_offset = body.get('row_offset') or 0
+        row_step = body.get('row_step') or 1
+        row_limit = body.get('row_limit')
+        stop = num_rows if row_limit is None else min(num_rows, row_offset + row_limit * row_step)
+        row_range = range(row_offset, stop, row_step)
+        result['row_offset'] = row_offset
+        result['has_more'] = stop < num_rows
+
+    col_offset = body.get('col_offset') or 0
+    col_limit = body.get('col_limit')
+    col_stop = num_cols if col_limit is None else col_offset + col_limit
+    if col_offset or col_limit is not None:
+        result['col_offset'] = col_offset
+
+    result['data'] = [[c.val for c in node.row(r)[col_offset:col_stop]] for r in row_range]
+    return result
+
+
+def _text_content(node, body):
+    """Text read — the whole text, or a range of lines."""
+    text = node.text
+    result = {'path': node.path, 'id': node.id, 'format': 'text', 'hash': _text_hash(text)}
+    ranged = body.get('line_offset') is not None or body.get('line_limit') is not None
+    if not (ranged or body.get('count_only')):
+        result['text'] = text
+        return result
+
+    # Lines keep their endings, so a range reads back byte for byte
+    lines = text.splitlines(keepends=True)
+    result['length'] = len(text)
+    result['total_lines'] = len(lines)
+    if body.get('count_only'):
+        return result
+
+    line_offset = body.get('line_offset') or 0
+    line_limit = body.get('line_limit')
+    selected = lines[line_offset:] if line_limit is None else lines[line_offset:line_offset + line_limit]
+    result['line_offset'] = line_offset
+    result['has_more'] = line_offset + len(selected) < len(lines)
+    result['text'] = ''.join(selected)
+    return result
 
 
 def handle_set_content(body):
-    path = body.get('path')
+    """Set text/table content on a DAT.
+
+    body['mode'] selects the write (default 'replace'):
+      replace       'text' replaces the whole text, 'table' the whole table
+      append_rows   'rows' appended at the end
+      replace_rows  'rows' written over start_row, start_row+1, ... (appended past the end)
+      set_cells     'cells' [{row, col, value}] written one by one (table grows to fit)
+      delete_rows   'row_indices' removed
+      diff          'table' compared with the current table; only changed rows/cells are written
+    """
+    mode = body.get('mode', 'replace')
     text = body.get('text', None)
     table = body.get('table', None)
-    if not path:
-        return {'error': 'Missing required field: path'}
-    node = op(path)
+
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+    path = node.path
+
     if not node.isDAT:
         return {'error': f'Node is not a DAT: {path}'}
+    _errors_touch(node)
+
+    if mode != 'replace':
+        writer = TABLE_WRITE_MODES.get(mode)
+        if writer is None:
+            return {'error': f'Unknown mode: {mode}', 'available': ['replace'] + list(TABLE_WRITE_MODES)}
+        try:
+            stats = writer(node, body)
+        except ValueError as e:
+            return {'error': str(e)}
+        except Exception as e:
+            return {'error': f'Failed to set content: {str(e)}'}
+        result = {'success': True, 'path': path, 'id': node.id, 'format': 'table', 'mode': mode,
+                  'numRows': node.numRows, 'numCols': node.numCols}
+        result.update(stats)
+        return result
+
     try:
         if text is not None:
             node.text = text
-            return {'success': True, 'path': path, 'format': 'text', 'length': len(text)}
+            return {'success': True, 'path': path, 'id': node.id, 'format': 'text', 'length': len(text)}
         elif table is not None:
             node.clear()
-            for r, row in enumerate(table):
-                for c, val in enumerate(row):
-                    node[r, c] = val
-            return {'success': True, 'path': path, 'format': 'table', 'rows': len(table)}
+            for row in table:
+                node.appendRow(row)
+            return {'success': True, 'path': path, 'id': node.id, 'format': 'table', 'rows': len(table)}
         else:
             return {'error': 'Provide either "text" or "table" field'}
     except Exception as e:
         return {'error': f'Failed to set content: {str(e)}'}
 
 
+# ─── Text Patches ───────────────────────────────────────────
+#
+# Edit a text DAT without round-tripping the whole text: the client sends
+# the hash of the text its patch was made against (returned as 'hash' by
+# node/content) plus a unified diff or a list of line-range edits.
+#
+# Lines keep their own endings, so untouched lines come back byte for byte
+# (CRLF included) and the next base_hash still matches. Inserted lines take
+# the text's first line ending; the trailing newline is kept as it was.
+
+_HUNK_RE = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def _text_hash(text):
+    """Version hash of a DAT's text."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _strip_eol(line):
+    """A line without its ending."""
+    return line.splitlines()[0] if line else line
+
+
+def _join_lines(lines, newline, trailing):
+    """Join lines that keep their endings, giving every line but the last one
+    an ending, and the last one an ending only if trailing."""
+    out = [line if _strip_eol(line) != line else line + newline for line in lines[:-1]]
+    if lines:
+        last = _strip_eol(lines[-1])
+        out.append((lines[-1] if lines[-1] != last else last + newline) if trailing else last)
+    return ''.join(out)
+
+
+def _apply_unified_diff(lines, diff, newline='\n'):
+    """
+    Apply a unified diff to a list of lines (with their endings). Context
+    must match exactly, apart from line endings.
+    """
+    hunks = []
+    for raw in diff.splitlines():
+        m = _HUNK_RE.match(raw)
+        if m:
+            hunks.append((int(m.group(1)), 1 if m.group(2) is None else int(m.group(2)), []))
+        elif hunks:
+            if raw.startswith('\\'):
+                continue  # "\ No newline at end of file"
+            tag, content = (raw[0], raw[1:]) if raw else (' ', '')
+            if tag not in ' -+':
+                raise ValueError(f'Malformed diff line: {raw[:80]!r}')
+            hunks[-1][2].append((tag, content.rstrip('\r')))
+    if not hunks:
+        raise ValueError('Diff contains no hunks (expected "@@ -a,b +c,d @@" headers)')
+
+    out = []
+    pos = 0
+    for old_start, old_len, hunk in hunks:
+        start = old_start - 1 if old_len else old_start
+        if start < pos:
+            raise ValueError(f'Hunk @@ -{old_start} overlaps the previous hunk')
+        out.extend(lines[pos:start])
+        pos = start
+        for tag, content in hunk:
+            if tag == '+':
+                out.append(content + newline)
+                continue
+            if pos >= len(lines) or _strip_eol(lines[pos]) != content:
+                found = _strip_eol(lines[pos]) if pos < len(lines) else '<end of text>'
+                raise ValueError(f'Hunk @@ -{old_start} does not apply at line {pos + 1}: '
+                                 f'expected {content!r}, found {found!r}')
+            if tag == ' ':
+                out.append(lines[pos])
+            pos += 1
+    out.extend(lines[pos:])
+    return out
+
+
+def _apply_line_edits(lines, edits, newline='\n'):
+    """
+    Apply [{line_offset, line_count, text}] edits, all relative to the
+    original lines (with their endings).
+    """
+    try:
+        spans = sorted((int(e['line_offset']), int(e.get('line_count', 0)), e.get('text', ''))
+                       for e in edits)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Each edit needs an integer "line_offset", plus "line_count" and "text"')
+
+    out = []
+    pos = 0
+    for offset, count, text in spans:
+        if offset < pos or count < 0 or offset + count > len(lines):
+            raise ValueError(f'Edit at line_offset {offset} (line_count {count}) overlaps another '
+                             f'edit or runs past the end ({len(lines)} lines)')
+        out.extend(lines[pos:offset])
+        out.extend(line + newline for line in text.splitlines())
+        pos = offset + count
+    out.extend(lines[pos:])
+    return out
+
+
+def _patch_text(text, diff=None, edits=None):
+    """(new text, line count before, line count after) for a diff or a list of edits."""
+    lines = text.splitlines(keepends=True)
+    first, last = (lines[0], lines[-1]) if lines else ('', '')
+    newline = first[len(_strip_eol(first)):] or '\n'
+    if diff is not None:
+        new_lines = _apply_unified_diff(lines, diff, newline)
+    else:
+        new_lines = _apply_line_edits(lines, edits, newline)
+    return _join_lines(new_lines, newline, trailing=last != _strip_eol(last)), len(lines), len(new_lines)
+
+
+def handle_patch_content(body):
+    """
+    Patch a DAT's text against a known version.
+
+    body: path/id, base_hash (from node/content), and either 'diff'
+    (unified diff) or 'edits' ([{line_offset, line_count, text}], 0-based,
+    relative to the base text). Rejected without changes if the DAT no
+    longer matches base_hash or a hunk does not apply.
+    """
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id'}
+    if node is None:
+        return {'error': f'Node not found: {ref}'}
+    if not node.isDAT:
+        return {'error': f'Node is not a DAT: {node.path}'}
+
+    base_hash = body.get('base_hash')
+    diff = body.get('diff')
+    edits = body.get('edits')
+    if not base_hash:
+        return {'error': 'Missing required field: base_hash'}
+    if (diff is None) == (edits is None):
+        return {'error': 'Provide exactly one of "diff" or "edits"'}
+
+    text = node.text
+    current_hash = _text_hash(text)
+    if current_hash != base_hash:
+        return {'error': 'Version mismatch: the DAT changed since base_hash was read',
+                'current_hash': current_hash}
+
+    try:
+        new_text, old_count, new_count = _patch_text(text, diff, edits)
+    except ValueError as e:
+        return {'error': str(e), 'current_hash': current_hash}
+
+    try:
+        node.text = new_text
+        _errors_touch(node)
+    except Exception as e:
+        return {'error': f'Failed to set content: {str(e)}'}
+
+    return {
+        'success': True,
+        'path': node.path,
+        'id': node.id,
+        'base_hash': base_hash,
+        'hash': _text_hash(new_text),
+        'lines': new_count,
+        'lines_delta': new_count - old_count,
+    }
+
+
+# ─── Table Writes ───────────────────────────────────────────
+#
+# Row-level writers behind handle_set_content's non-replace modes. Each
+# takes (node, body), writes through TD's native row APIs and returns a
+# dict of counts; ValueError means the request itself was malformed.
+
+def _table_append_rows(node, body):
+    rows = body.get('rows')
+    if not rows:
+        raise ValueError('append_rows needs a non-empty "rows" list')
+    for row in rows:
+        node.appendRow(row)
+    return {'rows_appended': len(rows)}
+
+
+def _table_replace_rows(node, body):
+    rows = body.get('rows')
+    start = int(body.get('start_row', 0))
+    if not rows:
+        raise ValueError('replace_rows needs a non-empty "rows" list')
+    if start < 0 or start > node.numRows:
+        raise ValueError(f'start_row {start} out of range (table has {node.numRows} rows)')
+    replaced = appended = 0
+    for i, row in enumerate(rows):
+        if start + i < node.numRows:
+            node.replaceRow(start + i, row)
+            replaced += 1
+        else:
+            node.appendRow(row)
+            appended += 1
+    return {'rows_replaced': replaced, 'rows_appended': appended}
+
+
+def _table_set_cells(node, body):
+    cells = body.get('cells')
+    if not cells:
+        raise ValueError('set_cells needs a non-empty "cells" list of {row, col, value}')
+    try:
+        edits = [(int(c['row']), int(c['col']), c.get('value', '')) for c in cells]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Each cell needs integer "row" and "col" plus a "value"')
+    if any(r < 0 or c < 0 for r, c, _ in edits):
+        raise ValueError('Cell row/col must be >= 0')
+
+    rows = max(node.numRows, max(r for r, _, _ in edits) + 1)
+    cols = max(node.numCols, max(c for _, c, _ in edits) + 1)
+    if (rows, cols) != (node.numRows, node.numCols):
+        node.setSize(rows, cols)
+    for r, c, value in edits:
+        node[r, c] = value
+    return {'cells_set': len(edits)}
+
+
+def _table_delete_rows(node, body):
+    indices = body.get('row_indices')
+    if not indices:
+        raise ValueError('delete_rows needs a non-empty "row_indices" list')
+    indices = sorted({int(i) for i in indices}, reverse=True)
+    invalid = [i for i in indices if i < 0 or i >= node.numRows]
+    if invalid:
+        raise ValueError(f'Row indices out of range (table has {node.numRows} rows): {sorted(invalid)}')
+    for i in indices:
+        node.deleteRow(i)
+    return {'rows_deleted': len(indices)}
+
+
+def _table_diff(node, body):
+    """
+    Bring the table to body['table'] touching as little as possible:
+    rows that differ in at most half their cells get cell writes, other
+    changed rows a replaceRow, then rows are appended or trimmed at the end.
+    """
+    table = body.get('table')
+    if table is None:
+        raise ValueError('diff needs the target "table"')
+
+    current = node.numRows
+    stats = {'rows_unchanged': 0, 'rows_replaced': 0, 'cells_set': 0, 'rows_appended': 0, 'rows_deleted': 0}
+    for r, want in enumerate(table[:current]):
+        want = [str(v) for v in want]
+        have = [c.val for c in node.row(r)]
+        if len(want) < len(have):
+            want += [''] * (len(have) - len(want))
+        if want == have:
+            stats['rows_unchanged'] += 1
+            continue
+        if len(want) == len(have):
+            changed = [c for c in range(len(want)) if want[c] != have[c]]
+            if len(changed) * 2 <= len(want):
+                for c in changed:
+                    node[r, c] = want[c]
+                stats['cells_set'] += len(changed)
+                continue
+        node.replaceRow(r, want)
+        stats['rows_replaced'] += 1
+
+    for want in table[current:]:
+        node.appendRow(want)
+        stats['rows_appended'] += 1
+    for r in range(current - 1, len(table) - 1, -1):
+        node.deleteRow(r)
+        stats['rows_deleted'] += 1
+    return stats
+
+
+TABLE_WRITE_MODES = {
+    'append_rows':  _table_append_rows,
+    'replace_rows': _table_replace_rows,
+    'set_cells':    _table_set_cells,
+    'delete_rows':  _table_delete_rows,
+    'diff':         _table_diff,
+}
+
+
 def handle_copy_node(body):
-    source_path = body.get('source_path')
-    dest_parent = body.get('dest_parent', None)
+    """Copy/duplicate a node (or every node matched by a selector)."""
+    if 'selector' in body:
+        return _bulk_copy(body)
     new_name = body.get('new_name', None)
-    if not source_path:
-        return {'error': 'Missing required field: source_path'}
-    source = op(source_path)
+
+    source, source_ref = _resolve_op(body, 'source_path', 'source_id')
+    if source_ref is None:
+        return {'error': 'Missing required field: source_path or source_id'}
     if source is None:
-        return {'error': f'Source node not found: {source_path}'}
-    parent_node = op(dest_parent) if dest_parent else source.parent()
-    if parent_node is None:
-        return {'error': f'Destination parent not found: {dest_parent}'}
+        return {'error': f'Source node not found: {source_ref}'}
+
+    parent, parent_ref = _resolve_op(body, 'dest_parent', 'dest_parent_id')
+    if parent_ref is None:
+        parent = source.parent()
+    if parent is None:
+        return {'error': f'Destination parent not found: {parent_ref}'}
+
     try:
-        new_node = parent_node.copy(source, name=new_name)
+        new_node = _remember_op(parent.copy(source, name=new_name))
+        _index_add_subtree(new_node)
+        _spatial_put(new_node)
+        _errors_touch(new_node)
         return {'success': True, 'node': _serialize_op(new_node)}
     except Exception as e:
         return {'error': f'Failed to copy node: {str(e)}'}
 
 
 def handle_rename_node(body):
-    path = body.get('path')
+    """Rename a node (or every node matched by a selector)."""
+    if 'selector' in body:
+        return _bulk_rename(body)
     new_name = body.get('new_name')
-    if not path or not new_name:
-        return {'error': 'Missing required fields: path and new_name'}
-    node = op(path)
+
+    node, ref = _resolve_op(body)
+    if ref is None or not new_name:
+        return {'error': 'Missing required fields: path (or id) and new_name'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+
     old_name = node.name
     try:
         node.name = new_name
-        return {'success': True, 'old_name': old_name, 'new_name': node.name, 'new_path': node.path}
+        _index_update(node)
+        return {'success': True, 'id': node.id, 'old_name': old_name, 'new_name': node.name, 'new_path': node.path}
     except Exception as e:
         return {'error': f'Failed to rename: {str(e)}'}
 
 
+# ─── Selectors & Bulk Mutations ─────────────────────────────
+#
+# delete / copy / rename / flags accept a 'selector' instead of a single
+# node. All matches are changed in one callback inside one undo block,
+# and the response summarises each node as {id, path, ok, ...}.
+#
+# selector:
+#   path / id       root to select under (default '/')
+#   recurse         include all descendants, not just children (default False)
+#   pattern         ops()-style name patterns, space separated ('noise* level*')
+#   path_glob       fnmatch pattern on the full path
+#   family, type    exact filters
+#   tags            node must carry all of these tags
+#   paths, ids      explicit nodes (combined with the filters above)
+#   max_nodes       refuse to touch more than this many (default 500)
+#   dry_run         only report what would be affected
+
+SELECTOR_FILTERS = ('pattern', 'path_glob', 'family', 'type', 'tags', 'paths', 'ids')
+
+
+def _select_ops(sel):
+    """Resolve a selector to a list of operators. Returns (nodes, error)."""
+    if not isinstance(sel, dict):
+        return None, {'error': 'selector must be an object'}
+    if not any(sel.get(k) for k in SELECTOR_FILTERS):
+        return None, {'error': f"Selector needs at least one of: {', '.join(SELECTOR_FILTERS)}"}
+
+    if sel.get('paths') or sel.get('ids'):
+        candidates = [op(p) for p in sel.get('paths') or []]
+        candidates += [_op_by_id(i) for i in sel.get('ids') or []]
+        missing = len([c for c in candidates if c is None])
+        if missing:
+            return None, {'error': f'{missing} of the selector paths/ids were not found'}
+    else:
+        root, ref = _resolve_op(sel, default='/')
+        if root is None:
+            return None, {'error': f'Selector root not found: {ref}'}
+        if sel.get('recurse', False):
+            candidates = [n for n in _walk(root) if n is not root]
+        else:
+            candidates = list(root.children)
+
+    patterns = (sel.get('pattern') or '').split()
+    path_glob = sel.get('path_glob')
+    family = (sel.get('family') or '').upper()
+    op_type = sel.get('type')
+    tags = set(sel.get('tags') or [])
+
+    nodes = []
+    seen = set()
+    for n in candidates:
+        if n.id in seen:
+            continue
+        if patterns and not any(fnmatch.fnmatchcase(n.name, p) for p in patterns):
+            continue
+        if path_glob and not fnmatch.fnmatchcase(n.path, path_glob):
+            continue
+        if family and n.family != family:
+            continue
+        if op_type and n.type != op_type:
+            continue
+        if tags and not tags.issubset(set(getattr(n, 'tags', ()))):
+            continue
+        seen.add(n.id)
+        nodes.append(n)
+    return nodes, None
+
+
+def _bulk_select(sel, prune_nested=False):
+    """
+    Selector matches ready for a bulk change. Returns (nodes, response):
+    a response (error or dry-run listing) means nothing should be changed.
+    With prune_nested, nodes inside another matched COMP are dropped (they
+    go along with it, e.g. on delete).
+    """
+    nodes, error = _select_ops(sel)
+    if error:
+        return None, error
+
+    if prune_nested:
+        chosen = set(n.path for n in nodes)
+        nodes = [n for n in nodes
+                 if not any(n.path.startswith(p.rstrip('/') + '/') for p in chosen if p != n.path)]
+
+    max_nodes = int(sel.get('max_nodes', 500))
+    if len(nodes) > max_nodes:
+        return None, {'error': f'Selector matched {len(nodes)} nodes, more than max_nodes ({max_nodes})',
+                      'matched': len(nodes)}
+
+    if sel.get('dry_run'):
+        return None, {'dry_run': True, 'matched': len(nodes),
+                      'nodes': [{'id': n.id, 'path': n.path} for n in nodes]}
+    return nodes, None
+
+
+def _bulk_apply(body, label, apply, prune_nested=False):
+    """Run apply(node) -> dict for every selector match inside one undo block."""
+    nodes, response = _bulk_select(body.get('selector'), prune_nested)
+    if response is not None:
+        return response
+
+    if not nodes:
+        return {'success': True, 'matched': 0, 'succeeded': 0, 'failed': 0, 'results': []}
+
+    results = []
+    ui.undo.startBlock(f'MCP: {label} ({len(nodes)})')
+    try:
+        for n in nodes:
+            entry = {'id': n.id, 'path': n.path}
+            try:
+                entry.update(apply(n) or {})
+                entry['ok'] = True
+            except Exception as e:
+                entry['ok'] = False
+                entry['error'] = str(e)
+            results.append(entry)
+    finally:
+        ui.undo.endBlock()
+
+    succeeded = sum(1 for r in results if r['ok'])
+    return {
+        'success': succeeded == len(results),
+        'matched': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results,
+    }
+
+
+def _delete_one(n):
+    _errors_forget(n)
+    _op_cache.pop(n.id, None)
+    _index_remove(n.id)
+    parent = n.parent()
+    if parent is not None:
+        _spatial_drop(parent.id, n.id)
+    n.destroy()
+    return {}
+
+
+def _bulk_delete(body):
+    return _bulk_apply(body, 'delete', _delete_one, prune_nested=True)
+
+
+def _bulk_copy(body):
+    """Copy every match into dest_parent (default: its own parent)."""
+    dest, dest_ref = _resolve_op(body, 'dest_parent', 'dest_parent_id')
+    if dest_ref is not None and dest is None:
+        return {'error': f'Destination parent not found: {dest_ref}'}
+    suffix = body.get('name_suffix')
+    dx, dy = int(body.get('offset_x', 0)), int(body.get('offset_y', 0))
+
+    def copy_one(n):
+        parent = dest if dest is not None else n.parent()
+        new_node = _remember_op(parent.copy(n, name=(n.name + suffix) if suffix else None))
+        if dx or dy:
+            new_node.nodeX, new_node.nodeY = n.nodeX + dx, n.nodeY + dy
+        _index_add_subtree(new_node)
+        _spatial_put(new_node)
+        _errors_touch(new_node)
+        return {'new_id': new_node.id, 'new_path': new_node.path}
+
+    return _bulk_apply(body, 'copy', copy_one, prune_nested=True)
+
+
+def _bulk_rename(body):
+    """Rename every match: find → replace in the name, then prefix/suffix."""
+    find = body.get('find')
+    replace = body.get('replace', '')
+    prefix = body.get('prefix', '')
+    suffix = body.get('suffix', '')
+    if not (find or prefix or suffix):
+        return {'error': 'Bulk rename needs find/replace, prefix or suffix'}
+
+    def rename_one(n):
+        old_name = n.name
+        new_name = prefix + (old_name.replace(find, replace) if find else old_name) + suffix
+        if new_name != old_name:
+            n.name = new_name
+            _index_update(n)
+        return {'old_name': old_name, 'new_name': n.name, 'new_path': n.path}
+
+    return _bulk_apply(body, 'rename', rename_one)
+
+
+NODE_FLAGS = ('bypass', 'lock', 'display', 'render')
+
+
+def _apply_flags(n, flags):
+    for name, value in flags.items():
+        setattr(n, name, value)
+    _errors_touch(n)
+    return {}
+
+
+def handle_set_flags(body):
+    """Set bypass / lock / display / render on a node (or on a selector's matches)."""
+    flags = {k: bool(body[k]) for k in NODE_FLAGS if k in body}
+    if not flags:
+        return {'error': f"Provide at least one flag: {', '.join(NODE_FLAGS)}"}
+    if 'selector' in body:
+        return _bulk_apply(body, 'set flags', lambda n: _apply_flags(n, flags))
+
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id (or selector)'}
+    if node is None:
+        return {'error': f'Node not found: {ref}'}
+    try:
+        _apply_flags(node, flags)
+    except Exception as e:
+        return {'error': f'Failed to set flags: {str(e)}'}
+    return {'success': True, 'id': node.id, 'path': node.path, 'flags': flags}
+
+
 def handle_exec_python(body):
+    """Execute arbitrary Python code inside TouchDesigner."""
     code = body.get('code')
     if not code:
         return {'error': 'Missing required field: code'}
-    import io
+
+    # Capture stdout
     old_stdout = sys.stdout
     old_stderr = sys.stderr
     captured_out = io.StringIO()
     captured_err = io.StringIO()
+
     result_value = None
     try:
         sys.stdout = captured_out
         sys.stderr = captured_err
+
+        # Try exec first, fall back to eval for expressions
         try:
             exec_globals = {'op': op, 'ops': ops, 'project': project, 'app': app,
                           'absTime': absTime, 'me': me, 'parent': parent, 'mod': mod,
                           'ui': ui, 'tdu': tdu}
             exec(code, exec_globals)
+            # Check if there's a __result__ variable
             result_value = exec_globals.get('__result__', None)
         except SyntaxError:
+            # Might be a simple expression
             result_value = eval(code)
     except Exception as e:
         sys.stdout = old_stdout
         sys.stderr = old_stderr
-        return {'error': str(e), 'type': type(e).__name__, 'traceback': traceback.format_exc(),
-                'stdout': captured_out.getvalue(), 'stderr': captured_err.getvalue()}
+        return {
+            'error': str(e),
+            'type': type(e).__name__,
+            'traceback': traceback.format_exc(),
+            'stdout': captured_out.getvalue(),
+            'stderr': captured_err.getvalue(),
+        }
     finally:
         sys.stdout = old_stdout
         sys.stderr = old_stderr
-    return {'success': True, 'result': str(result_value) if result_value is not None else None,
-            'stdout': captured_out.getvalue(), 'stderr': captured_err.getvalue()}
+
+    return {
+        'success': True,
+        'result': str(result_value) if result_value is not None else None,
+        'stdout': captured_out.getvalue(),
+        'stderr': captured_err.getvalue(),
+    }
 
 
 def handle_screenshot(body):
-    path = body.get('path', None)
+    """Capture a TOP as a PNG image and return base64."""
+    target, ref = _resolve_op(body)
+
     try:
-        if path:
-            target = op(path)
+        if ref is not None:
             if target is None:
-                return {'error': f'Node not found: {path}'}
+                return {'error': f'Node not found: {ref}'}
             if not target.isTOP:
-                return {'error': f'Node is not a TOP: {path} (type: {target.type})'}
+                return {'error': f'Node is not a TOP: {ref} (type: {target.type})'}
         else:
+            # Try to find the first render or output TOP
             return {'error': 'Provide path to a TOP node to screenshot'}
+
+        # Use saveByteArray for in-memory capture
         img_bytes = target.saveByteArray('.png')
         img_b64 = base64.b64encode(bytes(img_bytes)).decode('ascii')
-        return {'success': True, 'path': target.path, 'width': target.width, 'height': target.height,
-                'format': 'png', 'data_base64': img_b64, 'size_bytes': len(img_bytes)}
+
+        return {
+            'success': True,
+            'path': target.path,
+            'id': target.id,
+            'width': target.width,
+            'height': target.height,
+            'format': 'png',
+            'data_base64': img_b64,
+            'size_bytes': len(img_bytes),
+        }
     except Exception as e:
+        # Fallback: try file-based save
         try:
             target.save(SCREENSHOT_TEMP_PATH)
             with open(SCREENSHOT_TEMP_PATH, 'rb') as f:
                 img_bytes = f.read()
             img_b64 = base64.b64encode(img_bytes).decode('ascii')
-            return {'success': True, 'path': target.path, 'format': 'png',
-                    'data_base64': img_b64, 'size_bytes': len(img_bytes), 'method': 'file_fallback'}
+            return {
+                'success': True,
+                'path': target.path,
+                'id': target.id,
+                'format': 'png',
+                'data_base64': img_b64,
+                'size_bytes': len(img_bytes),
+                'method': 'file_fallback',
+            }
         except Exception as e2:
             return {'error': f'Screenshot failed: {str(e)} / fallback: {str(e2)}'}
 
 
 def handle_chop_data(body):
-    path = body.get('path')
-    channel_names = body.get('channels', None)
-    sample_range = body.get('range', None)
-    if not path:
-        return {'error': 'Missing required field: path'}
-    node = op(path)
+    """Read channel data from a CHOP.
+
+    channels: names or TD channel patterns ('chan*', 'tx ty tz'); range:
+    [start, end) in samples. Both are applied before the samples are copied
+    out of the CHOP. format 'binary' returns the selected block as raw
+    float32 (see _chop_binary) instead of JSON lists.
+
+    JSON channels longer than max_points (default CHOP_MAX_POINTS) are
+    reduced with the 'downsample' method — one of CHOP_DOWNSAMPLERS,
+    default 'minmax' — and carry the sample index of every value.
+    """
+    channel_names = body.get('channels', None)  # names / patterns, or None for all
+    sample_range = body.get('range', None)  # [start, end] or None for all
+
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+    path = node.path
+
     if not node.isCHOP:
         return {'error': f'Node is not a CHOP: {path}'}
-    result = {'path': path, 'numChans': node.numChans, 'numSamples': node.numSamples, 'rate': node.rate, 'channels': {}}
-    for chan in node.chans():
-        if channel_names and chan.name not in channel_names:
-            continue
-        samples = list(chan.vals)
-        if sample_range:
-            samples = samples[max(0, sample_range[0]):min(len(samples), sample_range[1])]
-        if len(samples) > 1000:
-            step = len(samples) // 1000
-            samples = samples[::step]
-            result['channels'][chan.name] = {'values': samples, 'downsampled': True, 'original_length': node.numSamples}
-        else:
-            result['channels'][chan.name] = {'values': samples, 'downsampled': False}
+
+    result = {
+        'path': path,
+        'id': node.id,
+        'numChans': node.numChans,
+        'numSamples': node.numSamples,
+        'rate': node.rate,
+        'channels': {},
+    }
+
+    if body.get('summary'):
+        result['summary'] = True
+        summary = _chop_summary(node)
+        chans, _, _ = _chop_select(node, channel_names)
+        result['channels'] = {c.name: summary[c.name] for c in chans}
+        return result
+
+    chans, start, end = _chop_select(node, channel_names, sample_range)
+    names = [c.name for c in chans]
+    if body.get('format') == 'binary':
+        # Checked before anything is copied out of the CHOP
+        max_values = min(int(body.get('max_values', CHOP_BLOCK_MAX)), CHOP_BLOCK_MAX)
+        shape = [len(chans), end - start]
+        if shape[0] * shape[1] > max_values:
+            return {'error': f'Selected block has {shape[0] * shape[1]} values ({shape[0]} channels × '
+                             f'{shape[1]} samples), more than max_values ({max_values}) — '
+                             f'narrow it with channels / range',
+                    'shape': shape, 'max_values': max_values}
+        return _chop_binary(node, names, _chop_block(node, chans, start, end), start, end)
+    block = _chop_block(node, chans, start, end)
+
+    # Limit samples per channel to avoid huge responses
+    max_points = max(3, int(body.get('max_points', CHOP_MAX_POINTS)))
+    method = body.get('downsample', 'minmax')
+    if method not in CHOP_DOWNSAMPLERS:
+        return {'error': f'Unknown downsample method: {method}', 'available': list(CHOP_DOWNSAMPLERS)}
+    length = end - start
+    if length <= max_points:
+        for name, row in zip(names, block):
+            result['channels'][name] = {
+                'values': row.tolist(),
+                'downsampled': False,
+            }
+        return result
+
+    positions, values = CHOP_DOWNSAMPLERS[method](block, max_points)
+    result['downsample'] = {'method': method, 'max_points': max_points, 'original_length': length}
+    for i, name in enumerate(names):
+        x = positions[i] if positions.ndim == 2 else positions
+        result['channels'][name] = {
+            'values': values[i].tolist(),
+            'indices': (start + x).tolist(),
+            'downsampled': True,
+            'method': method,
+            'original_length': length,
+        }
     return result
 
 
+def _chop_select(node, channels=None, sample_range=None):
+    """Channels (names / patterns) and the clamped [start, end) sample range of a CHOP."""
+    num_samples = node.numSamples
+    start, end = 0, num_samples
+    if sample_range:
+        start = min(max(0, int(sample_range[0])), num_samples)
+        end = min(max(start, int(sample_range[1])), num_samples)
+    chans = node.chans(*channels) if channels else node.chans()
+    return chans, start, end
+
+
+def _chop_block(node, chans, start, end):
+    """
+    The chosen channels × samples [start, end) of a CHOP as one float32
+    array, rows in the order of chans. Selecting every channel takes the
+    CHOP's own array export (rows reordered to match when the selection
+    lists them in another order); otherwise only the chosen channels are read.
+    """
+    indices = [c.index for c in chans]
+    if indices == list(range(node.numChans)):
+        block = node.numpyArray()[:, start:end]
+    elif len(indices) == node.numChans:
+        block = node.numpyArray()[indices, start:end]
+    else:
+        block = np.empty((len(chans), end - start), dtype=np.float32)
+        for i, chan in enumerate(chans):
+            block[i] = chan.numpyArray()[start:end]
+    return block
+
+
+# ─── CHOP Downsampling ──────────────────────────────────────
+#
+# Each downsampler takes the channels × samples block and a point budget
+# and returns (positions, values): the sample index of every output point
+# (per channel, or one row shared by all channels) relative to the block,
+# and the values there. All channels are reduced together in numpy.
+#
+#   minmax   min and max of each bucket, in time order — keeps peaks and transients
+#   lttb     Largest-Triangle-Three-Buckets — the visually most significant point per bucket
+#   mean     bucket averages, at each bucket's middle sample — smooths noise, flattens peaks
+#   stride   every k-th sample — cheapest, may miss anything between
+
+def _downsample_minmax(block, points):
+    chans, n = block.shape
+    k = -(-n // max(1, points // 2))        # samples per bucket
+    if k == 1:
+        return np.arange(n), block
+    buckets = -(-n // k)
+    pad = ((0, 0), (0, buckets * k - n))
+    lo = np.pad(block, pad, constant_values=np.inf).reshape(chans, buckets, k).argmin(axis=2)
+    hi = np.pad(block, pad, constant_values=-np.inf).reshape(chans, buckets, k).argmax(axis=2)
+    base = np.arange(buckets) * k
+    # A flat bucket has min == max at one sample; its last sample is the other point
+    hi = np.where(lo == hi, np.minimum(k, n - base) - 1, hi)
+    positions = np.stack([base + np.minimum(lo, hi), base + np.maximum(lo, hi)], axis=2)
+    positions = positions.reshape(chans, 2 * buckets)
+    if n % k == 1:
+        positions = positions[:, :-1]       # the last bucket holds one sample — keep it once
+    return positions, np.take_along_axis(block, positions, axis=1)
+
+
+def _downsample_lttb(block, points):
+    chans, n = block.shape
+    rows = np.arange(chans)
+    # points - 2 buckets between the first and last sample, which are always kept
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    positions = np.empty((chans, points), dtype=np.int64)
+    positions[:, 0] = 0
+    positions[:, -1] = n - 1
+    a = np.zeros(chans, dtype=np.int64)
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = (hi + next_hi - 1) / 2.0
+        avg_y = block[:, hi:next_hi].mean(axis=1)
+        ax, ay = a[:, None], block[rows, a][:, None]
+        xs = np.arange(lo, hi)[None, :]
+        area = np.abs((ax - avg_x) * (block[:, lo:hi] - ay) - (ax - xs) * (avg_y[:, None] - ay))
+        a = lo + area.argmax(axis=1)
+        positions[:, i + 1] = a
+    return positions, np.take_along_axis(block, positions, axis=1)
+
+
+def _downsample_mean(block, points):
+    n = block.shape[1]
+    edges = np.linspace(0, n, points + 1).astype(np.int64)
+    sums = np.add.reduceat(block, edges[:-1], axis=1, dtype=np.float64)
+    return (edges[:-1] + edges[1:] - 1) // 2, sums / np.diff(edges)
+
+
+def _downsample_stride(block, points):
+    step = -(-block.shape[1] // points)
+    return np.arange(0, block.shape[1], step), block[:, ::step]
+
+
+CHOP_DOWNSAMPLERS = {
+    'minmax': _downsample_minmax,
+    'lttb':   _downsample_lttb,
+    'mean':   _downsample_mean,
+    'stride': _downsample_stride,
+}
+
+
+CHOP_BINARY_MAGIC = b'TDCH'
+
+
+def _chop_binary(node, names, block, start, end):
+    """
+    Binary CHOP block: b'TDCH', uint32 LE header length, JSON header padded
+    with spaces to a multiple of 4 bytes, then channels × samples float32 LE,
+    row-major — one channel after another.
+    """
+    header = json.dumps({
+        'path': node.path,
+        'id': node.id,
+        'rate': node.rate,
+        'numSamples': node.numSamples,
+        'start': start,
+        'end': end,
+        'channels': names,
+        'dtype': 'float32',
+        'shape': [len(names), end - start],
+    }).encode('utf-8')
+    header += b' ' * (-len(header) % 4)
+    data = np.ascontiguousarray(block, dtype='<f4')
+    return CHOP_BINARY_MAGIC + len(header).to_bytes(4, 'little') + header + data.tobytes()
+
+
+_chop_summaries = OrderedDict()
+
+
+def _chop_summary(node):
+    """
+    Per-channel min / max / mean / first / last of a CHOP, computed over its
+    numpyArray() in one pass per statistic. Kept per CHOP
+    until its cook frame moves, so polling an idle CHOP does not re-read
+    its samples. Bounded like the other caches in this module.
+    """
+    cached = _chop_summaries.get(node.id)
+    if cached is not None and cached[0] == node.cookFrame:
+        _chop_summaries.move_to_end(node.id)
+        return cached[1]
+
+    names = [chan.name for chan in node.chans()]
+    block = node.numpyArray()
+    if names and block.shape[-1]:
+        stats = zip(block.min(axis=1).tolist(), block.max(axis=1).tolist(),
+                    block.mean(axis=1, dtype=np.float64).tolist(), block[:, 0].tolist(), block[:, -1].tolist())
+        summary = {name: dict(zip(('min', 'max', 'mean', 'first', 'last'), row)) for name, row in zip(names, stats)}
+    else:
+        summary = {name: {'min': None, 'max': None, 'mean': None, 'first': None, 'last': None} for name in names}
+
+    _chop_summaries[node.id] = (node.cookFrame, summary)
+    _chop_summaries.move_to_end(node.id)
+    while len(_chop_summaries) > CHOP_SUMMARY_CACHE:
+        _chop_summaries.popitem(last=False)
+    return summary
+
+
 def handle_sop_data(body):
-    path = body.get('path')
+    """Read geometry data from a SOP."""
     include_points = body.get('include_points', True)
     include_prims = body.get('include_prims', False)
     limit = body.get('limit', 500)
-    if not path:
-        return {'error': 'Missing required field: path'}
-    node = op(path)
+
+    node, ref = _resolve_op(body)
+    if ref is None:
+        return {'error': 'Missing required field: path or id'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+    path = node.path
+
     if not node.isSOP:
         return {'error': f'Node is not a SOP: {path}'}
-    result = {'path': path, 'numPoints': node.numPoints, 'numPrims': node.numPrims, 'numVertices': node.numVertices}
+
+    result = {
+        'path': path,
+        'id': node.id,
+        'numPoints': node.numPoints,
+        'numPrims': node.numPrims,
+        'numVertices': node.numVertices,
+    }
+
     if include_points:
         points = []
         for i, pt in enumerate(node.points()):
             if i >= limit:
                 break
-            points.append({'index': pt.index, 'x': pt.x, 'y': pt.y, 'z': pt.z})
+            points.append({
+                'index': pt.index,
+                'x': pt.x, 'y': pt.y, 'z': pt.z,
+            })
         result['points'] = points
         result['points_truncated'] = node.numPoints > limit
+
     if include_prims:
         prims = []
         for i, prim in enumerate(node.prims()):
             if i >= limit:
                 break
-            prims.append({'index': prim.index, 'numVertices': prim.numVertices})
+            prims.append({
+                'index': prim.index,
+                'numVertices': prim.numVertices,
+            })
         result['prims'] = prims
         result['prims_truncated'] = node.numPrims > limit
+
     return result
 
 
 def handle_cooking_info(body):
-    path = body.get('path', '/')
+    """Get cooking/performance info for a node."""
+    return _run_task(_cooking_task(body))
+
+
+def _cooking_task(body):
+    """Task behind handle_cooking_info — yields once per visited node."""
     recurse = body.get('recurse', False)
-    sort_by = body.get('sort_by', 'cookTime')
+    sort_by = body.get('sort_by', 'cookTime')  # cookTime, cpuCookTime
     limit = body.get('limit', 20)
-    node = op(path)
+
+    node, ref = _resolve_op(body, default='/')
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+    path, node_id = node.path, node.id
+    cursor, error = _cursor_decode('cooking', body)
+    if error:
+        return error
+
+    if cursor is not None:
+        # Later pages come from the snapshot sorted for the first one
+        results = _cursor_snapshots.get(cursor['s'])
+        if results is None:
+            return {'error': 'Cursor expired; start again without a cursor'}
+        offset = cursor['o']
+        page = results[offset:offset + limit]
+        result = {
+            'path': path,
+            'id': node_id,
+            'fps': project.cookRate,
+            'realTime': project.realTime,
+            'frame': cursor['f'],
+            'total_nodes': len(page),
+            'total': len(results),
+            'offset': offset,
+            'nodes': page,
+        }
+        if len(results) > offset + len(page):
+            result['next_cursor'] = _cursor_encode('cooking', body, dict(cursor, o=offset + len(page)))
+        return result
+
     results = []
-    def collect_cook(n):
+    stats = {}
+    for n in _walk(node, recurse, stats):
         try:
-            results.append({'path': n.path, 'name': n.name, 'type': n.type,
+            results.append({
+                'id': n.id,
+                'path': n.path,
+                'name': n.name,
+                'type': n.type,
                 'cookTime': n.cookTime if hasattr(n, 'cookTime') else 0,
                 'cpuCookTime': n.cpuCookTime if hasattr(n, 'cpuCookTime') else 0,
-                'cookFrame': n.cookFrame if hasattr(n, 'cookFrame') else 0})
+                'cookFrame': n.cookFrame if hasattr(n, 'cookFrame') else 0,
+            })
         except Exception:
             pass
-        if recurse and n.isCOMP:
-            for child in n.children:
-                collect_cook(child)
-    collect_cook(node)
+        yield
+
+    # Sort
     results.sort(key=lambda x: x.get(sort_by, 0), reverse=True)
-    results = results[:limit]
-    return {'path': path, 'fps': project.cookRate, 'realTime': project.realTime,
-            'frame': absTime.frame, 'total_nodes': len(results), 'nodes': results}
+    total = len(results)
+
+    result = {
+        'path': path,
+        'id': node_id,
+        'fps': project.cookRate,
+        'realTime': project.realTime,
+        'frame': absTime.frame,
+        'total_nodes': min(total, limit),
+        'total': total,
+        'nodes': results[:limit],
+    }
+    if stats:
+        result['skipped'] = stats['skipped']
+    if total > limit:
+        state = {'s': _cursor_snapshot(results), 'o': limit, 'f': absTime.frame}
+        result['next_cursor'] = _cursor_encode('cooking', body, state)
+    return result
+
+
+def handle_search_nodes(body):
+    """Search for nodes by name, type, or family — substring, regex or fuzzy."""
+    return _run_task(_search_task(body))
+
+
+def _search_task(body):
+    """Task behind handle_search_nodes — yields once per visited node."""
+    query = body.get('query', '')
+    search_type = body.get('search_type', 'name')  # name, type, family, all
+    limit = body.get('limit', 50)
+
+    if not query:
+        return {'error': 'Missing required field: query'}
+
+    root, ref = _resolve_op(body, default='/')
+    if root is None:
+        return {'error': f'Search root not found: {ref}'}
+
+    fields, error = _parse_fields(body, NODE_FIELDS)
+    if error:
+        return error
+
+    if body.get('match', 'substring') != 'substring':
+        return (yield from _ranked_search_task(body, root, query, search_type, limit, fields))
+
+    cursor, error = _cursor_decode('search', body)
+    if error:
+        return error
+
+    query_lower = query.lower()
+    results = []
+    stats = {}
+
+    # Index hits come in path order, resumed after the last path; a walk
+    # resumes from its saved frames. A cursor keeps the mode it began with.
+    use_index = cursor['m'] == 'p' if cursor is not None else _index_ready()
+    if use_index:
+        if not _index_ready():
+            return {'error': 'Cursor expired (scene index rebuilding); start again without a cursor'}
+        candidates = _index_search(query_lower, search_type, root, after=cursor and cursor['a'])
+    else:
+        frames = _walk_frames(root, cursor and cursor['p'])
+        walk = _walk_ids(frames, stats=stats)
+        if cursor is None:
+            walk = itertools.chain([root], walk)
+        candidates = (n for n in walk if _search_match(n, query_lower, search_type))
+
+    next_cursor = None
+    for n in candidates:
+        results.append(_serialize_op(n, fields=fields))
+        if len(results) >= limit:
+            # A full page may be followed by an empty one; not peeking
+            # ahead keeps a page's cost proportional to its size.
+            state = {'m': 'p', 'a': n.path} if use_index else {'m': 'w', 'p': _walk_position(frames)}
+            next_cursor = _cursor_encode('search', body, state)
+            break
+        yield
+
+    result = {'query': query, 'search_type': search_type, 'count': len(results), 'nodes': results}
+    if stats:
+        result['skipped'] = stats['skipped']
+    if next_cursor:
+        result['has_more'] = True
+        result['next_cursor'] = next_cursor
+    return result
+
+
+def _search_match(n, query_lower, search_type):
+    """Case-insensitive substring match on name, type and/or family."""
+    if search_type in ('name', 'all') and query_lower in n.name.lower():
+        return True
+    if search_type in ('type', 'all') and query_lower in n.type.lower():
+        return True
+    if search_type in ('family', 'all') and query_lower in n.family.lower():
+        return True
+    return False
+
+
+# ─── Ranked Search (regex / fuzzy) ──────────────────────────
+#
+# match='regex' or 'fuzzy' scores every candidate TD-side and returns only
+# the top `limit`, best first. With the scene index, each distinct name,
+# type and family is scored once, however many operators share it.
+#
+# Fuzzy relevance (0-100): exact name 100, prefix ~90, whole camelCase /
+# snake_case token 85, substring ~75, token initials ('nbm' → noise_bg_main)
+# 70, in-order subsequence up to 60 (bonus for runs and token starts), and
+# a typo (edit distance ≤ len/4, transpositions count once) up to 50.
+
+def _fuzzy_score(query, name):
+    """Relevance of name for a lowercase query; 0 means no match."""
+    lower = name.lower()
+    if lower == query:
+        return 100.0
+    if lower.startswith(query):
+        return 90.0 - min(len(lower) - len(query), 10) * 0.5
+    parts = list(_TOKEN_RE.finditer(name))
+    tokens = [m.group().lower() for m in parts]
+    if query in tokens:
+        return 85.0
+    pos = lower.find(query)
+    if pos >= 0:
+        return 75.0 - min(pos, 10) - min(len(lower) - len(query), 10) * 0.5
+    if len(query) >= 2 and ''.join(t[0] for t in tokens).startswith(query):
+        return 70.0
+    starts = set(m.start() for m in parts)
+    score = _subsequence_score(query, lower, starts)
+    if len(query) >= 3:
+        max_dist = max(1, len(query) // 4)
+        for candidate in [lower[:len(query)], lower] + tokens:
+            dist = _edit_distance(query, candidate, max_dist)
+            if dist <= max_dist:
+                score = max(score, 50.0 - dist * 10 - min(abs(len(candidate) - len(query)), 5))
+    return score
+
+
+def _subsequence_score(query, lower, starts):
+    """Score for query's characters appearing in order in lower (0 if not)."""
+    if len(query) < 2:
+        return 0.0
+    pos = -1
+    runs = boundaries = gaps = 0
+    for ch in query:
+        found = lower.find(ch, pos + 1)
+        if found < 0:
+            return 0.0
+        if found == pos + 1:
+            runs += 1
+        else:
+            gaps += found - pos - 1
+        if found in starts:
+            boundaries += 1
+        pos = found
+    n = len(query)
+    return max(1.0, min(60.0, 30.0 + 20.0 * runs / n + 10.0 * boundaries / n - min(gaps, 40) * 0.5))
+
+
+def _edit_distance(a, b, max_dist):
+    """Optimal-string-alignment distance, or max_dist + 1 once it is exceeded."""
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > max_dist:
+            return max_dist + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _regex_score(rx, text):
+    """Relevance of a regex hit: longer and earlier matches rank higher."""
+    m = rx.search(text)
+    if m is None:
+        return 0.0
+    return 50.0 + 40.0 * (m.end() - m.start()) / max(len(text), 1) + (10.0 if m.start() == 0 else 0.0)
+
+
+def _ranked_search_task(body, root, query, search_type, limit, fields):
+    """Regex / fuzzy part of _search_task — yields once per scored candidate."""
+    match = body.get('match')
+    min_score = float(body.get('min_score', 0))
+    if match == 'regex':
+        try:
+            rx = re.compile(query, 0 if body.get('case_sensitive') else re.IGNORECASE)
+        except re.error as e:
+            return {'error': f'Invalid regex: {e}'}
+        score = lambda text: _regex_score(rx, text)
+    else:
+        query_lower = query.lower()
+        score = lambda text: _fuzzy_score(query_lower, text)
+
+    keys = [k for k, kinds in (('name', ('name', 'all')), ('type', ('type', 'all')),
+                               ('family', ('family', 'all'))) if search_type in kinds]
+    heap = []
+    matched = scanned = 0
+    stats = {}
+    root_id, prefix = root.id, root.path.rstrip('/') + '/'
+
+    if _index_ready():
+        # Score distinct keys, then rank the ids that carry them. Names are
+        # indexed lowercase, so each is scored in its original spelling
+        # (camelCase boundaries and case-sensitive regexes need it). The
+        # pairs are copied first: as a job, the index sweep may change the
+        # tables between two steps.
+        scores = {}
+        for key in keys:
+            if key == 'name':
+                groups = [(_index_entries[i]['name'], i) for ids in _index_names.values() for i in ids
+                          if i in _index_entries]
+            else:
+                table = _index_types if key == 'type' else _index_families
+                groups = [(text, i) for text, ids in table.items() for i in ids]
+            seen = {}
+            for text, op_id in groups:
+                s = seen.get(text)
+                if s is None:
+                    s = seen[text] = score(text)
+                    scanned += 1
+                    yield
+                if s > min_score and s > scores.get(op_id, 0):
+                    scores[op_id] = s
+        ranked = []
+        for op_id, s in scores.items():
+            entry = _index_entries.get(op_id)
+            if entry is not None and (op_id == root_id or entry['path'].startswith(prefix)):
+                ranked.append((-s, len(entry['path']), entry['path'], op_id))
+        matched = len(ranked)
+        heapq.heapify(ranked)
+        results = []
+        while ranked and len(results) < limit:
+            neg, _, _, op_id = heapq.heappop(ranked)
+            n = _index_live(op_id)
+            if n is not None:
+                results.append((-neg, n))
+    else:
+        for seq, n in enumerate(_walk(root, stats=stats)):
+            scanned += 1
+            s = max(score(getattr(n, key)) for key in keys)
+            if s > min_score:
+                matched += 1
+                _top_push(heap, limit, (s, -len(n.path)), seq, n)
+            yield
+        results = [(value[0], n) for value, _, n in sorted(heap, reverse=True)]
+        live = [(s, n) for s, n in results if n.valid]
+        _walk_skip(stats, len(results) - len(live))
+        results = live
+
+    nodes = []
+    for s, n in results:
+        record = _serialize_op(n, fields=fields)
+        record['score'] = round(s, 1)
+        nodes.append(record)
+    result = {'query': query, 'search_type': search_type, 'match': match, 'count': len(nodes),
+              'matched': matched, 'scanned': scanned, 'nodes': nodes}
+    if stats:
+        result['skipped'] = stats['skipped']
+    return result
+
+
+# ─────────────────────────────────────────────────────────────
+# Spatial Index (node placement)
+# ─────────────────────────────────────────────────────────────
+# Per-COMP uniform grid over the children's node boxes (nodeX/nodeY plus
+# nodeWidth/nodeHeight), so free-space, overlap and bounds questions are
+# answered without shipping the whole network to the client. A grid is
+# built on first use, kept current by create/copy/delete, and rebuilt when
+# the child count no longer matches or it is SPATIAL_REFRESH_FRAMES old
+# (that catches nodes moved by hand in the network editor).
+
+_spatial = {}
+
+
+def _node_box(n):
+    """(x0, y0, x1, y1) of a node tile in its parent's network."""
+    x, y = n.nodeX, n.nodeY
+    return (x, y, x + getattr(n, 'nodeWidth', 200), y + getattr(n, 'nodeHeight', 100))
+
+
+def _box_cells(box):
+    x0, y0, x1, y1 = box
+    for cx in range(int(x0 // SPATIAL_CELL), int(x1 // SPATIAL_CELL) + 1):
+        for cy in range(int(y0 // SPATIAL_CELL), int(y1 // SPATIAL_CELL) + 1):
+            yield (cx, cy)
+
+
+def _spatial_grid(comp):
+    """The (possibly rebuilt) grid of comp's children."""
+    grid = _spatial.get(comp.id)
+    children = comp.children
+    if (grid is None or len(grid['boxes']) != len(children)
+            or absTime.frame - grid['frame'] >= SPATIAL_REFRESH_FRAMES
+            or absTime.frame < grid['frame']):
+        grid = {'frame': absTime.frame, 'boxes': {}, 'cells': {}}
+        for c in children:
+            _spatial_insert(grid, c.id, _node_box(c))
+        _spatial[comp.id] = grid
+    return grid
+
+
+def _spatial_insert(grid, node_id, box):
+    grid['boxes'][node_id] = box
+    for cell in _box_cells(box):
+        grid['cells'].setdefault(cell, set()).add(node_id)
+
+
+def _spatial_put(node):
+    """Record a node's (new) position in its parent's grid, if one exists."""
+    parent = node.parent()
+    grid = _spatial.get(parent.id) if parent is not None else None
+    if grid is None:
+        return
+    _spatial_drop(parent.id, node.id)
+    _spatial_insert(grid, node.id, _node_box(node))
+
+
+def _spatial_drop(comp_id, node_id):
+    """Forget a node in the grid of the COMP with id comp_id."""
+    grid = _spatial.get(comp_id)
+    if grid is None:
+        return
+    box = grid['boxes'].pop(node_id, None)
+    if box is not None:
+        for cell in _box_cells(box):
+            ids = grid['cells'].get(cell)
+            if ids is not None:
+                ids.discard(node_id)
+                if not ids:
+                    del grid['cells'][cell]
+
+
+def _spatial_hits(grid, box, exclude=()):
+    """Ids of nodes whose boxes overlap box (edges touching don't count)."""
+    x0, y0, x1, y1 = box
+    hits = set()
+    for cell in _box_cells(box):
+        for node_id in grid['cells'].get(cell, ()):
+            if node_id in hits or node_id in exclude:
+                continue
+            bx0, by0, bx1, by1 = grid['boxes'][node_id]
+            if bx0 < x1 and x0 < bx1 and by0 < y1 and y0 < by1:
+                hits.add(node_id)
+    return hits
+
+
+def _spatial_bounds(grid, exclude=()):
+    boxes = [b for i, b in grid['boxes'].items() if i not in exclude]
+    if not boxes:
+        return None
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+
+def _free_spot(comp, width, height, near_x=None, near_y=None, margin=20, exclude=(), max_rings=40):
+    """
+    Closest position to (near_x, near_y) where a width × height tile keeps
+    `margin` clear of every other node. Without a hint, starts just right
+    of the network's bounding box. Returns (x, y, ring) or None.
+    """
+    grid = _spatial_grid(comp)
+    if near_x is None or near_y is None:
+        bounds = _spatial_bounds(grid, exclude)
+        if bounds is None:
+            near_x, near_y = near_x or 0, near_y or 0
+        else:
+            near_x = bounds[2] + margin if near_x is None else near_x
+            near_y = bounds[1] if near_y is None else near_y
+
+    step_x, step_y = width + margin, height + margin
+    for ring in range(max_rings + 1):
+        candidates = [
+            (i, j) for i in range(-ring, ring + 1) for j in range(-ring, ring + 1)
+            if max(abs(i), abs(j)) == ring
+        ]
+        candidates.sort(key=lambda ij: (ij[0] * step_x) ** 2 + (ij[1] * step_y) ** 2)
+        for i, j in candidates:
+            x, y = near_x + i * step_x, near_y + j * step_y
+            box = (x - margin, y - margin, x + width + margin, y + height + margin)
+            if not _spatial_hits(grid, box, exclude):
+                return int(x), int(y), ring
+    return None
+
+
+def _layout_comp(body):
+    comp, ref = _resolve_op(body, default='/')
+    if comp is None:
+        return None, {'error': f'Node not found: {ref}'}
+    if not comp.isCOMP:
+        return None, {'error': f'Node is not a COMP: {ref}'}
+    return comp, None
+
+
+def handle_layout_free(body):
+    """Find a free width × height spot near (x, y) inside a COMP's network."""
+    comp, error = _layout_comp(body)
+    if error:
+        return error
+    width = int(body.get('width', 200))
+    height = int(body.get('height', 100))
+    margin = int(body.get('margin', 20))
+    spot = _free_spot(comp, width, height, body.get('x'), body.get('y'), margin,
+                      max_rings=int(body.get('max_rings', 40)))
+    if spot is None:
+        return {'error': 'No free spot found within max_rings', 'path': comp.path, 'id': comp.id}
+    x, y, ring = spot
+    return {'path': comp.path, 'id': comp.id, 'x': x, 'y': y,
+            'width': width, 'height': height, 'margin': margin, 'ring': ring}
+
+
+def handle_layout_overlaps(body):
+    """Nodes of a COMP whose tiles overlap the box (x, y, width, height)."""
+    comp, error = _layout_comp(body)
+    if error:
+        return error
+    if body.get('x') is None or body.get('y') is None:
+        return {'error': 'Missing required fields: x and y'}
+    x, y = body['x'], body['y']
+    margin = int(body.get('margin', 0))
+    box = (x - margin, y - margin,
+           x + int(body.get('width', 200)) + margin, y + int(body.get('height', 100)) + margin)
+
+    grid = _spatial_grid(comp)
+    nodes = []
+    for node_id in sorted(_spatial_hits(grid, box)):
+        n = _op_by_id(node_id)
+        if n is None:
+            continue
+        bx0, by0, bx1, by1 = grid['boxes'][node_id]
+        nodes.append({'id': n.id, 'name': n.name, 'path': n.path,
+                      'nodeX': bx0, 'nodeY': by0, 'width': bx1 - bx0, 'height': by1 - by0})
+    return {'path': comp.path, 'id': comp.id, 'box': list(box), 'count': len(nodes), 'nodes': nodes}
+
+
+def handle_layout_bounds(body):
+    """Bounding box of all node tiles inside a COMP."""
+    comp, error = _layout_comp(body)
+    if error:
+        return error
+    grid = _spatial_grid(comp)
+    bounds = _spatial_bounds(grid)
+    result = {'path': comp.path, 'id': comp.id, 'count': len(grid['boxes'])}
+    if bounds is not None:
+        x0, y0, x1, y1 = bounds
+        result.update({'x0': x0, 'y0': y0, 'x1': x1, 'y1': y1, 'width': x1 - x0, 'height': y1 - y0})
+    return result
+
+
+# ─────────────────────────────────────────────────────────────
+# Graph Queries
+# ─────────────────────────────────────────────────────────────
+# Declarative select / filter / project / sort / group over the node
+# graph, so questions like "TOPs under /project1 wider than 1920, by
+# cook time" don't need an exec_python script. Fields are node attributes
+# (OP_FIELDS), the metrics in QUERY_METRICS, or 'par.<name>' for the
+# evaluated value of a parameter.
+
+QUERY_METRICS = {
+    'cookTime':    lambda n: getattr(n, 'cookTime', None),
+    'cpuCookTime': lambda n: getattr(n, 'cpuCookTime', None),
+    'cookFrame':   lambda n: getattr(n, 'cookFrame', None),
+    'numChildren': lambda n: len(n.children) if n.isCOMP else None,
+    'numInputs':   lambda n: sum(len(c.connections) for c in n.inputConnectors),
+    'numOutputs':  lambda n: sum(len(c.connections) for c in n.outputConnectors),
+    'tags':        lambda n: sorted(getattr(n, 'tags', ())),
+    'comment':     lambda n: getattr(n, 'comment', ''),
+    'width':       lambda n: n.width if n.isTOP else None,
+    'height':      lambda n: n.height if n.isTOP else None,
+    'numChans':    lambda n: n.numChans if n.isCHOP else None,
+    'numSamples':  lambda n: n.numSamples if n.isCHOP else None,
+    'numPoints':   lambda n: n.numPoints if n.isSOP else None,
+    'numPrims':    lambda n: n.numPrims if n.isSOP else None,
+    'numRows':     lambda n: n.numRows if n.isDAT else None,
+    'numCols':     lambda n: n.numCols if n.isDAT else None,
+}
+
+QUERY_OPS = {
+    '==':         lambda a, b: a == b,
+    '!=':         lambda a, b: a != b,
+    '>':          lambda a, b: a is not None and a > b,
+    '>=':         lambda a, b: a is not None and a >= b,
+    '<':          lambda a, b: a is not None and a < b,
+    '<=':         lambda a, b: a is not None and a <= b,
+    'in':         lambda a, b: a in b,
+    'not_in':     lambda a, b: a not in b,
+    'contains':   lambda a, b: a is not None and b in a,
+    'startswith': lambda a, b: isinstance(a, str) and a.startswith(b),
+    'glob':       lambda a, b: isinstance(a, str) and fnmatch.fnmatchcase(a, b),
+    'exists':     lambda a, b: (a is not None) == (b is None or bool(b)),
+}
+
+QUERY_AGGREGATES = {
+    'count': lambda vals: len(vals),
+    'sum':   lambda vals: sum(v for v in vals if isinstance(v, (int, float))),
+    'avg':   lambda vals: _mean([v for v in vals if isinstance(v, (int, float))]),
+    'min':   lambda vals: min((v for v in vals if v is not None), default=None),
+    'max':   lambda vals: max((v for v in vals if v is not None), default=None),
+}
+
+
+def _mean(vals):
+    return sum(vals) / len(vals) if vals else None
+
+
+def _query_getter(field):
+    """Resolve a query field name to a getter, or None if unknown."""
+    if field.startswith('par.'):
+        name = field[4:]
+
+        def get_par(n):
+            p = getattr(n.par, name, None)
+            return None if p is None else p.eval()
+        return get_par
+    return OP_FIELDS.get(field) or QUERY_METRICS.get(field)
+
+
+def _query_value(get, node):
+    """Read one field as a JSON-friendly value (None when unavailable)."""
+    try:
+        v = get(node)
+    except Exception:
+        return None
+    if v is None or isinstance(v, (bool, int, float, str)):
+        return v
+    if isinstance(v, (list, tuple)):
+        return [x if x is None or isinstance(x, (bool, int, float, str)) else str(x) for x in v]
+    return str(v)
+
+
+def _sort_key(v):
+    """Order None last and keep numbers and strings from being compared."""
+    return (v is None, isinstance(v, str), v if v is not None else 0)
+
+
+def _sort_rows(rows, order_by, columns):
+    """Stable multi-key sort of rows by 'field' / '-field' column specs."""
+    for spec in reversed(order_by):
+        col = columns.index(spec.lstrip('-'))
+        rows.sort(key=lambda r: _sort_key(r[col]), reverse=spec.startswith('-'))
+
+
+def handle_query(body):
+    """Declarative node query — see _query_task."""
+    return _run_task(_query_task(body))
+
+
+def _query_task(body):
+    """
+    Task behind handle_query — yields once per visited node.
+
+    body:
+      path / id, recurse          search root (default '/', recursive)
+      family, type                exact filters
+      path_glob, name_glob        fnmatch patterns
+      where                       [{field, op, value}] — all must hold
+      select                      fields to return (default path, type)
+      group_by, aggregate         [fields], [{fn, field, name}] — fn in QUERY_AGGREGATES
+      order_by                    ['field' | '-field'] over the output columns
+      limit, offset               output window (after sorting)
+
+    Returns compact rows: {'columns': [...], 'rows': [[...], ...]}.
+    """
+    root, ref = _resolve_op(body, default='/')
+    if root is None:
+        return {'error': f'Node not found: {ref}'}
+
+    family = (body.get('family') or '').upper() or None
+    op_type = body.get('type')
+    path_glob = body.get('path_glob')
+    name_glob = body.get('name_glob')
+    select = list(body.get('select') or ['path', 'type'])
+    group_by = list(body.get('group_by') or [])
+    aggregate = list(body.get('aggregate') or [])
+    order_by = list(body.get('order_by') or [])
+    limit = int(body.get('limit', 100))
+    offset = int(body.get('offset', 0))
+
+    # Resolve every referenced field up front so typos fail fast
+    getters = {}
+    for field in select + group_by + [a.get('field') for a in aggregate if a.get('field')]:
+        get = _query_getter(field)
+        if get is None:
+            return {'error': f'Unknown field: {field}',
+                    'available': list(OP_FIELDS) + list(QUERY_METRICS) + ['par.<name>']}
+        getters[field] = get
+    predicates = []
+    for cond in body.get('where') or []:
+        field, op_name = cond.get('field', ''), cond.get('op', '==')
+        get, test = _query_getter(field), QUERY_OPS.get(op_name)
+        if get is None:
+            return {'error': f'Unknown field in where: {field}'}
+        if test is None:
+            return {'error': f'Unknown operator: {op_name}', 'available': list(QUERY_OPS)}
+        predicates.append((get, test, cond.get('value')))
+    for agg in aggregate:
+        if agg.get('fn') not in QUERY_AGGREGATES:
+            return {'error': f"Unknown aggregate: {agg.get('fn')}", 'available': list(QUERY_AGGREGATES)}
+
+    grouped = bool(group_by or aggregate)
+    if grouped:
+        columns = group_by + [a.get('name') or f"{a['fn']}_{a.get('field') or 'nodes'}" for a in aggregate]
+    else:
+        columns = select
+    for spec in order_by:
+        if spec.lstrip('-') not in columns:
+            return {'error': f'order_by field is not an output column: {spec}', 'columns': columns}
+
+    root_path = root.path
+    matched = 0
+    scanned = 0
+    rows = []
+    groups = OrderedDict()
+    stats = {}
+    for n in _walk(root, body.get('recurse', True), stats):
+        yield
+        if n is root:
+            continue
+        if not n.valid:
+            _walk_skip(stats)
+            continue
+        scanned += 1
+        if family and n.family != family:
+            continue
+        if op_type and n.type != op_type:
+            continue
+        if path_glob and not fnmatch.fnmatchcase(n.path, path_glob):
+            continue
+        if name_glob and not fnmatch.fnmatchcase(n.name, name_glob):
+            continue
+        try:
+            if not all(test(_query_value(get, n), value) for get, test, value in predicates):
+                continue
+        except TypeError:
+            continue
+
+        matched += 1
+        if grouped:
+            key = tuple(_query_value(getters[f], n) for f in group_by)
+            key = tuple(tuple(k) if isinstance(k, list) else k for k in key)
+            groups.setdefault(key, []).append(n)
+        else:
+            rows.append([_query_value(getters[f], n) for f in select])
+
+    for key, nodes in groups.items():
+        live = [n for n in nodes if n.valid]
+        _walk_skip(stats, len(nodes) - len(live))
+        if not live:
+            continue
+        nodes = live
+        row = list(key)
+        for agg in aggregate:
+            field = agg.get('field')
+            vals = [_query_value(getters[field], n) for n in nodes] if field else nodes
+            row.append(QUERY_AGGREGATES[agg['fn']](vals))
+        rows.append(row)
+
+    if order_by:
+        _sort_rows(rows, order_by, columns)
+
+    total = len(rows)
+    rows = rows[offset:offset + limit]
+    result = {
+        'root': root_path,
+        'columns': columns,
+        'rows': rows,
+        'count': len(rows),
+        'total': total,
+        'matched': matched,
+        'scanned': scanned,
+        'offset': offset,
+        'has_more': total > offset + len(rows),
+    }
+    if stats:
+        result['skipped'] = stats['skipped']
+    return result
 
 
-def handle_search_nodes(body):
-    query = body.get('query', '')
-    search_path = body.get('path', '/')
-    search_type = body.get('search_type', 'name')
-    limit = body.get('limit', 50)
-    if not query:
-        return {'error': 'Missing required field: query'}
-    root = op(search_path)
+# ─────────────────────────────────────────────────────────────
+# Census
+# ─────────────────────────────────────────────────────────────
+# One traversal that answers what list_families, get_errors and
+# cooking_info would each need a full walk for. Only counters and small
+# top-N heaps are kept per node, so memory stays flat on huge projects.
+
+def handle_census(body):
+    """Single-pass statistics for a subtree — see _census_task."""
+    return _run_task(_census_task(body))
+
+
+def _top_push(heap, top, value, seq, node):
+    """Keep the `top` largest (value, node) pairs in a min-heap."""
+    if len(heap) < top:
+        heapq.heappush(heap, (value, seq, node))
+    elif value > heap[0][0]:
+        heapq.heapreplace(heap, (value, seq, node))
+
+
+def _census_task(body):
+    """
+    Task behind handle_census — yields once per visited node.
+
+    body: path / id (default '/'), top (size of the top-N lists, default 10),
+    include_errors (default True — errors()/warnings() are the costly part),
+    error_samples (paths of erroring nodes to list, default 10).
+    """
+    root, ref = _resolve_op(body, default='/')
     if root is None:
-        return {'error': f'Search root not found: {search_path}'}
-    query_lower = query.lower()
-    results = []
-    def search_recursive(n):
-        if len(results) >= limit:
-            return
-        match = False
-        if search_type in ('name', 'all') and query_lower in n.name.lower():
-            match = True
-        if search_type in ('type', 'all') and query_lower in n.type.lower():
-            match = True
-        if search_type in ('family', 'all') and query_lower in n.family.lower():
-            match = True
-        if match:
-            results.append(_serialize_op(n))
+        return {'error': f'Node not found: {ref}'}
+    top = max(0, int(body.get('top', 10)))
+    include_errors = body.get('include_errors', True)
+    error_samples = max(0, int(body.get('error_samples', 10)))
+
+    families = {}
+    types = {}
+    by_depth = {}
+    total = depth_sum = 0
+    comps = locked = bypassed = 0
+    with_errors = with_warnings = 0
+    error_nodes = []
+    cook_total = cpu_total = 0.0
+    slowest = []
+    largest = []
+    stats = {}
+    root_path, root_id = root.path, root.id
+
+    stack = [(root, 0)]
+    while stack:
+        n, depth = stack.pop()
+        if not n.valid:
+            _walk_skip(stats)
+            continue
+        if n.isCOMP:
+            children = n.children
+            stack.extend((c, depth + 1) for c in reversed(children))
+        yield
+        if n is root:
+            continue
+        if not n.valid:
+            _walk_skip(stats)
+            continue
+
+        total += 1
+        depth_sum += depth
+        by_depth[depth] = by_depth.get(depth, 0) + 1
+        families[n.family] = families.get(n.family, 0) + 1
+        types[n.type] = types.get(n.type, 0) + 1
+        if n.lock:
+            locked += 1
+        if n.bypass:
+            bypassed += 1
         if n.isCOMP:
-            for child in n.children:
-                search_recursive(child)
-    search_recursive(root)
-    return {'query': query, 'search_type': search_type, 'count': len(results), 'nodes': results}
+            comps += 1
+            if top:
+                _top_push(largest, top, len(children), total, n)
+
+        cook = getattr(n, 'cookTime', 0) or 0
+        cook_total += cook
+        cpu_total += getattr(n, 'cpuCookTime', 0) or 0
+        if top and cook > 0:
+            _top_push(slowest, top, cook, total, n)
+
+        if include_errors:
+            if n.errors(recurse=False):
+                with_errors += 1
+                if len(error_nodes) < error_samples:
+                    error_nodes.append({'id': n.id, 'path': n.path})
+            if n.warnings(recurse=False):
+                with_warnings += 1
+
+    # The top-N lists hold nodes seen frames ago
+    slowest = [entry for entry in slowest if entry[2].valid]
+    largest = [entry for entry in largest if entry[2].valid]
+
+    result = {
+        'path': root_path,
+        'id': root_id,
+        'frame': absTime.frame,
+        'total_nodes': total,
+        'families': dict(sorted(families.items(), key=lambda kv: -kv[1])),
+        'types': dict(sorted(types.items(), key=lambda kv: -kv[1])),
+        'depth': {
+            'max': max(by_depth) if by_depth else 0,
+            'avg': round(depth_sum / total, 3) if total else 0,
+            'by_depth': by_depth,
+        },
+        'comps': comps,
+        'locked': locked,
+        'bypassed': bypassed,
+        'cook': {
+            'total_ms': round(cook_total, 3),
+            'cpu_total_ms': round(cpu_total, 3),
+            'top': [{'id': n.id, 'path': n.path, 'type': n.type, 'cookTime': v}
+                    for v, _, n in sorted(slowest, reverse=True)],
+        },
+        'largest_comps': [{'id': n.id, 'path': n.path, 'children': v}
+                          for v, _, n in sorted(largest, reverse=True)],
+    }
+    if include_errors:
+        result['errors'] = {
+            'nodes_with_errors': with_errors,
+            'nodes_with_warnings': with_warnings,
+            'samples': error_nodes,
+        }
+    if stats:
+        result['skipped'] = stats['skipped']
+    return result
 
 
 def handle_list_families(body):
-    path = body.get('path', '/')
-    root = op(path)
+    """List available operator families and types."""
+    return _run_task(_families_task(body))
+
+
+def _families_task(body):
+    """Task behind handle_list_families — yields once per visited node."""
+    root, ref = _resolve_op(body, default='/')
     if root is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+
     families = {}
-    def collect_types(n):
-        fam = n.family
-        if fam not in families:
-            families[fam] = set()
-        families[fam].add(n.type)
-        if n.isCOMP:
-            for child in n.children:
-                collect_types(child)
-    collect_types(root)
-    return {'families': {k: sorted(list(v)) for k, v in sorted(families.items())}}
+    stats = {}
+    if _index_ready():
+        for op_id in _index_subtree_ids(root.id):
+            entry = _index_entries.get(op_id)
+            if entry is not None:
+                families.setdefault(entry['family'], set()).add(entry['type'])
+    else:
+        for n in _walk(root, stats=stats):
+            fam = n.family
+            if fam not in families:
+                families[fam] = set()
+            families[fam].add(n.type)
+            yield
+
+    result = {
+        'families': {k: sorted(list(v)) for k, v in sorted(families.items())},
+    }
+    if stats:
+        result['skipped'] = stats['skipped']
+    return result
 
 
 def handle_python_help(body):
+    """Get Python help() output for a TD module/class."""
     target = body.get('target', '')
     if not target:
         return {'error': 'Missing required field: target (e.g. "td", "td.OP", "tdu")'}
-    import io
+
     old_stdout = sys.stdout
     captured = io.StringIO()
     sys.stdout = captured
+
     try:
         help(eval(target))
     except Exception as e:
@@ -749,13 +3870,17 @@ def handle_python_help(body):
         return {'error': f'Help failed for "{target}": {str(e)}'}
     finally:
         sys.stdout = old_stdout
+
     help_text = captured.getvalue()
+    # Truncate if too long
     if len(help_text) > 10000:
-        help_text = help_text[:10000] + '\n\n... (truncated)'
+        help_text = help_text[:10000] + '\n\n... (truncated, use more specific target)'
+
     return {'target': target, 'help': help_text}
 
 
 def handle_python_classes(body):
+    """List available TouchDesigner Python classes."""
     try:
         import td
         classes = [name for name in dir(td) if not name.startswith('_')]
@@ -765,18 +3890,23 @@ def handle_python_classes(body):
 
 
 def handle_timeline(body):
+    """Get timeline/playback state."""
     return {
-        'frame': absTime.frame, 'seconds': absTime.seconds,
-        'playing': project.realTime, 'fps': project.cookRate,
+        'frame': absTime.frame,
+        'seconds': absTime.seconds,
+        'playing': project.realTime,
+        'fps': project.cookRate,
         'start': project.cookRange[0] if hasattr(project, 'cookRange') else 1,
         'end': project.cookRange[1] if hasattr(project, 'cookRange') else 600,
     }
 
 
 def handle_timeline_set(body):
-    action = body.get('action')
+    """Control timeline playback."""
+    action = body.get('action')  # play, pause, frame
     frame = body.get('frame', None)
     fps = body.get('fps', None)
+
     if action == 'play':
         project.realTime = True
         return {'success': True, 'playing': True}
@@ -794,21 +3924,951 @@ def handle_timeline_set(body):
 
 
 def handle_pulse_param(body):
-    path = body.get('path')
+    """Pulse a pulse-type parameter."""
     param_name = body.get('param')
-    if not path or not param_name:
-        return {'error': 'Missing required fields: path and param'}
-    node = op(path)
+
+    node, ref = _resolve_op(body)
+    if ref is None or not param_name:
+        return {'error': 'Missing required fields: path (or id) and param'}
     if node is None:
-        return {'error': f'Node not found: {path}'}
+        return {'error': f'Node not found: {ref}'}
+
     p = getattr(node.par, param_name, None)
     if p is None:
-        return {'error': f'Parameter not found: {param_name} on {path}'}
+        return {'error': f'Parameter not found: {param_name} on {node.path}'}
+
     try:
         p.pulse()
-        return {'success': True, 'path': path, 'param': param_name}
+        _errors_touch(node)
+        return {'success': True, 'path': node.path, 'id': node.id, 'param': param_name}
     except Exception as e:
         return {'error': f'Failed to pulse: {str(e)}'}
+
+
+# ─────────────────────────────────────────────────────────────
+# Error Tracking
+# ─────────────────────────────────────────────────────────────
+# Error/warning state is tracked incrementally so "what broke since my
+# last check" costs O(changes), not a walk of the whole project:
+#
+#   - a background pass (frame hook) re-checks operators round-robin
+#     over the project, within ERROR_SLICE_MS and ERROR_SCAN_PER_FRAME;
+#   - nodes touched by the API (params, content, wiring, creation) and
+#     their direct outputs are re-checked on the next two frames — the
+#     cook that shows a new error happens after the edit — together with
+#     every node currently in error, so fixes show up right away.
+#
+# Every transition is an event with a gapless seq in a ring of the last
+# ERROR_EVENTS_SIZE; /api/errors/changes returns the events after a seq.
+#
+# Tracking only runs while it is used: it starts with the first errors
+# request and pauses when none came for ERROR_IDLE_S, so a show with no
+# client attached pays nothing. After a pause the baseline is rebuilt, and
+# anything that changed meanwhile shows up as events once that pass is done.
+
+_error_state = {}       # id -> {'path', 'type', 'errors', 'warnings'} of nodes with issues
+_error_events = deque(maxlen=ERROR_EVENTS_SIZE)
+_error_seq = itertools.count(1)
+_error_dirty = {}       # id -> frames left to re-check
+_error_scan = {'sweep': None, 'passes': 0, 'pass_frame': None, 'used': None}
+
+
+def _errors_emit(event, op_id, info):
+    _error_events.append({
+        'seq': next(_error_seq),
+        'frame': absTime.frame,
+        'event': event,
+        'id': op_id,
+        'path': info['path'],
+        'type': info['type'],
+        'errors': info['errors'],
+        'warnings': info['warnings'],
+    })
+
+
+def _errors_check(n):
+    """Re-read one operator's errors/warnings and record any transition."""
+    errs = n.errors(recurse=False)
+    warns = n.warnings(recurse=False)
+    old = _error_state.get(n.id)
+    if not errs and not warns:
+        if old is not None:
+            del _error_state[n.id]
+            _errors_emit('cleared', n.id, dict(old, errors='', warnings=''))
+        return
+    info = {'path': n.path, 'type': n.type, 'errors': errs, 'warnings': warns}
+    if old is None:
+        _error_state[n.id] = info
+        _errors_emit('raised', n.id, info)
+    elif old['errors'] != errs or old['warnings'] != warns:
+        _error_state[n.id] = info
+        _errors_emit('changed', n.id, info)
+
+
+def _errors_touch(node):
+    """Re-check node and its direct outputs over the next frames."""
+    _error_dirty[node.id] = 2
+    for connector in node.outputConnectors:
+        for conn in connector.connections:
+            _error_dirty[conn.owner.id] = 2
+
+
+def _errors_forget(node):
+    """Drop a node that is about to be deleted (and its subtree) from the state."""
+    prefix = node.path.rstrip('/') + '/'
+    for op_id, info in list(_error_state.items()):
+        if op_id == node.id or info['path'].startswith(prefix):
+            del _error_state[op_id]
+            _errors_emit('removed', op_id, dict(info, errors='', warnings=''))
+
+
+def _errors_recheck():
+    """Re-check dirty nodes, plus everything in error while anything is dirty."""
+    if not _error_dirty:
+        return
+    ids = set(_error_dirty) | set(_error_state)
+    for op_id, left in list(_error_dirty.items()):
+        if left <= 1:
+            del _error_dirty[op_id]
+        else:
+            _error_dirty[op_id] = left - 1
+    for op_id in ids:
+        n = _op_by_id(op_id)
+        if n is None:
+            info = _error_state.pop(op_id, None)
+            if info is not None:
+                _errors_emit('removed', op_id, dict(info, errors='', warnings=''))
+        else:
+            _errors_check(n)
+
+
+def _errors_sweep():
+    """One full pass over the project — yields once per operator."""
+    for n in _walk(op('/')):
+        _errors_check(n)
+        yield
+    _error_scan['passes'] += 1
+    _error_scan['pass_frame'] = absTime.frame
+
+
+def _errors_active():
+    used = _error_scan['used']
+    return used is not None and time.time() - used < ERROR_IDLE_S
+
+
+def _errors_use():
+    """Note an errors request — (re)starts tracking with a fresh baseline pass if paused."""
+    if not _errors_active():
+        _error_scan['sweep'] = None
+        _error_scan['passes'] = 0
+        _error_scan['pass_frame'] = None
+    _error_scan['used'] = time.time()
+
+
+def _errors_tick(frame):
+    """Frame hook: while tracking is in use, re-check touched nodes, then advance the background pass."""
+    if not _errors_active():
+        return
+    _errors_recheck()
+    deadline = time.perf_counter() + ERROR_SLICE_MS / 1000.0
+    for _ in range(ERROR_SCAN_PER_FRAME):
+        if time.perf_counter() >= deadline:
+            break
+        if _error_scan['sweep'] is None:
+            _error_scan['sweep'] = _errors_sweep()
+        try:
+            next(_error_scan['sweep'])
+        except StopIteration:
+            _error_scan['sweep'] = None
+            break
+
+
+def _errors_latest_seq():
+    return _error_events[-1]['seq'] if _error_events else 0
+
+
+def handle_error_changes(body):
+    """
+    Error/warning transitions after seq `after` (default 0 = all kept).
+
+    body: after, limit (default 500), path / id (only nodes at or under it),
+    include_current (also list every node currently with issues).
+    Events are 'raised', 'changed', 'cleared' or 'removed' (node deleted).
+    Until the first background pass completes (baseline_complete), nodes
+    nobody touched may not have been checked yet.
+    """
+    _errors_use()
+    if time.time() - _last_frame_tick > JOB_POLL_PUMP_S:
+        # No Execute DAT ticking: catch up synchronously
+        _errors_recheck()
+        if not _error_scan['passes']:
+            _run_task(_errors_sweep())
+            _error_scan['sweep'] = None
+
+    after = int(body.get('after', 0))
+    limit = int(body.get('limit', 500))
+    root = None
+    if body.get('path') is not None or body.get('id') is not None:
+        node, ref = _resolve_op(body)
+        if node is None:
+            return {'error': f'Node not found: {ref}'}
+        root = node.path
+    prefix = root.rstrip('/') + '/' if root else None
+    under = lambda path: prefix is None or path == root or path.startswith(prefix)
+
+    events = list(_error_events)
+    latest = _errors_latest_seq()
+    oldest = events[0]['seq'] if events else after + 1
+    selected = []
+    next_seq = after
+    for event in itertools.islice(events, max(0, after - oldest + 1), None):
+        next_seq = event['seq']
+        if under(event['path']):
+            selected.append(event)
+            if len(selected) >= limit:
+                break
+
+    current = [dict(info, id=op_id) for op_id, info in _error_state.items() if under(info['path'])]
+    result = {
+        'events': selected,
+        'count': len(selected),
+        'next': next_seq,
+        'latest': latest,
+        'dropped': max(0, oldest - after - 1),
+        'has_more': next_seq < latest,
+        'baseline_complete': _error_scan['passes'] > 0,
+        'pass_frame': _error_scan['pass_frame'],
+        'nodes_with_errors': sum(1 for c in current if c['errors']),
+        'nodes_with_warnings': sum(1 for c in current if c['warnings']),
+    }
+    if body.get('include_current'):
+        result['current'] = current
+    return result
+
+
+# ─────────────────────────────────────────────────────────────
+# Log Capture
+# ─────────────────────────────────────────────────────────────
+# sys.stdout / sys.stderr are teed into a ring of the last LOG_RING_SIZE
+# lines, and a handler on the root logger adds `logging` records. So
+# output from Execute DATs, extensions and callbacks — not just from
+# exec_python — can be tailed through /api/logs. Entries carry a gapless
+# sequence number: a client passes the last one it saw as `after` and
+# gets only newer lines back.
+#
+# Source is the DAT whose code printed (TD compiles DAT scripts with the
+# operator path as filename), the logger name, or 'python'. The tee and the
+# handler run on whichever thread writes, and TD objects are main-thread
+# only: lines written from other threads carry no frame, and printed ones
+# no source.
+
+LOG_LEVELS = ('debug', 'info', 'warning', 'error')
+
+_log_ring = deque(maxlen=LOG_RING_SIZE)
+_log_seq = itertools.count(1)
+_log_lock = threading.Lock()
+_log_sources = {}   # code filename -> source label
+
+
+def _log_append(level, source, text):
+    frame = absTime.frame if threading.current_thread() is threading.main_thread() else None
+    with _log_lock:
+        _log_ring.append({
+            'seq': next(_log_seq),
+            'time': round(time.time(), 3),
+            'frame': frame,
+            'level': level,
+            'source': source,
+            'text': text[:LOG_LINE_MAX],
+        })
+
+
+def _log_source():
+    """Operator path (or 'python') of the code that is writing — None off the main thread."""
+    if threading.current_thread() is not threading.main_thread():
+        return None
+    frame = sys._getframe(2)
+    for _ in range(12):
+        if frame is None:
+            break
+        filename = frame.f_code.co_filename
+        if filename != _log_source.__code__.co_filename and not filename.startswith('<'):
+            source = _log_sources.get(filename)
+            if source is None:
+                try:
+                    source = filename if op(filename) is not None else 'python'
+                except Exception:
+                    source = 'python'
+                _log_sources[filename] = source
+            if source != 'python':
+                return source
+        frame = frame.f_back
+    return 'python'
+
+
+class _LogTee:
+    """File-like wrapper that forwards writes and records complete lines."""
+
+    _td_mcp_tee = True
+
+    def __init__(self, stream, level):
+        self._stream = stream
+        self._level = level
+        self._partial = ''
+
+    def write(self, text):
+        self._stream.write(text)
+        if not text:
+            return 0
+        with _log_lock:
+            lines = (self._partial + text).split('\n')
+            self._partial = lines.pop()
+        if lines:
+            source = _log_source()
+            for line in lines:
+                if line.strip():
+                    _log_append(self._level, source, line)
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class _LogHandler(logging.Handler):
+    """Root-logger handler feeding the log ring."""
+
+    _td_mcp_tee = True
+
+    def emit(self, record):
+        level = 'debug' if record.levelno < logging.INFO else \
+            'info' if record.levelno < logging.WARNING else \
+            'warning' if record.levelno < logging.ERROR else 'error'
+        try:
+            _log_append(level, record.name, self.format(record))
+        except Exception:
+            pass
+
+
+def _own_stream(stream):
+    """stream without this module's tee, if a previous install wrapped it."""
+    return stream._stream if getattr(stream, '_td_mcp_tee', False) else stream
+
+
+def _install_log_capture():
+    """Tee stdout/stderr and hook logging — replacing a previous install on module reload."""
+    sys.stdout = _LogTee(_own_stream(sys.stdout), 'info')
+    sys.stderr = _LogTee(_own_stream(sys.stderr), 'error')
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if getattr(h, '_td_mcp_tee', False)]:
+        root.removeHandler(handler)
+    root.addHandler(_LogHandler())
+
+
+def handle_logs(body):
+    """
+    Log lines newer than `after` (a seq number; default 0 = all kept).
+
+    body: after, limit (default 200), min_level ('debug' … 'error'),
+    source (fnmatch glob, e.g. '/project1/*'), contains (substring).
+    Returns entries plus `next` (pass it as `after` to continue), `latest`,
+    and `dropped` — lines after `after` that already left the ring.
+    """
+    after = int(body.get('after', 0))
+    limit = int(body.get('limit', 200))
+    min_level = body.get('min_level', 'debug')
+    if min_level not in LOG_LEVELS:
+        return {'error': f'Unknown level: {min_level}', 'available': list(LOG_LEVELS)}
+    levels = LOG_LEVELS[LOG_LEVELS.index(min_level):]
+    source = body.get('source')
+    contains = body.get('contains')
+
+    with _log_lock:
+        ring = list(_log_ring)
+    latest = ring[-1]['seq'] if ring else after
+    oldest = ring[0]['seq'] if ring else after + 1
+    dropped = max(0, oldest - after - 1)
+
+    entries = []
+    next_seq = after
+    for entry in itertools.islice(ring, max(0, after - oldest + 1), None):
+        next_seq = entry['seq']
+        if (entry['level'] in levels
+                and (not source or fnmatch.fnmatchcase(entry['source'] or '', source))
+                and (not contains or contains in entry['text'])):
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+    return {
+        'entries': entries,
+        'count': len(entries),
+        'next': next_seq,
+        'latest': latest,
+        'dropped': dropped,
+        'has_more': next_seq < latest,
+    }
+
+
+# ─────────────────────────────────────────────────────────────
+# Frame-Sliced Jobs
+# ─────────────────────────────────────────────────────────────
+# Long operations run as jobs: task generators that yield after each
+# small unit of work. onFrameStart() (called from the Execute DAT in
+# mcp_execute_callbacks.py) advances running jobs round-robin until the
+# per-frame budget JOB_SLICE_MS is spent, so a scan of a huge project is
+# spread across many frames instead of freezing TD inside one callback.
+#
+# A task may `yield NEXT_FRAME` to stop slicing until the next frame.
+
+NEXT_FRAME = object()
+
+_jobs = OrderedDict()
+_job_queue = deque()
+_job_ids = itertools.count(1)
+_last_frame_tick = 0.0
+
+
+def _export_task(body):
+    """Serialize a whole subtree (optionally with parameters)."""
+    include_params = body.get('include_params', False)
+    root, ref = _resolve_op(body, default='/')
+    if root is None:
+        return {'error': f'Node not found: {ref}'}
+
+    fields, error = _parse_fields(body, NODE_FIELDS)
+    if error:
+        return error
+
+    path, root_id = root.path, root.id
+    nodes = []
+    stats = {}
+    for n in _walk(root, body.get('recurse', True), stats):
+        nodes.append(_serialize_op(n, include_params=include_params, fields=fields))
+        yield
+    result = {'path': path, 'id': root_id, 'count': len(nodes), 'nodes': nodes}
+    if stats:
+        result['skipped'] = stats['skipped']
+    return result
+
+
+def _build_task(body):
+    """
+    Create many nodes, then wire them — one node or connection per step.
+
+    body: {
+      parent_path | parent_id,
+      nodes: [{node_type, name, nodeX, nodeY, params: {name: value}}],
+      connections: [{source, target, source_index, target_index}]
+    }
+    Connection endpoints are names of nodes created by this build, or paths.
+    Nodes deleted while the build runs are reported as failures.
+    """
+    parent_node, parent_ref = _resolve_op(body, 'parent_path', 'parent_id', default='/project1')
+    if parent_node is None:
+        return {'error': f'Parent node not found: {parent_ref}'}
+    if not parent_node.isCOMP:
+        return {'error': f'Parent is not a COMP: {parent_ref}'}
+
+    parent_path = parent_node.path
+    created = {}
+    nodes = []
+    failures = []
+    for i, spec in enumerate(body.get('nodes', [])):
+        if not parent_node.valid:
+            failures.append({'index': i, 'node_type': spec.get('node_type'),
+                             'error': f'Parent was deleted: {parent_path}'})
+            continue
+        try:
+            new_node = _remember_op(parent_node.create(spec['node_type'], spec.get('name')))
+            _index_add(new_node)
+            if spec.get('nodeX') is not None:
+                new_node.nodeX = int(spec['nodeX'])
+            if spec.get('nodeY') is not None:
+                new_node.nodeY = int(spec['nodeY'])
+            for name, value in spec.get('params', {}).items():
+                p = getattr(new_node.par, name, None)
+                if p is None:
+                    failures.append({'node': new_node.name, 'param': name, 'error': 'Parameter not found'})
+                elif isinstance(value, dict) and 'expr' in value:
+                    p.expr = value['expr']
+                elif isinstance(value, dict) and 'val' in value:
+                    p.val = value['val']
+                else:
+                    p.val = value
+            _errors_touch(new_node)
+            created[spec.get('name') or new_node.name] = new_node
+            nodes.append({'id': new_node.id, 'name': new_node.name, 'path': new_node.path})
+        except Exception as e:
+            failures.append({'index': i, 'node_type': spec.get('node_type'), 'error': str(e)})
+        yield
+
+    connections = 0
+    for conn in body.get('connections', []):
+        try:
+            source = created.get(conn['source']) or op(conn['source'])
+            target = created.get(conn['target']) or op(conn['target'])
+            if source is None or target is None:
+                raise ValueError(f'Unknown endpoint in {conn["source"]} -> {conn["target"]}')
+            if not (source.valid and target.valid):
+                raise ValueError(f'Endpoint was deleted in {conn["source"]} -> {conn["target"]}')
+            source.outputConnectors[conn.get('source_index', 0)].connect(
+                target.inputConnectors[conn.get('target_index', 0)])
+            _errors_touch(target)
+            connections += 1
+        except Exception as e:
+            failures.append({'connection': conn, 'error': str(e)})
+        yield
+
+    return {
+        'success': not failures,
+        'parent': parent_path,
+        'created': nodes,
+        'connections': connections,
+        'failures': failures,
+    }
+
+
+# ─── Waits ──────────────────────────────────────────────────
+#
+# A wait is a job whose task checks its conditions once per frame and
+# yields NEXT_FRAME in between, so "wait until this shader compiles" costs
+# TD one cheap check a frame instead of a stream of client polls.
+
+def _wait_no_errors(cond):
+    node, ref = _resolve_op(cond)
+    if node is None:
+        return False, f'Node not found: {ref}'
+    recurse = cond.get('recurse', False)
+    issues = node.errors(recurse=recurse)
+    if cond.get('include_warnings'):
+        issues = issues or node.warnings(recurse=recurse)
+    return not issues, issues[:500]
+
+
+def _wait_cooked(cond):
+    node, ref = _resolve_op(cond)
+    if node is None:
+        return False, f'Node not found: {ref}'
+    return node.cookFrame > cond['after_frame'], node.cookFrame
+
+
+def _wait_param(cond):
+    node, ref = _resolve_op(cond)
+    if node is None:
+        return False, f'Node not found: {ref}'
+    p = getattr(node.par, cond['par'], None)
+    if p is None:
+        return False, f"Parameter not found: {cond['par']}"
+    value = p.eval()
+    return bool(QUERY_OPS[cond.get('op', '==')](value, cond.get('value'))), _wait_observed(value)
+
+
+def _wait_frame(cond):
+    return absTime.frame >= cond['frame'], absTime.frame
+
+
+def _wait_exists(cond):
+    node, _ = _resolve_op(cond)
+    return (node is not None) == cond.get('exists', True), node.path if node is not None else None
+
+
+def _wait_expr(cond):
+    value = eval(cond['expr'], {'op': op, 'ops': ops, 'absTime': absTime, 'project': project, 'app': app})
+    return bool(value), _wait_observed(value)
+
+
+def _wait_observed(value):
+    return value if value is None or isinstance(value, (bool, int, float, str)) else repr(value)
+
+
+# type -> (checker, required keys)
+WAIT_CONDITIONS = {
+    'no_errors': (_wait_no_errors, ()),
+    'cooked':    (_wait_cooked, ('after_frame',)),
+    'param':     (_wait_param, ('par',)),
+    'frame':     (_wait_frame, ('frame',)),
+    'exists':    (_wait_exists, ()),
+    'expr':      (_wait_expr, ('expr',)),
+}
+WAIT_NEEDS_NODE = ('no_errors', 'cooked', 'param', 'exists')
+
+
+def _wait_validate(body):
+    """Error dict for a malformed wait, else None."""
+    conditions = body.get('conditions')
+    if not conditions:
+        return {'error': 'Missing required field: conditions'}
+    if body.get('mode', 'all') not in ('all', 'any'):
+        return {'error': "mode must be 'all' or 'any'"}
+    for i, cond in enumerate(conditions):
+        entry = WAIT_CONDITIONS.get(cond.get('type'))
+        if entry is None:
+            return {'error': f"conditions[{i}]: unknown type {cond.get('type')!r}", 'available': list(WAIT_CONDITIONS)}
+        missing = [k for k in entry[1] if cond.get(k) is None]
+        if cond['type'] in WAIT_NEEDS_NODE and cond.get('path') is None and cond.get('id') is None:
+            missing.append('path or id')
+        if missing:
+            return {'error': f"conditions[{i}] ({cond['type']}): missing {', '.join(missing)}"}
+        if cond['type'] == 'param' and cond.get('op', '==') not in QUERY_OPS:
+            return {'error': f"conditions[{i}]: unknown op {cond.get('op')!r}", 'available': list(QUERY_OPS)}
+        if cond['type'] == 'expr':
+            try:
+                compile(cond['expr'], '<wait>', 'eval')
+            except SyntaxError as e:
+                return {'error': f'conditions[{i}]: invalid expression: {e}'}
+    return None
+
+
+def _wait_check(body):
+    """(satisfied, per-condition states) for the current frame."""
+    states = []
+    for cond in body['conditions']:
+        try:
+            ok, observed = WAIT_CONDITIONS[cond['type']][0](cond)
+        except Exception as e:
+            ok, observed = False, f'{type(e).__name__}: {e}'
+        states.append({'type': cond['type'], 'ok': ok, 'observed': observed})
+    combine = any if body.get('mode', 'all') == 'any' else all
+    return combine(s['ok'] for s in states), states
+
+
+def _wait_task(body):
+    """
+    Task behind waits — checks the conditions once per frame until they
+    hold or `timeout` seconds (default 30) pass.
+
+    body: conditions [{type, ...}] (see WAIT_CONDITIONS), mode 'all' | 'any'
+    """
+    error = _wait_validate(body)
+    if error:
+        return error
+    timeout = float(body.get('timeout', 30))
+    started = time.perf_counter()
+    start_frame = absTime.frame
+    while True:
+        satisfied, states = _wait_check(body)
+        elapsed = time.perf_counter() - started
+        if satisfied or elapsed >= timeout:
+            return {
+                'satisfied': satisfied,
+                'timed_out': not satisfied,
+                'frame': absTime.frame,
+                'frames_waited': absTime.frame - start_frame,
+                'elapsed_s': round(elapsed, 3),
+                'conditions': states,
+            }
+        yield NEXT_FRAME
+
+
+def handle_wait(body):
+    """
+    Wait for conditions inside TD. Already-true conditions answer at once;
+    otherwise a 'wait' job is started and its job info returned.
+    """
+    error = _wait_validate(body)
+    if error:
+        return error
+    satisfied, states = _wait_check(body)
+    if satisfied:
+        return {'satisfied': True, 'timed_out': False, 'frame': absTime.frame,
+                'frames_waited': 0, 'elapsed_s': 0.0, 'conditions': states}
+    return handle_jobs_submit({'kind': 'wait', 'params': body})
+
+
+JOB_KINDS = {
+    'errors':   _errors_task,
+    'cooking':  _cooking_task,
+    'search':   _search_task,
+    'families': _families_task,
+    'query':    _query_task,
+    'census':   _census_task,
+    'export':   _export_task,
+    'build':    _build_task,
+    'wait':     _wait_task,
+}
+
+
+def _job_info(job, include_result=False):
+    """Public view of a job record."""
+    info = {
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'state': job['state'],
+        'steps': job['steps'],
+        'cpu_ms': round(job['cpu_ms'], 3),
+        'frames': job['frames'],
+        'submitted_frame': job['submitted_frame'],
+        'finished_frame': job['finished_frame'],
+    }
+    if job['error']:
+        info['error_detail'] = job['error']
+    if include_result and job['state'] == 'done':
+        info['result'] = job['result']
+    return info
+
+
+def _finish_job(job, state, result=None, error=None):
+    job['state'] = state
+    job['result'] = result
+    job['error'] = error
+    job['gen'] = None
+    job['finished_frame'] = absTime.frame
+
+    finished = [j for j in _jobs.values() if j['gen'] is None]
+    for old in finished[:max(0, len(finished) - JOB_KEEP_FINISHED)]:
+        del _jobs[old['id']]
+
+
+def _advance_jobs(frame=None):
+    """Advance running jobs round-robin until this frame's budget is spent."""
+    deadline = time.perf_counter() + JOB_SLICE_MS / 1000.0
+    for _ in range(len(_job_queue)):
+        if time.perf_counter() >= deadline:
+            break
+        job = _jobs.get(_job_queue.popleft())
+        if job is None or job['gen'] is None:
+            continue
+
+        job['state'] = 'running'
+        job['frames'] += 1
+        start = time.perf_counter()
+        try:
+            while time.perf_counter() < deadline:
+                step = next(job['gen'])
+                job['steps'] += 1
+                if step is NEXT_FRAME:
+                    break
+        except StopIteration as stop:
+            _finish_job(job, 'done', result=stop.value)
+        except Exception as e:
+            _finish_job(job, 'error', error={'error': str(e), 'type': type(e).__name__,
+                                             'traceback': traceback.format_exc()})
+        job['cpu_ms'] += (time.perf_counter() - start) * 1000.0
+
+        if job['gen'] is not None:
+            _job_queue.append(job['id'])
+
+
+def _pump_jobs_if_idle():
+    """Advance jobs from a poll when no Execute DAT is ticking them."""
+    if _job_queue and time.time() - _last_frame_tick > JOB_POLL_PUMP_S:
+        _advance_jobs()
+
+
+def onFrameStart(frame):
+    """Per-frame entry point, called from the Execute DAT."""
+    global _last_frame_tick
+    _last_frame_tick = time.time()
+    for hook in FRAME_HOOKS:
+        try:
+            hook(frame)
+        except Exception:
+            traceback.print_exc()
+
+
+def handle_jobs_submit(body):
+    """Submit a long-running operation as a frame-sliced job."""
+    kind = body.get('kind')
+    task = JOB_KINDS.get(kind)
+    if task is None:
+        return {'error': f'Unknown job kind: {kind}', 'available': sorted(JOB_KINDS)}
+
+    job_id = next(_job_ids)
+    _jobs[job_id] = {
+        'id': job_id,
+        'kind': kind,
+        'state': 'queued',
+        'gen': task(body.get('params', {})),
+        'steps': 0,
+        'cpu_ms': 0.0,
+        'frames': 0,
+        'submitted_frame': absTime.frame,
+        'finished_frame': None,
+        'result': None,
+        'error': None,
+    }
+    _job_queue.append(job_id)
+    return _job_info(_jobs[job_id])
+
+
+def _job_by_id(job_id):
+    """The job with that id, or None (also for ids that are not integers)."""
+    try:
+        return _jobs.get(int(job_id))
+    except (TypeError, ValueError):
+        return None
+
+
+def handle_jobs_status(body):
+    """Get the state and progress of one job, or list all jobs."""
+    _pump_jobs_if_idle()
+    job_id = body.get('job_id')
+    if job_id is None:
+        return {'jobs': [_job_info(j) for j in _jobs.values()]}
+    job = _job_by_id(job_id)
+    if job is None:
+        return {'error': f'Job not found: {job_id}'}
+    return _job_info(job)
+
+
+def handle_jobs_result(body):
+    """Collect a finished job's result (the job is forgotten unless keep=true)."""
+    _pump_jobs_if_idle()
+    job_id = body.get('job_id')
+    job = _job_by_id(job_id)
+    if job is None:
+        return {'error': f'Job not found: {job_id}'}
+    info = _job_info(job, include_result=True)
+    if job['gen'] is None and not body.get('keep', False):
+        del _jobs[job['id']]
+    return info
+
+
+def handle_jobs_cancel(body):
+    """Cancel a queued or running job."""
+    job_id = body.get('job_id')
+    job = _job_by_id(job_id)
+    if job is None:
+        return {'error': f'Job not found: {job_id}'}
+    if job['gen'] is not None:
+        job['gen'].close()
+        _finish_job(job, 'cancelled')
+    return _job_info(job)
+
+
+def handle_diagnostics(body):
+    """Per-route timing and size stats, recent requests, and the slow-request log."""
+    recent = int(body.get('recent', 20))
+    routes = {}
+    for route, st in sorted(_route_stats.items()):
+        calls = st['calls'] or 1
+        routes[route] = {
+            'calls': st['calls'],
+            'errors': st['errors'],
+            'avg_handler_ms': round(st['handler_ms'] / calls, 3),
+            'max_handler_ms': round(st['max_handler_ms'], 3),
+            'avg_serialize_ms': round(st['serialize_ms'] / calls, 3),
+            'avg_bytes': st['bytes'] // calls,
+            'max_bytes': st['max_bytes'],
+            'not_modified': st['not_modified'],
+        }
+
+    result = {
+        'frame': absTime.frame,
+        'slow_threshold_ms': SLOW_REQUEST_MS,
+        'routes': routes,
+        'recent': list(_recent_requests)[-recent:] if recent > 0 else [],
+        'slow': list(_slow_requests),
+        'index': _index_status(),
+        'op_cache': dict(_op_record_stats, size=len(_op_records), max=OP_RECORD_CACHE_MAX),
+    }
+
+    if body.get('reset', False):
+        _route_stats.clear()
+        _recent_requests.clear()
+        _slow_requests.clear()
+        _op_record_stats.update(hits=0, misses=0)
+        result['reset'] = True
+
+    return result
+
+
+# ─────────────────────────────────────────────────────────────
+# Route Table & Pipeline (built once at module load)
+# ─────────────────────────────────────────────────────────────
+
+ROUTES = {
+    '/api/health':              handle_health,
+    '/api/info':                handle_info,
+    '/api/diagnostics':         handle_diagnostics,
+    '/api/nodes':               handle_get_nodes,
+    '/api/node/detail':         handle_get_node_detail,
+    '/api/node/params':         handle_get_params,
+    '/api/node/params/set':     handle_set_params,
+    '/api/node/params/schema':  handle_get_param_schema,
+    '/api/node/create':         handle_create_node,
+    '/api/node/delete':         handle_delete_node,
+    '/api/node/connect':        handle_connect_nodes,
+    '/api/node/disconnect':     handle_disconnect_nodes,
+    '/api/node/connections':    handle_get_connections,
+    '/api/node/errors':         handle_get_errors,
+    '/api/errors/changes':      handle_error_changes,
+    '/api/node/content':        handle_get_content,
+    '/api/node/content/set':    handle_set_content,
+    '/api/node/content/patch':  handle_patch_content,
+    '/api/node/copy':           handle_copy_node,
+    '/api/node/rename':         handle_rename_node,
+    '/api/node/flags':          handle_set_flags,
+    '/api/exec':                handle_exec_python,
+    '/api/screenshot':          handle_screenshot,
+    '/api/chop/data':           handle_chop_data,
+    '/api/sop/data':            handle_sop_data,
+    '/api/cooking':             handle_cooking_info,
+    '/api/search':              handle_search_nodes,
+    '/api/query':               handle_query,
+    '/api/census':              handle_census,
+    '/api/layout/free':         handle_layout_free,
+    '/api/layout/overlaps':     handle_layout_overlaps,
+    '/api/layout/bounds':       handle_layout_bounds,
+    '/api/families':            handle_list_families,
+    '/api/python/help':         handle_python_help,
+    '/api/python/classes':      handle_python_classes,
+    '/api/timeline':            handle_timeline,
+    '/api/timeline/set':        handle_timeline_set,
+    '/api/pulse':               handle_pulse_param,
+    '/api/jobs/submit':         handle_jobs_submit,
+    '/api/jobs/status':         handle_jobs_status,
+    '/api/jobs/result':         handle_jobs_result,
+    '/api/jobs/cancel':         handle_jobs_cancel,
+    '/api/wait':                handle_wait,
+    '/api/logs':                handle_logs,
+    '/api/resources/versions':  handle_resource_versions,
+}
+
+# Read routes that honour If-None-Match → 304 Not Modified
+ETAG_ROUTES = {
+    '/api/nodes':               _version_nodes,
+    '/api/node/content':        _version_content,
+}
+
+MIDDLEWARE = [
+    _stats_middleware,
+    _serialize_middleware,
+    _conditional_middleware,
+    _error_middleware,
+]
+
+_PIPELINE = _build_pipeline(MIDDLEWARE, _dispatch)
+
+FRAME_HOOKS = [
+    _advance_jobs,
+    _index_tick,
+    _errors_tick,
+]
+
+_install_log_capture()
+'''
+
+EXECUTE_CODE = r'''"""
+TouchDesigner MCP Execute DAT Callbacks
+========================================
+Paste this into an Execute DAT inside the 'mcp_server' COMP, next to the
+WebServer DAT, with the Frame Start toggle On.
+
+It forwards every frame start to the callbacks DAT, which uses it to
+advance background jobs a bounded slice at a time.
+
+Compatible with TouchDesigner 2025.30000+
+"""
+
+CALLBACKS_DAT = 'callbacks'
+
+
+def onFrameStart(frame):
+    op(CALLBACKS_DAT).module.onFrameStart(frame)
+    return
 '''
 
 # ═══════════════════════════════════════════════════════════════
@@ -819,20 +4879,12 @@ INFO_TEXT = """TouchDesigner MCP Server v1.0.0
 ================================
 Status: ACTIVE
 Port: {port}
-Endpoints: 28
+Endpoints: {endpoints}
 
 Test: http://localhost:{port}/api/health
 
-Tools available:
-  td_get_info, td_get_nodes, td_get_node_detail,
-  td_get_params, td_set_params, td_create_node,
-  td_delete_node, td_copy_node, td_rename_node,
-  td_connect_nodes, td_disconnect, td_get_connections,
-  td_get_content, td_set_content, td_exec_python,
-  td_screenshot, td_chop_data, td_sop_data,
-  td_cooking_info, td_search_nodes, td_get_errors,
-  td_list_families, td_python_help, td_python_classes,
-  td_timeline, td_timeline_set, td_pulse_param
+The 'execute' DAT forwards Frame Start to the callbacks, which advance
+background jobs, the scene index and error tracking a slice per frame.
 
 MCP Server command (for Claude Desktop):
   uvx --from /path/to/touchdesigner-mcp touchdesigner-mcp
@@ -893,16 +4945,31 @@ def build_mcp_component():
     callbacks_dat.text = CALLBACKS_CODE
     callbacks_dat.viewer = True
     print(f"  Created: {callbacks_dat.path} ({len(CALLBACKS_CODE)} chars)")
+    endpoints = len(callbacks_dat.module.ROUTES)
 
-    # 4. Create the Info Text DAT
+    # 4. Create the Execute DAT that drives per-frame work
+    execute_dat = mcp_comp.create('executeDAT', 'execute')
+    execute_dat.nodeX = 300
+    execute_dat.nodeY = -150
+    execute_dat.text = EXECUTE_CODE
+    execute_dat.par.framestart = True
+    execute_dat.par.active = True
+    print(f"  Created: {execute_dat.path} (Frame Start on)")
+
+    # 5. Create the Info Text DAT
     info_dat = mcp_comp.create('textDAT', 'info')
     info_dat.nodeX = 600
     info_dat.nodeY = 0
-    info_dat.text = INFO_TEXT.format(port=MCP_PORT)
+    info_dat.text = INFO_TEXT.format(port=MCP_PORT, endpoints=endpoints)
     info_dat.viewer = True
     print(f"  Created: {info_dat.path}")
 
-    # 5. Final status
+    # 6. Optionally save the COMP as the distributable .tox
+    if EXPORT_TOX_PATH:
+        mcp_comp.save(EXPORT_TOX_PATH)
+        print(f"  Saved:   {EXPORT_TOX_PATH}")
+
+    # 7. Final status
     print("")
     print("=" * 55)
     print("  MCP SERVER READY")
@@ -911,7 +4978,8 @@ def build_mcp_component():
     print(f"  WebServer:  {webserver.path}")
     print(f"  Port:       {MCP_PORT}")
     print(f"  Callbacks:  {callbacks_dat.path}")
-    print(f"  Endpoints:  28 API handlers")
+    print(f"  Execute:    {execute_dat.path}")
+    print(f"  Endpoints:  {endpoints} API handlers")
     print("")
     print(f"  Test URL:   http://localhost:{MCP_PORT}/api/health")
     print("")
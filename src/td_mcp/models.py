@@ -4,7 +4,9 @@ Pydantic Input Models for TouchDesigner MCP Tools
 All input validation, constraints, and descriptions for every tool.
 """
 
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+import re
+
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
@@ -15,6 +17,12 @@ class ResponseFormat(str, Enum):
     JSON = "json"
 
 
+class TreeFormat(str, Enum):
+    """Shape of a multi-level node listing."""
+    NESTED = "nested"
+    FLAT = "flat"
+
+
 # ─────────────────────────────────────────────────────────────
 # Environment / Info
 # ─────────────────────────────────────────────────────────────
@@ -24,6 +32,133 @@ class EmptyInput(BaseModel):
     model_config = ConfigDict(extra='forbid')
 
 
+class CensusInput(BaseModel):
+    """Input for a single-pass subtree census."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    path: str = Field(default="/", description="Root of the subtree to survey")
+    id: Optional[int] = Field(default=None, ge=0, description="Numeric operator id of the root (instead of path)")
+    top: int = Field(default=10, ge=0, le=100, description="Size of the slowest-cooking and largest-COMP lists")
+    include_errors: bool = Field(
+        default=True,
+        description="Count nodes with errors/warnings (the most expensive part on very large projects)"
+    )
+    error_samples: int = Field(default=10, ge=0, le=200, description="Paths of erroring nodes to list")
+
+
+# ─────────────────────────────────────────────────────────────
+# Node References (path or stable operator id)
+# ─────────────────────────────────────────────────────────────
+
+OP_ID_DESCRIPTION = (
+    "Numeric operator id (returned as 'id' by every tool). Stays valid when the node "
+    "is renamed or moved. Takes precedence over the path when both are given."
+)
+
+
+CURSOR_DESCRIPTION = (
+    "Opaque next_cursor from the previous page. Resumes exactly where that page stopped, "
+    "without repeats or gaps when nodes are added or deleted in between. Keep the other "
+    "arguments the same between pages."
+)
+
+
+def _require_ref(path: Optional[str], op_id: Optional[int], path_field: str, id_field: str) -> None:
+    """Raise if neither the path nor the id of a node reference was given."""
+    if path is None and op_id is None:
+        raise ValueError(f"Provide either '{path_field}' or '{id_field}'")
+
+
+class NodeRefInput(BaseModel):
+    """Base for inputs targeting a single node by path or by operator id."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    path: Optional[str] = Field(default=None, description="Absolute node path", min_length=1)
+    id: Optional[int] = Field(default=None, ge=0, description=OP_ID_DESCRIPTION)
+
+    @model_validator(mode='after')
+    def validate_ref(self):
+        _require_ref(self.path, self.id, 'path', 'id')
+        return self
+
+
+# ─────────────────────────────────────────────────────────────
+# Selectors (bulk delete / copy / rename / flags)
+# ─────────────────────────────────────────────────────────────
+
+class Selector(BaseModel):
+    """A set of operators to change in one call (and one undo step)."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    path: Optional[str] = Field(default=None, description="Root to select under (default '/')")
+    id: Optional[int] = Field(default=None, ge=0, description="Numeric id of the root. Takes precedence over path.")
+    recurse: bool = Field(default=False, description="Match all descendants of the root, not just its children")
+    pattern: Optional[str] = Field(
+        default=None,
+        description="ops()-style name patterns, space separated (e.g. 'noise* level[1-3]')"
+    )
+    path_glob: Optional[str] = Field(default=None, description="Glob on the full path (e.g. '/project1/fx_*')")
+    family: Optional[str] = Field(default=None, description="Only this family: TOP, CHOP, SOP, DAT, COMP, MAT")
+    type: Optional[str] = Field(default=None, description="Only this operator type (e.g. 'noiseTOP')")
+    tags: Optional[List[str]] = Field(default=None, description="Node must carry all of these tags")
+    paths: Optional[List[str]] = Field(default=None, description="Explicit node paths (instead of a root)")
+    ids: Optional[List[int]] = Field(default=None, description="Explicit node ids (instead of a root)")
+    max_nodes: int = Field(
+        default=500, ge=1, le=10000,
+        description="Refuse to change more nodes than this (guards against an over-broad pattern)"
+    )
+    dry_run: bool = Field(default=False, description="Only list the matched nodes, change nothing")
+
+    @model_validator(mode='after')
+    def validate_filters(self):
+        if not any([self.pattern, self.path_glob, self.family, self.type, self.tags, self.paths, self.ids]):
+            raise ValueError("A selector needs at least one of: pattern, path_glob, family, type, tags, paths, ids")
+        return self
+
+
+SELECTOR_DESCRIPTION = (
+    "Change every node matched by this selector instead of a single node. All matches are "
+    "changed in one call and one undo step; the result lists {id, path, ok} per node."
+)
+
+
+def _require_target(has_ref: bool, selector: Optional[Selector]) -> None:
+    """Raise unless exactly one of a node reference and a selector was given."""
+    if selector is not None and has_ref:
+        raise ValueError("Provide either a node reference or a selector, not both")
+    if selector is None and not has_ref:
+        raise ValueError("Provide a node reference (path or id) or a selector")
+
+
+# ─────────────────────────────────────────────────────────────
+# Field Projection
+# ─────────────────────────────────────────────────────────────
+# Copies of the TD side's OP_FIELDS / PARAM_FIELDS names;
+# tests/test_models.py fails when the two drift apart.
+
+NODE_FIELDS = (
+    'id', 'name', 'path', 'type', 'family', 'label', 'nodeX', 'nodeY',
+    'isCOMP', 'isTOP', 'isCHOP', 'isSOP', 'isDAT', 'isMAT', 'isPOP',
+    'bypass', 'lock', 'display', 'render', 'errors', 'warnings', 'parameters',
+)
+DETAIL_FIELDS = NODE_FIELDS + ('inputs', 'outputs', 'children_count', 'child_names')
+PARAM_FIELDS = (
+    'value', 'expr', 'mode', 'default', 'label', 'page', 'style', 'min', 'max', 'readOnly',
+    'isPulse', 'isMomentary', 'isToggle', 'isMenu', 'menuNames', 'menuLabels',
+)
+
+
+def _check_fields(fields: Optional[List[str]], allowed: tuple) -> Optional[List[str]]:
+    """Validate a 'fields' selector against the known field names."""
+    if fields is None:
+        return None
+    fields = [f.strip() for f in fields if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(allowed)}")
+    return fields or None
+
+
 # ─────────────────────────────────────────────────────────────
 # Node Navigation & Inspection
 # ─────────────────────────────────────────────────────────────
@@ -36,6 +171,7 @@ class GetNodesInput(BaseModel):
         default="/",
         description="Absolute path to a COMP node whose children to list (e.g. '/', '/project1', '/project1/myComp')"
     )
+    id: Optional[int] = Field(default=None, ge=0, description=OP_ID_DESCRIPTION)
     family: Optional[str] = Field(
         default=None,
         description="Filter by operator family: TOP, CHOP, SOP, DAT, COMP, MAT, or PANEL"
@@ -48,50 +184,145 @@ class GetNodesInput(BaseModel):
         default=False,
         description="If true, include all parameters for each node (slower for large networks)"
     )
-    limit: int = Field(default=100, ge=1, le=500, description="Max number of nodes to return")
-    offset: int = Field(default=0, ge=0, description="Pagination offset")
+    limit: int = Field(default=100, ge=1, le=500, description="Max number of top-level nodes to return")
+    offset: int = Field(default=0, ge=0, description="Pagination offset (top level). Prefer cursor for large COMPs.")
+    cursor: Optional[str] = Field(default=None, description=CURSOR_DESCRIPTION)
+    depth: int = Field(
+        default=1, ge=1, le=20,
+        description="How many levels to descend. 1 lists direct children only; higher values "
+                    "fetch the subtree in one call (COMPs are expanded level by level)"
+    )
+    tree_format: TreeFormat = Field(
+        default=TreeFormat.NESTED,
+        description="For depth > 1: 'nested' puts children under each COMP, 'flat' returns one list "
+                    "with depth and parent_id on every node"
+    )
+    child_limit: int = Field(
+        default=50, ge=1, le=500,
+        description="For depth > 1: max children returned per COMP below the top level"
+    )
+    max_nodes: int = Field(
+        default=1000, ge=1, le=5000,
+        description="For depth > 1: hard cap on nodes in the whole response ('truncated' is set when hit)"
+    )
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Only return these node attributes (id is always included), e.g. ['name', 'path', 'type']. "
+                    "TD skips everything else — leaving out 'errors'/'warnings' makes large listings much cheaper"
+    )
     response_format: ResponseFormat = Field(default=ResponseFormat.JSON, description="Output format")
 
+    @field_validator('fields')
+    @classmethod
+    def validate_fields(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return _check_fields(v, NODE_FIELDS)
 
-class NodePathInput(BaseModel):
-    """Input requiring a single node path."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    path: str = Field(
-        ...,
+class NodePathInput(NodeRefInput):
+    """Input requiring a single node path or id."""
+
+    path: Optional[str] = Field(
+        default=None,
         description="Absolute path to the node (e.g. '/project1/noise1', '/project1/geo1/sphere1')",
         min_length=1,
     )
     response_format: ResponseFormat = Field(default=ResponseFormat.JSON, description="Output format")
 
 
-class GetParamsInput(BaseModel):
+class NodeDetailInput(NodePathInput):
+    """Input for the full detail of a single node."""
+
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Only return these attributes (id is always included): node fields such as "
+                    "'name', 'errors', 'parameters', plus 'inputs', 'outputs', 'children_count', 'child_names'"
+    )
+
+    @field_validator('fields')
+    @classmethod
+    def validate_fields(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return _check_fields(v, DETAIL_FIELDS)
+
+
+class GetParamsInput(NodeRefInput):
     """Input for getting node parameters."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    path: str = Field(..., description="Absolute node path", min_length=1)
     page: Optional[str] = Field(default=None, description="Filter by parameter page name")
     names: Optional[List[str]] = Field(default=None, description="Filter to specific parameter names")
+    include_schema: bool = Field(
+        default=True,
+        description="Include static metadata (label, page, style, default, range, menus). If false, "
+                    "parameters shared by the operator type carry only value/expr/mode plus a 'schema_id' "
+                    "(custom, menuSource and sequence parameters keep their metadata)"
+    )
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Only return these keys per parameter, e.g. ['value'] or ['expr', 'mode'] "
+                    "(leaving out 'value' skips evaluating the parameter). Overrides include_schema"
+    )
     response_format: ResponseFormat = Field(default=ResponseFormat.JSON, description="Output format")
 
+    @field_validator('fields')
+    @classmethod
+    def validate_fields(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return _check_fields(v, PARAM_FIELDS)
 
-class SetParamsInput(BaseModel):
-    """Input for setting node parameters (static values or live expressions)."""
+
+class ParamTarget(BaseModel):
+    """One node of a multi-target parameter set."""
     model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    path: str = Field(..., description="Absolute node path", min_length=1)
-    params: Dict[str, Any] = Field(
-        ...,
+    path: Optional[str] = Field(default=None, description="Absolute node path", min_length=1)
+    id: Optional[int] = Field(default=None, ge=0, description=OP_ID_DESCRIPTION)
+    params: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Params for this node only, applied over the shared 'params'"
+    )
+
+    @model_validator(mode='after')
+    def validate_ref(self):
+        _require_ref(self.path, self.id, 'path', 'id')
+        return self
+
+
+class SetParamsInput(NodeRefInput):
+    """Input for setting node parameters (static values or live expressions)."""
+
+    params: Optional[Dict[str, Any]] = Field(
+        default=None,
         description=(
             "Dictionary of parameter names to values. Supports three modes:\n"
             "• Static value (plain): {'seed': 42, 'colorr': 1.0}\n"
             "• Expression (reactive, updates every frame): {'seed': {'expr': 'absTime.seconds * 10'}, 'tx': {'expr': \"op('noise1')['chan1']\"}}\n"
-            "• Explicit static: {'seed': {'val': 42}}\n\n"
+            "• Explicit static: {'seed': {'val': 42}}\n"
+            "With targets/selector, {'seed': {'each': [1, 2, 3]}} gives the i-th node the i-th value.\n\n"
             "Expressions make networks ALIVE — use them for anything that should move, react, or change over time."
         ),
-        min_length=1,
+    )
+    targets: Optional[List[ParamTarget]] = Field(
+        default=None, min_length=1, max_length=2000,
+        description="Set params on many nodes at once: [{path | id, params}] (params merged over the shared ones)"
+    )
+    selector: Optional[Selector] = Field(
+        default=None,
+        description="Set the shared 'params' on every node this selector matches (one call, one undo step)"
+    )
+    verbose: bool = Field(
+        default=False,
+        description="Multi-target only: return every per-parameter result, not just the failures"
     )
 
+    @model_validator(mode='after')
+    def validate_ref(self):
+        many = self.targets is not None or self.selector is not None
+        if not many:
+            _require_ref(self.path, self.id, 'path', 'id')
+        elif self.path is not None or self.id is not None:
+            raise ValueError("Use either path/id or targets/selector, not both")
+        if not self.params and not (self.targets and any(t.params for t in self.targets)):
+            raise ValueError("Provide 'params' (or per-target params)")
+        return self
+
 
 # ─────────────────────────────────────────────────────────────
 # Node Creation / Deletion / Copy / Rename
@@ -105,6 +336,10 @@ class CreateNodeInput(BaseModel):
         default="/project1",
         description="Path to the parent COMP where the node will be created"
     )
+    parent_id: Optional[int] = Field(
+        default=None, ge=0,
+        description="Numeric id of the parent COMP. Takes precedence over parent_path."
+    )
     node_type: str = Field(
         ...,
         description=(
@@ -130,6 +365,11 @@ class CreateNodeInput(BaseModel):
         default=None,
         description="Vertical position in the network editor (pixels). Use multiples of 200 for clean spacing between rows."
     )
+    auto_place: bool = Field(
+        default=False,
+        description="Place the node in the nearest free spot — around nodeX/nodeY if given, "
+                    "otherwise just right of the existing network. No need to list the network first."
+    )
 
     @field_validator('node_type')
     @classmethod
@@ -141,31 +381,86 @@ class CreateNodeInput(BaseModel):
         return v
 
 
-class DeleteNodeInput(BaseModel):
-    """Input for deleting a node."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+class DeleteNodeInput(NodeRefInput):
+    """Input for deleting a node (or every node matched by a selector)."""
+
+    path: Optional[str] = Field(default=None, description="Absolute path of the node to delete", min_length=1)
+    selector: Optional[Selector] = Field(default=None, description=SELECTOR_DESCRIPTION)
 
-    path: str = Field(..., description="Absolute path of the node to delete", min_length=1)
+    @model_validator(mode='after')
+    def validate_ref(self):
+        _require_target(self.path is not None or self.id is not None, self.selector)
+        return self
 
 
 class CopyNodeInput(BaseModel):
     """Input for copying/duplicating a node."""
     model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    source_path: str = Field(..., description="Path of the node to copy", min_length=1)
+    source_path: Optional[str] = Field(default=None, description="Path of the node to copy", min_length=1)
+    source_id: Optional[int] = Field(default=None, ge=0, description="Numeric id of the node to copy")
     dest_parent: Optional[str] = Field(
         default=None,
         description="Path of the destination parent COMP. If None, copies into same parent."
     )
+    dest_parent_id: Optional[int] = Field(
+        default=None, ge=0,
+        description="Numeric id of the destination parent COMP. Takes precedence over dest_parent."
+    )
     new_name: Optional[str] = Field(default=None, description="Name for the copy")
-
-
-class RenameNodeInput(BaseModel):
-    """Input for renaming a node."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
-
-    path: str = Field(..., description="Current absolute path of the node", min_length=1)
-    new_name: str = Field(..., description="New name for the node", min_length=1, max_length=100)
+    selector: Optional[Selector] = Field(default=None, description=SELECTOR_DESCRIPTION)
+    name_suffix: Optional[str] = Field(
+        default=None,
+        description="Selector only: name each copy <original name><suffix> (TD numbers clashes)"
+    )
+    offset_x: int = Field(default=0, description="Selector only: shift each copy by this much in X")
+    offset_y: int = Field(default=0, description="Selector only: shift each copy by this much in Y")
+
+    @model_validator(mode='after')
+    def validate_ref(self):
+        if self.selector is None:
+            _require_ref(self.source_path, self.source_id, 'source_path', 'source_id')
+        else:
+            _require_target(self.source_path is not None or self.source_id is not None, self.selector)
+        return self
+
+
+class RenameNodeInput(NodeRefInput):
+    """Input for renaming a node (or every node matched by a selector)."""
+
+    path: Optional[str] = Field(default=None, description="Current absolute path of the node", min_length=1)
+    new_name: Optional[str] = Field(default=None, description="New name for the node", min_length=1, max_length=100)
+    selector: Optional[Selector] = Field(default=None, description=SELECTOR_DESCRIPTION)
+    find: Optional[str] = Field(default=None, description="Selector only: substring to replace in each name", min_length=1)
+    replace: str = Field(default="", description="Selector only: replacement for 'find'")
+    prefix: str = Field(default="", description="Selector only: prepend to each name")
+    suffix: str = Field(default="", description="Selector only: append to each name")
+
+    @model_validator(mode='after')
+    def validate_ref(self):
+        _require_target(self.path is not None or self.id is not None, self.selector)
+        if self.selector is None and not self.new_name:
+            raise ValueError("'new_name' is required when renaming a single node")
+        if self.selector is not None and not (self.find or self.prefix or self.suffix):
+            raise ValueError("Bulk rename needs 'find' (with 'replace'), 'prefix' or 'suffix'")
+        return self
+
+
+class SetFlagsInput(NodeRefInput):
+    """Input for setting bypass / lock / display / render flags."""
+
+    selector: Optional[Selector] = Field(default=None, description=SELECTOR_DESCRIPTION)
+    bypass: Optional[bool] = Field(default=None, description="Bypass flag")
+    lock: Optional[bool] = Field(default=None, description="Lock flag (freezes the current output)")
+    display: Optional[bool] = Field(default=None, description="Display flag")
+    render: Optional[bool] = Field(default=None, description="Render flag")
+
+    @model_validator(mode='after')
+    def validate_ref(self):
+        _require_target(self.path is not None or self.id is not None, self.selector)
+        if all(v is None for v in (self.bypass, self.lock, self.display, self.render)):
+            raise ValueError("Set at least one of: bypass, lock, display, render")
+        return self
 
 
 # ─────────────────────────────────────────────────────────────
@@ -176,8 +471,10 @@ class ConnectNodesInput(BaseModel):
     """Input for connecting two nodes."""
     model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    source_path: str = Field(..., description="Path of the source (output) node", min_length=1)
-    target_path: str = Field(..., description="Path of the target (input) node", min_length=1)
+    source_path: Optional[str] = Field(default=None, description="Path of the source (output) node", min_length=1)
+    source_id: Optional[int] = Field(default=None, ge=0, description="Numeric id of the source node")
+    target_path: Optional[str] = Field(default=None, description="Path of the target (input) node", min_length=1)
+    target_id: Optional[int] = Field(default=None, ge=0, description="Numeric id of the target node")
     source_index: int = Field(
         default=0, ge=0,
         description="Output connector index on the source node (0 = first output)"
@@ -187,12 +484,17 @@ class ConnectNodesInput(BaseModel):
         description="Input connector index on the target node (0 = first input)"
     )
 
+    @model_validator(mode='after')
+    def validate_refs(self):
+        _require_ref(self.source_path, self.source_id, 'source_path', 'source_id')
+        _require_ref(self.target_path, self.target_id, 'target_path', 'target_id')
+        return self
+
 
-class DisconnectInput(BaseModel):
+class DisconnectInput(NodeRefInput):
     """Input for disconnecting a node connector."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    path: str = Field(..., description="Path of the node to disconnect", min_length=1)
+    path: Optional[str] = Field(default=None, description="Path of the node to disconnect", min_length=1)
     connector_type: str = Field(
         default="input",
         description="Which connector: 'input' or 'output'"
@@ -211,27 +513,121 @@ class DisconnectInput(BaseModel):
 # DAT Content
 # ─────────────────────────────────────────────────────────────
 
-class GetContentInput(BaseModel):
-    """Input for reading DAT text/table content."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+class GetContentInput(NodeRefInput):
+    """Input for reading DAT text/table content, optionally a window of it."""
+
+    path: Optional[str] = Field(default=None, description="Path to a DAT node", min_length=1)
+    row_offset: int = Field(default=0, ge=0, description="Tables: first row to return")
+    row_limit: int = Field(default=1000, ge=1, le=100000, description="Tables: max rows to return ('has_more' tells if there are more)")
+    row_step: int = Field(default=1, ge=1, description="Tables: return every Nth row (sampling)")
+    col_offset: int = Field(default=0, ge=0, description="Tables: first column to return")
+    col_limit: Optional[int] = Field(default=None, ge=1, description="Tables: max columns to return")
+    line_offset: Optional[int] = Field(default=None, ge=0, description="Text DATs: first line to return (omit both line fields for the whole text)")
+    line_limit: Optional[int] = Field(default=None, ge=1, le=100000, description="Text DATs: max lines to return (omit both line fields for the whole text)")
+    header_only: bool = Field(default=False, description="Tables: return only the first (header) row")
+    count_only: bool = Field(default=False, description="Return only the size (rows/cols, or length/lines) — no data")
+
+
+class ContentWriteMode(str, Enum):
+    """How td_set_content writes to a DAT."""
+    REPLACE = "replace"
+    APPEND_ROWS = "append_rows"
+    REPLACE_ROWS = "replace_rows"
+    SET_CELLS = "set_cells"
+    DELETE_ROWS = "delete_rows"
+    DIFF = "diff"
+
+
+class CellEdit(BaseModel):
+    """A single Table DAT cell write."""
+    model_config = ConfigDict(extra='forbid')
 
-    path: str = Field(..., description="Path to a DAT node", min_length=1)
+    row: int = Field(..., ge=0, description="Row index")
+    col: int = Field(..., ge=0, description="Column index")
+    value: str = Field(..., description="New cell value")
 
 
-class SetContentInput(BaseModel):
+class SetContentInput(NodeRefInput):
     """Input for writing DAT text/table content."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    path: str = Field(..., description="Path to a DAT node", min_length=1)
+    path: Optional[str] = Field(default=None, description="Path to a DAT node", min_length=1)
+    mode: ContentWriteMode = Field(
+        default=ContentWriteMode.REPLACE,
+        description=(
+            "'replace' (whole text or table), 'append_rows' (rows), 'replace_rows' (rows from start_row), "
+            "'set_cells' (cells), 'delete_rows' (row_indices), or 'diff' (table — only changed rows/cells "
+            "are written)"
+        )
+    )
     text: Optional[str] = Field(
         default=None,
         description="Text content to write (for Text DATs, Script DATs, etc.)"
     )
     table: Optional[List[List[str]]] = Field(
         default=None,
-        description="Table content as 2D array of strings (for Table DATs)"
+        description="Table content as 2D array of strings (for Table DATs) — modes 'replace' and 'diff'"
+    )
+    rows: Optional[List[List[str]]] = Field(
+        default=None,
+        description="Rows to write — modes 'append_rows' and 'replace_rows'"
+    )
+    start_row: int = Field(default=0, ge=0, description="First row overwritten by 'replace_rows'")
+    cells: Optional[List[CellEdit]] = Field(
+        default=None,
+        description="Cell writes [{row, col, value}] — mode 'set_cells' (the table grows to fit)"
+    )
+    row_indices: Optional[List[int]] = Field(
+        default=None,
+        description="Row indices to remove — mode 'delete_rows'"
+    )
+
+    @model_validator(mode='after')
+    def validate_mode_payload(self):
+        required = {
+            ContentWriteMode.APPEND_ROWS: 'rows',
+            ContentWriteMode.REPLACE_ROWS: 'rows',
+            ContentWriteMode.SET_CELLS: 'cells',
+            ContentWriteMode.DELETE_ROWS: 'row_indices',
+            ContentWriteMode.DIFF: 'table',
+        }.get(self.mode)
+        if required and not getattr(self, required):
+            raise ValueError(f"mode '{self.mode.value}' requires '{required}'")
+        return self
+
+
+class LineEdit(BaseModel):
+    """Replace a range of lines in a text DAT."""
+    model_config = ConfigDict(extra='forbid')
+
+    line_offset: int = Field(..., ge=0, description="First line to replace (0-based, relative to the base text)")
+    line_count: int = Field(default=0, ge=0, description="Number of lines replaced (0 inserts before line_offset)")
+    text: str = Field(default="", description="Replacement lines (empty deletes the range)")
+
+
+class PatchContentInput(NodeRefInput):
+    """Input for patching a text DAT against a known version."""
+
+    path: Optional[str] = Field(default=None, description="Path to a DAT node", min_length=1)
+    base_hash: str = Field(
+        ...,
+        description="The 'hash' td_get_content returned for the text this patch was made against",
+        min_length=1,
+    )
+    diff: Optional[str] = Field(
+        default=None,
+        description="Unified diff against the base text ('@@ -a,b +c,d @@' hunks; context must match exactly)"
+    )
+    edits: Optional[List[LineEdit]] = Field(
+        default=None,
+        description="Line-range edits [{line_offset, line_count, text}], all relative to the base text"
     )
 
+    @model_validator(mode='after')
+    def validate_patch(self):
+        if (self.diff is None) == (self.edits is None):
+            raise ValueError("Provide exactly one of 'diff' or 'edits'")
+        return self
+
 
 # ─────────────────────────────────────────────────────────────
 # Python Execution
@@ -258,12 +654,11 @@ class ExecPythonInput(BaseModel):
 # Screenshot / Visual
 # ─────────────────────────────────────────────────────────────
 
-class ScreenshotInput(BaseModel):
+class ScreenshotInput(NodeRefInput):
     """Input for capturing a TOP node as an image."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    path: str = Field(
-        ...,
+    path: Optional[str] = Field(
+        default=None,
         description="Path to a TOP node to capture as an image (e.g. '/project1/null1', '/project1/render1')",
         min_length=1,
     )
@@ -273,27 +668,61 @@ class ScreenshotInput(BaseModel):
 # CHOP / SOP Data
 # ─────────────────────────────────────────────────────────────
 
-class CHOPDataInput(BaseModel):
+CHOP_TOOL_MAX_VALUES = 16384   # float32 values (64 KB) td_chop_data returns in binary format
+
+
+class CHOPDataFormat(str, Enum):
+    """Encoding of CHOP samples."""
+    JSON = "json"
+    BINARY = "binary"
+
+
+class CHOPDownsample(str, Enum):
+    """How long CHOP channels are reduced to max_points."""
+    MINMAX = "minmax"
+    LTTB = "lttb"
+    MEAN = "mean"
+    STRIDE = "stride"
+
+
+class CHOPDataInput(NodeRefInput):
     """Input for reading CHOP channel data."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    path: str = Field(..., description="Path to a CHOP node", min_length=1)
+    path: Optional[str] = Field(default=None, description="Path to a CHOP node", min_length=1)
     channels: Optional[List[str]] = Field(
         default=None,
-        description="List of channel names to read. If None, reads all channels."
+        description="Channel names or TD patterns to read (e.g. ['chan*'], ['tx ty tz']). If None, reads all channels."
     )
     range: Optional[List[int]] = Field(
         default=None,
         description="Sample range [start, end] to read. If None, reads all samples.",
         min_length=2, max_length=2,
     )
+    format: CHOPDataFormat = Field(
+        default=CHOPDataFormat.JSON,
+        description="'json': value lists, downsampled past 1000 samples. 'binary': every selected sample, "
+                    "moved from TD as raw float32 and returned base64-encoded (channels × samples, "
+                    f"little-endian) — for export or numeric processing. Binary is limited to "
+                    f"{CHOP_TOOL_MAX_VALUES} values (channels × samples) per call; larger selections are "
+                    "refused — narrow channels / range, use 'json' (downsampled), or read the "
+                    "td://<path>?view=chop resource for per-channel stats.",
+    )
+    max_points: int = Field(
+        default=1000, ge=3, le=100000,
+        description="JSON only: channels with more samples (after 'range') are downsampled to about this many points",
+    )
+    downsample: CHOPDownsample = Field(
+        default=CHOPDownsample.MINMAX,
+        description="JSON only: 'minmax' keeps each bucket's min and max (peaks and transients survive), "
+                    "'lttb' keeps the visually most significant point per bucket, 'mean' averages buckets "
+                    "(smooths, flattens peaks), 'stride' takes every k-th sample (cheapest, can miss spikes).",
+    )
 
 
-class SOPDataInput(BaseModel):
+class SOPDataInput(NodeRefInput):
     """Input for reading SOP geometry data."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    path: str = Field(..., description="Path to a SOP node", min_length=1)
+    path: Optional[str] = Field(default=None, description="Path to a SOP node", min_length=1)
     include_points: bool = Field(default=True, description="Include point position data")
     include_prims: bool = Field(default=False, description="Include primitive data")
     limit: int = Field(default=500, ge=1, le=10000, description="Max points/prims to return")
@@ -308,26 +737,59 @@ class CookingInfoInput(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
     path: str = Field(default="/", description="Root path to inspect")
+    id: Optional[int] = Field(default=None, ge=0, description=OP_ID_DESCRIPTION)
     recurse: bool = Field(default=False, description="Recursively inspect children")
     sort_by: str = Field(default="cookTime", description="Sort by: 'cookTime' or 'cpuCookTime'")
-    limit: int = Field(default=20, ge=1, le=100, description="Max nodes to return")
+    limit: int = Field(default=20, ge=1, le=100, description="Max nodes to return (page size)")
+    cursor: Optional[str] = Field(
+        default=None,
+        description="next_cursor of the previous page. Pages come from the ranking taken for the first page."
+    )
 
 
 # ─────────────────────────────────────────────────────────────
 # Search
 # ─────────────────────────────────────────────────────────────
 
+class SearchMatch(str, Enum):
+    """How the search query is matched."""
+    SUBSTRING = "substring"
+    REGEX = "regex"
+    FUZZY = "fuzzy"
+
+
 class SearchNodesInput(BaseModel):
     """Input for searching nodes."""
     model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
     query: str = Field(..., description="Search string (case-insensitive)", min_length=1)
     path: str = Field(default="/", description="Root path to search from")
+    id: Optional[int] = Field(default=None, ge=0, description=OP_ID_DESCRIPTION)
     search_type: str = Field(
         default="all",
         description="What to search: 'name', 'type', 'family', or 'all'"
     )
-    limit: int = Field(default=50, ge=1, le=200, description="Max results")
+    match: SearchMatch = Field(
+        default=SearchMatch.SUBSTRING,
+        description=(
+            "'substring' (default, pageable with cursor), 'regex' (Python syntax), or 'fuzzy' "
+            "(typo-tolerant, camelCase/snake_case aware, e.g. 'nbm' finds noise_bg_main). "
+            "regex and fuzzy return the best `limit` matches ranked by score."
+        )
+    )
+    min_score: float = Field(default=0, ge=0, le=100, description="regex/fuzzy: drop matches scoring at or below this (0-100)")
+    case_sensitive: bool = Field(default=False, description="regex only: match case-sensitively")
+    limit: int = Field(default=50, ge=1, le=200, description="Max results (page size, or top-K when ranked)")
+    cursor: Optional[str] = Field(default=None, description=CURSOR_DESCRIPTION)
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Only return these node attributes per match (id is always included), e.g. ['path', 'type']"
+    )
+
+    @field_validator('fields')
+    @classmethod
+    def validate_fields(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return _check_fields(v, NODE_FIELDS)
 
     @field_validator('search_type')
     @classmethod
@@ -336,6 +798,129 @@ class SearchNodesInput(BaseModel):
             raise ValueError("search_type must be 'name', 'type', 'family', or 'all'")
         return v
 
+    @model_validator(mode='after')
+    def validate_match(self):
+        if self.match == SearchMatch.REGEX:
+            try:
+                re.compile(self.query)
+            except re.error as e:
+                raise ValueError(f"Invalid regex: {e}")
+        if self.match != SearchMatch.SUBSTRING and self.cursor is not None:
+            raise ValueError("cursor only applies to substring search; ranked searches return the top results")
+        return self
+
+
+# ─────────────────────────────────────────────────────────────
+# Network Layout
+# ─────────────────────────────────────────────────────────────
+
+class LayoutQuery(str, Enum):
+    """Question asked of a COMP's placement index."""
+    FREE = "free"
+    OVERLAPS = "overlaps"
+    BOUNDS = "bounds"
+
+
+class LayoutInput(BaseModel):
+    """Input for network layout queries inside a COMP."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    query: LayoutQuery = Field(
+        ...,
+        description="'free' (nearest free spot for a width × height tile near x/y), "
+                    "'overlaps' (nodes overlapping the box x, y, width, height), "
+                    "or 'bounds' (bounding box of all nodes)"
+    )
+    path: str = Field(default="/project1", description="COMP whose network to query")
+    id: Optional[int] = Field(default=None, ge=0, description=OP_ID_DESCRIPTION)
+    x: Optional[int] = Field(default=None, description="'free': preferred x (default: right of the network); 'overlaps': box x")
+    y: Optional[int] = Field(default=None, description="'free': preferred y; 'overlaps': box y")
+    width: int = Field(default=200, ge=1, description="Tile / box width")
+    height: int = Field(default=100, ge=1, description="Tile / box height")
+    margin: int = Field(default=20, ge=0, description="Clearance kept around the tile ('free') or added to the box ('overlaps')")
+
+    @model_validator(mode='after')
+    def validate_box(self):
+        if self.query == LayoutQuery.OVERLAPS and (self.x is None or self.y is None):
+            raise ValueError("query 'overlaps' requires x and y")
+        return self
+
+
+# ─────────────────────────────────────────────────────────────
+# Graph Queries
+# ─────────────────────────────────────────────────────────────
+
+QUERY_FIELDS_DESCRIPTION = (
+    "Node attributes (name, path, type, family, errors, bypass, nodeX, ...), metrics (cookTime, "
+    "cpuCookTime, cookFrame, numChildren, numInputs, numOutputs, tags, comment, width, height, "
+    "numChans, numSamples, numPoints, numPrims, numRows, numCols) or 'par.<name>' for a parameter value"
+)
+
+
+class QueryPredicate(BaseModel):
+    """One condition of a td_query 'where' clause."""
+    model_config = ConfigDict(extra='forbid')
+
+    field: str = Field(..., description="Field to test. " + QUERY_FIELDS_DESCRIPTION, min_length=1)
+    op: str = Field(
+        default="==",
+        description="One of: ==, !=, >, >=, <, <=, in, not_in, contains, startswith, glob, exists"
+    )
+    value: Any = Field(default=None, description="Value to compare against (a list for in/not_in)")
+
+    @field_validator('op')
+    @classmethod
+    def validate_op(cls, v: str) -> str:
+        ops = ('==', '!=', '>', '>=', '<', '<=', 'in', 'not_in', 'contains', 'startswith', 'glob', 'exists')
+        if v not in ops:
+            raise ValueError(f"op must be one of: {', '.join(ops)}")
+        return v
+
+
+class QueryAggregate(BaseModel):
+    """One aggregate column of a grouped td_query."""
+    model_config = ConfigDict(extra='forbid')
+
+    fn: str = Field(..., description="count, sum, avg, min, or max")
+    field: Optional[str] = Field(default=None, description="Field to aggregate (not needed for count)")
+    name: Optional[str] = Field(default=None, description="Output column name (default '<fn>_<field>')")
+
+    @field_validator('fn')
+    @classmethod
+    def validate_fn(cls, v: str) -> str:
+        if v not in ('count', 'sum', 'avg', 'min', 'max'):
+            raise ValueError("fn must be 'count', 'sum', 'avg', 'min', or 'max'")
+        return v
+
+
+class QueryInput(BaseModel):
+    """Input for a declarative node graph query."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    path: str = Field(default="/", description="Root to query under")
+    id: Optional[int] = Field(default=None, ge=0, description=OP_ID_DESCRIPTION)
+    recurse: bool = Field(default=True, description="Include all descendants, not just direct children")
+    family: Optional[str] = Field(default=None, description="Only this family (TOP, CHOP, SOP, DAT, COMP, MAT, POP)")
+    type: Optional[str] = Field(default=None, description="Only this operator type (e.g. 'noiseTOP')")
+    path_glob: Optional[str] = Field(default=None, description="fnmatch pattern on the full path (e.g. '/project1/fx*/*')")
+    name_glob: Optional[str] = Field(default=None, description="fnmatch pattern on the node name (e.g. 'noise*')")
+    where: Optional[List[QueryPredicate]] = Field(default=None, description="Conditions that must all hold")
+    select: List[str] = Field(
+        default_factory=lambda: ['path', 'type'],
+        description="Output columns. " + QUERY_FIELDS_DESCRIPTION
+    )
+    group_by: Optional[List[str]] = Field(default=None, description="Group matches by these fields")
+    aggregate: Optional[List[QueryAggregate]] = Field(
+        default=None,
+        description="Aggregate columns per group (or over all matches when group_by is empty)"
+    )
+    order_by: Optional[List[str]] = Field(
+        default=None,
+        description="Sort by output columns; prefix with '-' for descending (e.g. ['-cookTime', 'path'])"
+    )
+    limit: int = Field(default=100, ge=1, le=5000, description="Max rows returned")
+    offset: int = Field(default=0, ge=0, description="Row offset (after sorting)")
+
 
 # ─────────────────────────────────────────────────────────────
 # Python Help / Introspection
@@ -372,11 +957,10 @@ class TimelineSetInput(BaseModel):
 # Pulse Parameter
 # ─────────────────────────────────────────────────────────────
 
-class PulseParamInput(BaseModel):
+class PulseParamInput(NodeRefInput):
     """Input for pulsing a pulse-type parameter."""
-    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
-    path: str = Field(..., description="Node path", min_length=1)
+    path: Optional[str] = Field(default=None, description="Node path", min_length=1)
     param: str = Field(..., description="Parameter name to pulse", min_length=1)
 
 
@@ -389,5 +973,198 @@ class GetErrorsInput(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
 
     path: str = Field(default="/", description="Node path to check")
+    id: Optional[int] = Field(default=None, ge=0, description=OP_ID_DESCRIPTION)
     recurse: bool = Field(default=True, description="Recursively check children")
+    limit: Optional[int] = Field(
+        default=None, ge=1, le=5000,
+        description="Max issues per page (default: all). A full page returns next_cursor."
+    )
+    cursor: Optional[str] = Field(default=None, description=CURSOR_DESCRIPTION)
+    since: Optional[int] = Field(
+        default=None, ge=0,
+        description=(
+            "Only error/warning transitions after this seq (raised / changed / cleared / removed), "
+            "answered from TD's incremental tracker instead of a walk. Use the 'changes_seq' of a "
+            "full check (or the 'next' of the previous call); 0 = all recent transitions."
+        )
+    )
+    include_current: bool = Field(
+        default=False,
+        description="With since: also list every node under path that currently has issues"
+    )
 
+    @model_validator(mode='after')
+    def validate_since(self):
+        if self.since is not None and self.cursor is not None:
+            raise ValueError("cursor pages a full check; use since alone for transitions")
+        return self
+
+
+class LogsInput(BaseModel):
+    """Input for tailing TouchDesigner's captured script output."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    after: int = Field(
+        default=0, ge=0,
+        description="Only lines after this sequence number — pass the previous call's 'next' to tail"
+    )
+    limit: int = Field(default=200, ge=1, le=2000, description="Max lines to return")
+    min_level: str = Field(default="debug", description="Lowest level to include: 'debug', 'info', 'warning' or 'error'")
+    source: Optional[str] = Field(
+        default=None,
+        description="Glob on the source: the DAT that printed (e.g. '/project1/*'), a logger name, or 'python'"
+    )
+    contains: Optional[str] = Field(default=None, description="Only lines containing this text")
+
+    @field_validator('min_level')
+    @classmethod
+    def validate_level(cls, v: str) -> str:
+        if v not in ('debug', 'info', 'warning', 'error'):
+            raise ValueError("min_level must be 'debug', 'info', 'warning' or 'error'")
+        return v
+
+
+# ─────────────────────────────────────────────────────────────
+# Diagnostics
+# ─────────────────────────────────────────────────────────────
+
+class DiagnosticsInput(BaseModel):
+    """Input for reading the TD bridge's request diagnostics."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    recent: int = Field(default=20, ge=0, le=256, description="Number of most recent request records to include")
+    reset: bool = Field(default=False, description="Clear all collected stats after reading them")
+
+
+# ─────────────────────────────────────────────────────────────
+# Background Jobs
+# ─────────────────────────────────────────────────────────────
+# The TD side's JOB_KINDS; tests/test_models.py keeps the two in step.
+
+JOB_KINDS = ('errors', 'cooking', 'search', 'families', 'query', 'census', 'export', 'build', 'wait')
+
+
+class JobSubmitInput(BaseModel):
+    """Input for submitting a frame-sliced background job."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    kind: str = Field(
+        ...,
+        description=(
+            "Job kind: 'errors', 'cooking', 'search', 'families', 'query', 'census' (same params as the matching tools), "
+            "'export' (serialize a subtree: path/id, include_params, recurse), "
+            "'build' (bulk create: parent_path/parent_id, nodes, connections) or "
+            "'wait' (same params as td_wait)"
+        ),
+    )
+    params: Dict[str, Any] = Field(
+        default_factory=dict,
+        description=(
+            "Parameters for the job. For 'build': {'parent_path': '/project1', "
+            "'nodes': [{'node_type': 'noiseTOP', 'name': 'n1', 'nodeX': 0, 'nodeY': 0, 'params': {'seed': 2}}], "
+            "'connections': [{'source': 'n1', 'target': 'level1', 'source_index': 0, 'target_index': 0}]}"
+        ),
+    )
+
+    @field_validator('kind')
+    @classmethod
+    def validate_kind(cls, v: str) -> str:
+        if v not in JOB_KINDS:
+            raise ValueError(f"kind must be one of: {', '.join(JOB_KINDS)}")
+        return v
+
+
+class JobStatusInput(BaseModel):
+    """Input for polling or collecting a background job."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    job_id: Optional[int] = Field(default=None, ge=1, description="Job id from td_job_submit. Omit to list all jobs.")
+    wait_seconds: float = Field(
+        default=0, ge=0, le=120,
+        description="Wait up to this many seconds for the job to finish before answering"
+    )
+    collect: bool = Field(
+        default=True,
+        description="If the job has finished, return its result and forget it (false = status only)"
+    )
+
+
+class JobCancelInput(BaseModel):
+    """Input for cancelling a background job."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    job_id: int = Field(..., ge=1, description="Job id from td_job_submit")
+
+
+# ─────────────────────────────────────────────────────────────
+# Waits
+# ─────────────────────────────────────────────────────────────
+
+class WaitConditionType(str, Enum):
+    """What a wait condition checks."""
+    NO_ERRORS = "no_errors"
+    COOKED = "cooked"
+    PARAM = "param"
+    FRAME = "frame"
+    EXISTS = "exists"
+    EXPR = "expr"
+
+
+class WaitCondition(BaseModel):
+    """One condition TouchDesigner checks every frame."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    type: WaitConditionType = Field(
+        ...,
+        description=(
+            "'no_errors' (node has no errors; recurse, include_warnings), "
+            "'cooked' (node's cookFrame > after_frame), "
+            "'param' (par <op> value, op as in td_query: ==, !=, >, >=, <, <=, in, contains, ...), "
+            "'frame' (absTime.frame >= frame), "
+            "'exists' (node exists, or not with exists=false), "
+            "'expr' (Python expression is truthy, e.g. \"op('movie1').numImages > 0\")"
+        )
+    )
+    path: Optional[str] = Field(default=None, description="Node path (no_errors / cooked / param / exists)")
+    id: Optional[int] = Field(default=None, ge=0, description=OP_ID_DESCRIPTION)
+    recurse: bool = Field(default=False, description="no_errors: include errors of children")
+    include_warnings: bool = Field(default=False, description="no_errors: warnings count as errors")
+    after_frame: Optional[int] = Field(default=None, description="cooked: wait for a cook after this frame")
+    par: Optional[str] = Field(default=None, description="param: parameter name")
+    op: str = Field(default="==", description="param: comparison operator")
+    value: Optional[Any] = Field(default=None, description="param: value to compare with")
+    frame: Optional[int] = Field(default=None, description="frame: absolute frame to reach")
+    exists: bool = Field(default=True, description="exists: wait for the node to exist (true) or be gone (false)")
+    expr: Optional[str] = Field(default=None, description="expr: Python expression evaluated in TD")
+
+    @model_validator(mode='after')
+    def validate_condition(self):
+        needs = {
+            WaitConditionType.COOKED: ('after_frame',),
+            WaitConditionType.PARAM: ('par',),
+            WaitConditionType.FRAME: ('frame',),
+            WaitConditionType.EXPR: ('expr',),
+        }.get(self.type, ())
+        missing = [k for k in needs if getattr(self, k) is None]
+        if missing:
+            raise ValueError(f"'{self.type.value}' condition needs: {', '.join(missing)}")
+        if self.type in (WaitConditionType.NO_ERRORS, WaitConditionType.COOKED,
+                         WaitConditionType.PARAM, WaitConditionType.EXISTS):
+            _require_ref(self.path, self.id, 'path', 'id')
+        return self
+
+
+class WaitInput(BaseModel):
+    """Input for waiting on conditions inside TouchDesigner."""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    conditions: List[WaitCondition] = Field(..., min_length=1, max_length=20, description="Conditions to wait for")
+    mode: str = Field(default="all", description="'all' conditions must hold, or 'any' one of them")
+    timeout: float = Field(default=30, gt=0, le=600, description="Give up after this many seconds")
+
+    @field_validator('mode')
+    @classmethod
+    def validate_mode(cls, v: str) -> str:
+        if v not in ('all', 'any'):
+            raise ValueError("mode must be 'all' or 'any'")
+        return v
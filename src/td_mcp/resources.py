@@ -0,0 +1,167 @@
+"""
+TouchDesigner Resources
+=======================
+Operators exposed as MCP resources, with resources/subscribe support.
+
+    td://project1/noise1                node detail: parameters, flags, wiring, errors
+    td://project1/text1?view=content    DAT text or table
+    td://project1/lfo1?view=chop        CHOP channel summary (min / max / mean / first / last)
+
+Subscriptions are checked by polling TD's /api/resources/versions with the
+version last seen of every subscribed resource. TD answers with only the
+ones that changed, and only their subscribers get notifications/resources/updated.
+TD checks them round-robin within a small per-poll time budget, so with many
+subscriptions a change may take a few polls to be noticed.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote
+
+from mcp.server.session import ServerSession
+from mcp.types import ResourceTemplate
+
+from td_mcp.td_client import TDClient
+
+logger = logging.getLogger("td_mcp.resources")
+
+SCHEME = "td://"
+
+# view → (TD route, extra request fields)
+RESOURCE_VIEWS: Dict[str, Tuple[str, dict]] = {
+    "node":    ("node/detail", {}),
+    "content": ("node/content", {}),
+    "chop":    ("chop/data", {"summary": True}),
+}
+
+RESOURCE_TEMPLATES = [
+    ResourceTemplate(
+        uriTemplate="td://{+path}",
+        name="td_node",
+        title="TouchDesigner Operator",
+        description="Detail of one operator (parameters, flags, wiring, errors). "
+                    "The path is the TD path without its leading slash, e.g. td://project1/noise1.",
+        mimeType="application/json",
+    ),
+    ResourceTemplate(
+        uriTemplate="td://{+path}?view=content",
+        name="td_dat_content",
+        title="TouchDesigner DAT Content",
+        description="Text or table content of a DAT, e.g. td://project1/text1?view=content.",
+        mimeType="application/json",
+    ),
+    ResourceTemplate(
+        uriTemplate="td://{+path}?view=chop",
+        name="td_chop_summary",
+        title="TouchDesigner CHOP Summary",
+        description="Channel names, sample count, rate and per-channel min / max / mean / first / last "
+                    "of a CHOP, e.g. td://project1/lfo1?view=chop.",
+        mimeType="application/json",
+    ),
+]
+
+
+def parse_uri(uri: str) -> Tuple[str, str]:
+    """Split a td:// URI into (TD path, view). Raises ValueError for anything else."""
+    if not uri.startswith(SCHEME):
+        raise ValueError(f"Not a TouchDesigner resource: {uri}")
+    rest, _, query = uri[len(SCHEME):].partition("?")
+    view = parse_qs(query).get("view", ["node"])[0]
+    if view not in RESOURCE_VIEWS:
+        raise ValueError(f"Unknown view '{view}' in {uri} — use one of: {', '.join(RESOURCE_VIEWS)}")
+    return "/" + unquote(rest).strip("/"), view
+
+
+async def read_resource(client: TDClient, uri: str) -> str:
+    """Fetch a td:// resource from TD as JSON text."""
+    path, view = parse_uri(uri)
+    route, extra = RESOURCE_VIEWS[view]
+    data = await client.request(route, {"path": path, **extra})
+    return json.dumps(data, indent=2)
+
+
+class ResourceSubscriptions:
+    """
+    Subscribed td:// URIs per session, and the poll loop that notifies them.
+
+    The loop runs only while something is subscribed. Each round is one
+    request to TD, however many resources are watched.
+
+    Usage:
+        subs = ResourceSubscriptions(client)
+        await subs.subscribe("td://project1/noise1", session)
+        subs.unsubscribe("td://project1/noise1", session)
+        await subs.close()
+    """
+
+    def __init__(self, client: TDClient, interval: float = 0.5):
+        self.client = client
+        self.interval = interval
+        self._sessions: Dict[str, Set[ServerSession]] = {}
+        self._versions: Dict[str, Optional[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def subscribe(self, uri: str, session: ServerSession) -> None:
+        """Watch uri for session. The current version becomes the baseline."""
+        parse_uri(uri)
+        if uri not in self._sessions:
+            self._versions[uri] = None
+            try:
+                self._versions.update(await self._changed([uri]))
+            except Exception as e:
+                # TD may be down right now — the first successful poll sets the baseline
+                logger.warning(f"Could not read the version of {uri}: {e}")
+        self._sessions.setdefault(uri, set()).add(session)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def unsubscribe(self, uri: str, session: ServerSession) -> None:
+        sessions = self._sessions.get(uri)
+        if sessions is None:
+            return
+        sessions.discard(session)
+        if not sessions:
+            del self._sessions[uri]
+            self._versions.pop(uri, None)
+
+    async def close(self) -> None:
+        self._sessions.clear()
+        self._versions.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _changed(self, uris) -> Dict[str, Optional[str]]:
+        """New versions of those uris whose TD version differs from the stored one."""
+        resources = []
+        for uri in uris:
+            path, view = parse_uri(uri)
+            resources.append({"key": uri, "path": path, "view": view, "version": self._versions.get(uri)})
+        data = await self.client.request("resources/versions", {"resources": resources})
+        return data.get("changed", {})
+
+    async def _run(self) -> None:
+        while self._sessions:
+            await asyncio.sleep(self.interval)
+            try:
+                changed = await self._changed(list(self._sessions))
+            except Exception as e:
+                logger.debug(f"Resource poll failed: {e}")
+                continue
+            for uri, version in changed.items():
+                if uri not in self._sessions:
+                    continue
+                self._versions[uri] = version
+                for session in list(self._sessions[uri]):
+                    try:
+                        await session.send_resource_updated(uri)
+                    except Exception:
+                        # Closed session — drop it from every subscription
+                        for other in list(self._sessions):
+                            self.unsubscribe(other, session)
@@ -0,0 +1,81 @@
+"""
+Parameter Schema Cache
+======================
+On-disk cache of TouchDesigner parameter schemas — the static part of a
+parameter (label, page, style, default, range, menu entries) that is the
+same for every operator of one type in one TD build.
+
+TD returns per-node values plus a schema_id; the schema itself is fetched
+once per id and kept here, so repeated parameter reads only move values.
+"""
+
+import json
+import os
+import re
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("td_mcp.schema_cache")
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "td-mcp" / "param-schemas"
+
+
+class ParamSchemaCache:
+    """
+    Two-level (memory, then disk) cache of parameter schemas keyed by schema_id.
+
+    Usage:
+        cache = ParamSchemaCache()
+        schema = cache.get("noiseTOP@2025.30000")
+        if schema is None:
+            cache.put(schema_id, fetched_schema)
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or os.environ.get("TD_MCP_SCHEMA_DIR", DEFAULT_CACHE_DIR))
+        self._memory: Dict[str, Dict[str, Any]] = {}
+
+    def _file(self, schema_id: str) -> Path:
+        """Filesystem-safe location for a schema id."""
+        return self.directory / (re.sub(r"[^A-Za-z0-9_.@-]", "_", schema_id) + ".json")
+
+    def get(self, schema_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached schema for schema_id, or None."""
+        schema = self._memory.get(schema_id)
+        if schema is not None:
+            return schema
+        try:
+            with open(self._file(schema_id), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get("schema_id") != schema_id:
+            return None
+        schema = stored.get("parameters", {})
+        self._memory[schema_id] = schema
+        return schema
+
+    def put(self, schema_id: str, schema: Dict[str, Any]) -> None:
+        """Store a schema in memory and, best effort, on disk."""
+        self._memory[schema_id] = schema
+        path = self._file(schema_id)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"schema_id": schema_id, "parameters": schema}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write parameter schema cache {path}: {e}")
+
+    @staticmethod
+    def merge(parameters: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine value-only parameters with their static schema entries."""
+        merged = {}
+        for name, state in parameters.items():
+            info = dict(state)
+            for key, val in schema.get(name, {}).items():
+                info.setdefault(key, val)
+            merged[name] = info
+        return merged
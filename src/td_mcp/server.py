@@ -31,24 +31,35 @@ import base64
 from typing import Optional, Dict, Any
 from contextlib import asynccontextmanager
 
+import anyio
 from mcp.server.fastmcp import FastMCP, Context
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.server.stdio import stdio_server
 
-from td_mcp.td_client import TDClient, TouchDesignerConnectionError, TouchDesignerAPIError
+from td_mcp.td_client import TDClient, TouchDesignerConnectionError, TouchDesignerAPIError, chop_block_header
+from td_mcp.schema_cache import ParamSchemaCache
+from td_mcp.resources import RESOURCE_TEMPLATES, ResourceSubscriptions, read_resource, SCHEME
 from td_mcp.models import (
     ResponseFormat,
-    GetNodesInput, NodePathInput, GetParamsInput, SetParamsInput,
-    CreateNodeInput, DeleteNodeInput, CopyNodeInput, RenameNodeInput,
+    CensusInput,
+    GetNodesInput, NodePathInput, NodeDetailInput, GetParamsInput, SetParamsInput,
+    CreateNodeInput, DeleteNodeInput, CopyNodeInput, RenameNodeInput, SetFlagsInput,
     ConnectNodesInput, DisconnectInput,
-    GetContentInput, SetContentInput,
+    GetContentInput, SetContentInput, PatchContentInput,
     ExecPythonInput,
     ScreenshotInput,
-    CHOPDataInput, SOPDataInput,
+    CHOPDataInput, CHOPDataFormat, CHOP_TOOL_MAX_VALUES, SOPDataInput,
     CookingInfoInput,
     SearchNodesInput,
+    QueryInput,
+    LayoutInput, LayoutQuery,
     PythonHelpInput,
     TimelineSetInput,
     PulseParamInput,
-    GetErrorsInput,
+    GetErrorsInput, LogsInput,
+    DiagnosticsInput,
+    JobSubmitInput, JobStatusInput, JobCancelInput,
+    WaitInput,
 )
 
 # ─────────────────────────────────────────────────────────────
@@ -57,6 +68,7 @@ from td_mcp.models import (
 
 TD_HOST = os.environ.get("TD_MCP_HOST", "127.0.0.1")
 TD_PORT = int(os.environ.get("TD_MCP_PORT", "9981"))
+RESOURCE_POLL_S = float(os.environ.get("TD_MCP_RESOURCE_POLL", "0.5"))
 
 logger = logging.getLogger("td_mcp")
 logging.basicConfig(
@@ -84,8 +96,10 @@ async def server_lifespan(app):
             "Tools will retry when called. Start TD and activate the MCP WebServer component."
         )
 
-    yield {"td_client": client}
+    subscriptions = ResourceSubscriptions(client, interval=RESOURCE_POLL_S)
+    yield {"td_client": client, "schema_cache": ParamSchemaCache(), "subscriptions": subscriptions}
 
+    await subscriptions.close()
     await client.close()
     logger.info("TouchDesigner MCP server stopped.")
 
@@ -105,6 +119,26 @@ def _get_client(ctx: Context) -> TDClient:
     return ctx.request_context.lifespan_context["td_client"]
 
 
+async def _with_param_schema(ctx: Context, data: dict) -> dict:
+    """
+    Fill value-only parameters in a TD response back in with their static
+    metadata. The schema is fetched once per schema_id (operator type + TD
+    build) and cached on disk; responses without a schema_id pass through.
+    """
+    schema_id = data.get('schema_id')
+    if not schema_id or 'parameters' not in data:
+        return data
+    cache: ParamSchemaCache = ctx.request_context.lifespan_context["schema_cache"]
+    schema = cache.get(schema_id)
+    if schema is None:
+        fetched = await _get_client(ctx).request("node/params/schema", {'id': data['id']})
+        schema = fetched.get('parameters', {})
+        cache.put(fetched.get('schema_id', schema_id), schema)
+    data['parameters'] = cache.merge(data['parameters'], schema)
+    data.pop('schema_id')
+    return data
+
+
 def _handle_error(e: Exception) -> str:
     """Consistent error formatting."""
     if isinstance(e, TouchDesignerConnectionError):
@@ -126,16 +160,23 @@ def _handle_error(e: Exception) -> str:
 
 
 def _format_nodes_markdown(nodes: list, title: str = "Nodes") -> str:
-    """Format a list of node dicts as readable markdown."""
+    """Format a list of node dicts (optionally nested under 'children') as readable markdown."""
     if not nodes:
         return f"No {title.lower()} found."
 
     lines = [f"## {title} ({len(nodes)})\n"]
-    for n in nodes:
-        icon = {"TOP": "🖼", "CHOP": "📊", "SOP": "🔷", "DAT": "📄", "COMP": "📦", "MAT": "🎨"}.get(n.get('family', ''), "•")
-        lines.append(f"- {icon} **{n['name']}** `{n['path']}` — {n['type']}")
-        if n.get('errors'):
-            lines.append(f"  ⚠️ Error: {n['errors']}")
+
+    def add(items: list, indent: str) -> None:
+        for n in items:
+            icon = {"TOP": "🖼", "CHOP": "📊", "SOP": "🔷", "DAT": "📄", "COMP": "📦", "MAT": "🎨"}.get(n.get('family', ''), "•")
+            lines.append(f"{indent}- {icon} **{n.get('name', n.get('id'))}** `{n.get('path', '')}` — {n.get('type', '')}")
+            if n.get('errors'):
+                lines.append(f"{indent}  ⚠️ Error: {n['errors']}")
+            add(n.get('children', []), indent + "  ")
+            if n.get('children_has_more'):
+                lines.append(f"{indent}  - … {n['children_total'] - len(n.get('children', []))} more")
+
+    add(nodes, "")
     return "\n".join(lines)
 
 
@@ -152,9 +193,8 @@ def _format_params_markdown(params: dict, path: str) -> str:
             current_page = page
             lines.append(f"\n### {page or 'Default'}\n")
         val = info.get('value', '')
-        default = info.get('default', '')
         label = info.get('label', name)
-        marker = " *(modified)*" if val != default else ""
+        marker = " *(modified)*" if 'default' in info and val != info['default'] else ""
         lines.append(f"- **{label}** (`{name}`): `{val}`{marker}")
     return "\n".join(lines)
 
@@ -217,6 +257,40 @@ async def td_list_families(ctx: Context) -> str:
         return _handle_error(e)
 
 
+@mcp.tool(
+    name="td_census",
+    annotations={
+        "title": "Project Census",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+async def td_census(params: CensusInput, ctx: Context) -> str:
+    """One-call overview of a project or subtree, gathered in a single traversal.
+
+    Call this first in a session instead of td_list_families + td_get_errors +
+    td_cooking_info, which each walk the whole tree. Reports counts by family and
+    type, depth stats, error/warning counts (with sample paths), total and top
+    cook times, locked/bypassed counts and the largest COMPs.
+
+    Args:
+        params: path (str, default '/') or id (int), top (int), include_errors (bool),
+                error_samples (int)
+
+    Returns:
+        str: JSON with total_nodes, families, types, depth, comps, locked, bypassed,
+             cook {total_ms, cpu_total_ms, top}, largest_comps, errors.
+    """
+    try:
+        client = _get_client(ctx)
+        data = await client.request("census", params.model_dump(exclude_none=True))
+        return json.dumps(data, indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
 # ═══════════════════════════════════════════════════════════════
 # TOOLS — Node Navigation & Inspection
 # ═══════════════════════════════════════════════════════════════
@@ -234,23 +308,37 @@ async def td_list_families(ctx: Context) -> str:
 async def td_get_nodes(params: GetNodesInput, ctx: Context) -> str:
     """List children of a COMP node at the given path, with optional family/type filtering.
 
-    Use this to explore the node graph. Start from '/' or '/project1' and drill down.
-    Supports pagination for large networks.
+    Use this to explore the node graph. Start from '/' or '/project1' and drill down,
+    or pass depth > 1 to fetch a whole subtree in one call. Children are listed in
+    creation order; page large networks by passing back next_cursor as cursor.
+
+    Every node carries a numeric 'id'. Pass it back as 'id' (instead of 'path')
+    to any tool — ids survive renames and moves, paths do not.
 
     Args:
-        params: path (str), family (optional), type (optional), include_params (bool),
-                limit (int), offset (int), response_format
+        params: path (str) or id (int), family (optional), type (optional),
+                include_params (bool), limit (int), offset (int), cursor (str),
+                depth (int, default 1), tree_format ('nested' | 'flat'),
+                child_limit (int), max_nodes (int), fields (optional list of str),
+                response_format
 
     Returns:
-        str: JSON with nodes array, total count, pagination info.
-             Each node has: name, path, type, family, errors, warnings.
+        str: JSON with nodes array, total count, pagination info
+             (next_cursor while more pages remain). Each node has: id, name, path, type, family, errors, warnings
+             (only id plus the requested ones when fields is given).
+             With depth > 1, expanded COMPs carry children_total / children_has_more
+             (and 'children' when nested); flat nodes carry depth and parent_id.
+             'truncated' is true when max_nodes cut the walk short.
     """
     try:
         client = _get_client(ctx)
         data = await client.request("nodes", params.model_dump(exclude={'response_format'}, exclude_none=True))
 
         if params.response_format == ResponseFormat.MARKDOWN:
-            return _format_nodes_markdown(data.get('nodes', []), f"Children of {params.path}")
+            text = _format_nodes_markdown(data.get('nodes', []), f"Children of {data.get('path', params.path)}")
+            if data.get('next_cursor'):
+                text += f"\n\n_{data['total'] - data['offset'] - data['count']} more — next page: cursor `{data['next_cursor']}`_"
+            return text
 
         return json.dumps(data, indent=2)
     except Exception as e:
@@ -267,12 +355,16 @@ async def td_get_nodes(params: GetNodesInput, ctx: Context) -> str:
         "openWorldHint": False,
     }
 )
-async def td_get_node_detail(params: NodePathInput, ctx: Context) -> str:
+async def td_get_node_detail(params: NodeDetailInput, ctx: Context) -> str:
     """Get comprehensive detail about a single node: all parameters, connections,
     errors, position, and child count (if COMP).
 
+    Pass fields to fetch only part of it (e.g. ['errors', 'inputs']) — TD then
+    skips the rest, including evaluating every parameter.
+
     Args:
-        params: path (str) — absolute path to the node
+        params: path (str) — absolute path to the node, or id (int);
+                fields (optional list of str)
 
     Returns:
         str: JSON with full node info including parameters dict, inputs/outputs
@@ -280,7 +372,9 @@ async def td_get_node_detail(params: NodePathInput, ctx: Context) -> str:
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("node/detail", {"path": params.path})
+        body = params.model_dump(exclude={'response_format'}, exclude_none=True)
+        body['schema'] = 'ref'
+        data = await _with_param_schema(ctx, await client.request("node/detail", body))
 
         if params.response_format == ResponseFormat.MARKDOWN:
             lines = [f"## {data.get('name', '?')} (`{data.get('path', '?')}`)\n"]
@@ -294,7 +388,7 @@ async def td_get_node_detail(params: NodePathInput, ctx: Context) -> str:
             if data.get('children_count'):
                 lines.append(f"- **Children**: {data['children_count']}")
             if data.get('parameters'):
-                lines.append(_format_params_markdown(data['parameters'], data['path']))
+                lines.append(_format_params_markdown(data['parameters'], data.get('path', '?')))
             return "\n".join(lines)
 
         return json.dumps(data, indent=2)
@@ -315,22 +409,35 @@ async def td_get_node_detail(params: NodePathInput, ctx: Context) -> str:
 async def td_get_params(params: GetParamsInput, ctx: Context) -> str:
     """Get parameters of a specific node, optionally filtered by page or parameter names.
 
-    Each parameter includes: value, default, label, style, readOnly flag,
-    isPulse, isMenu, and menu options if applicable.
+    Each parameter includes: value, expr, mode, default, label, style, readOnly
+    flag, isPulse, isMenu, and menu options if applicable. The static part is
+    cached per operator type, so only values travel from TD on repeat reads.
+    Set include_schema=false to get just value/expr/mode (custom parameters,
+    menuSource-driven menus and sequence-block parameters always keep their
+    full metadata).
+
+    Pass fields (e.g. ['value'] or ['expr', 'mode']) to read only those keys;
+    TD then computes nothing else.
 
     Args:
-        params: path (str), page (optional str), names (optional list of str)
+        params: path (str) or id (int), page (optional str), names (optional list of str),
+                include_schema (bool, default true), fields (optional list of str)
 
     Returns:
-        str: JSON with parameters dict keyed by parameter name.
+        str: JSON with parameters dict keyed by parameter name
+             (plus schema_id when include_schema is false).
     """
     try:
         client = _get_client(ctx)
-        body = params.model_dump(exclude={'response_format'}, exclude_none=True)
+        body = params.model_dump(exclude={'response_format', 'include_schema'}, exclude_none=True)
+        if not params.fields:
+            body['schema'] = 'ref'
         data = await client.request("node/params", body)
+        if params.include_schema:
+            data = await _with_param_schema(ctx, data)
 
         if params.response_format == ResponseFormat.MARKDOWN:
-            return _format_params_markdown(data.get('parameters', {}), params.path)
+            return _format_params_markdown(data.get('parameters', {}), data.get('path', params.path))
 
         return json.dumps(data, indent=2)
     except Exception as e:
@@ -364,16 +471,23 @@ async def td_set_params(params: SetParamsInput, ctx: Context) -> str:
     - Math: {"rotate": {"expr": "sin(absTime.seconds) * 360"}}
     - Other node ref: {"seed": {"expr": "op('lfo1').par.amp.eval()"}}
 
+    Many nodes in one call (one undo step):
+    - Same values everywhere: {"selector": {"path": "/project1", "family": "TOP"}, "params": {"resolutionw": 1920}}
+    - One value per node: {"selector": {...}, "params": {"seed": {"each": [1, 2, 3]}}}
+    - Different params per node: {"targets": [{"path": ".../noise1", "params": {"amp": 0.2}}, ...]}
+
     Args:
-        params: path (str), params (dict of param_name → value or {expr: str})
+        params: path (str) or id (int), params (dict of param_name → value or {expr: str})
                 Example: {"path": "/project1/noise1", "params": {"seed": {"expr": "absTime.seconds * 10"}, "amp": 0.5}}
+                or targets (list) / selector (object) instead of path, plus verbose (bool)
 
     Returns:
         str: JSON with results for each parameter (success/failure + mode + value).
+             Multi-target: counts plus a compact list of failures ({id, path, param, error}).
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("node/params/set", params.model_dump())
+        data = await client.request("node/params/set", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -407,13 +521,15 @@ async def td_create_node(params: CreateNodeInput, ctx: Context) -> str:
 
     Use nodeX/nodeY to position nodes in the network editor for readability.
     Space nodes ~200px apart horizontally, ~200px apart vertically for clean layouts.
+    Set auto_place to let TD pick the nearest free spot (around nodeX/nodeY if
+    given) instead of listing the network to find open space.
 
     Args:
-        params: parent_path (str), node_type (str), name (optional str),
-                nodeX (optional int), nodeY (optional int)
+        params: parent_path (str) or parent_id (int), node_type (str), name (optional str),
+                nodeX (optional int), nodeY (optional int), auto_place (bool)
 
     Returns:
-        str: JSON with success flag and created node info (name, path, type, family, position).
+        str: JSON with success flag and created node info (id, name, path, type, family, position).
     """
     try:
         client = _get_client(ctx)
@@ -423,6 +539,42 @@ async def td_create_node(params: CreateNodeInput, ctx: Context) -> str:
         return _handle_error(e)
 
 
+@mcp.tool(
+    name="td_layout",
+    annotations={
+        "title": "Network Layout Query",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+async def td_layout(params: LayoutInput, ctx: Context) -> str:
+    """Answer placement questions about a COMP's network in one cheap call,
+    from a spatial index TouchDesigner keeps of node positions.
+
+    - 'free': nearest spot near (x, y) where a width × height node keeps `margin`
+      clear of everything (omit x/y to extend right of the existing network)
+    - 'overlaps': nodes whose tiles overlap the box (x, y, width, height)
+    - 'bounds': bounding box of all nodes in the COMP
+
+    Args:
+        params: query ('free' | 'overlaps' | 'bounds'), path (str) or id (int),
+                x, y, width, height, margin
+
+    Returns:
+        str: JSON — 'free': x, y; 'overlaps': nodes with their boxes;
+             'bounds': x0, y0, x1, y1, width, height, count.
+    """
+    try:
+        client = _get_client(ctx)
+        body = params.model_dump(mode='json', exclude={'query'}, exclude_none=True)
+        data = await client.request(f"layout/{params.query.value}", body)
+        return json.dumps(data, indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
 @mcp.tool(
     name="td_delete_node",
     annotations={
@@ -434,17 +586,23 @@ async def td_create_node(params: CreateNodeInput, ctx: Context) -> str:
     }
 )
 async def td_delete_node(params: DeleteNodeInput, ctx: Context) -> str:
-    """Delete a node from TouchDesigner. This is irreversible.
+    """Delete a node — or every node matched by a selector — from TouchDesigner.
+
+    A selector (name patterns, path glob, family/type, tags or explicit
+    paths/ids) deletes all matches in one call and one undo step. Use
+    selector.dry_run to see what would go first.
 
     Args:
-        params: path (str) — absolute path to the node to destroy
+        params: path (str) or id (int) — the node to destroy,
+                or selector (object) — the nodes to destroy
 
     Returns:
-        str: JSON with success flag and deleted node info.
+        str: JSON with success flag and deleted node info; for a selector,
+             matched/succeeded/failed counts and {id, path, ok} per node.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("node/delete", params.model_dump())
+        data = await client.request("node/delete", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -463,11 +621,17 @@ async def td_delete_node(params: DeleteNodeInput, ctx: Context) -> str:
 async def td_copy_node(params: CopyNodeInput, ctx: Context) -> str:
     """Duplicate/copy a node, optionally into a different parent COMP.
 
+    With a selector, every match is copied in one call and one undo step,
+    named <name><name_suffix> and shifted by offset_x/offset_y.
+
     Args:
-        params: source_path (str), dest_parent (optional str), new_name (optional str)
+        params: source_path (str) or source_id (int), or selector (object),
+                dest_parent (optional str) or dest_parent_id (optional int), new_name (optional str),
+                name_suffix, offset_x, offset_y (selector only)
 
     Returns:
-        str: JSON with success flag and new node info.
+        str: JSON with success flag and new node info; for a selector,
+             {id, path, ok, new_id, new_path} per node.
     """
     try:
         client = _get_client(ctx)
@@ -488,17 +652,50 @@ async def td_copy_node(params: CopyNodeInput, ctx: Context) -> str:
     }
 )
 async def td_rename_node(params: RenameNodeInput, ctx: Context) -> str:
-    """Rename a node.
+    """Rename a node, or every node matched by a selector.
+
+    Args:
+        params: path (str) or id (int), new_name (str) — or
+                selector (object) with find/replace, prefix and/or suffix
+
+    Returns:
+        str: JSON with id, old name, new name, and updated path.
+             The id is unchanged by the rename and can keep being used.
+    """
+    try:
+        client = _get_client(ctx)
+        data = await client.request("node/rename", params.model_dump(exclude_none=True))
+        return json.dumps(data, indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
+@mcp.tool(
+    name="td_set_flags",
+    annotations={
+        "title": "Set Node Flags",
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+async def td_set_flags(params: SetFlagsInput, ctx: Context) -> str:
+    """Set bypass, lock, display and/or render flags on a node or a selector's matches.
+
+    With a selector (e.g. {"path": "/project1", "pattern": "blur*", "family": "TOP"})
+    all matches change in one call and one undo step.
 
     Args:
-        params: path (str), new_name (str)
+        params: path (str) or id (int), or selector (object);
+                bypass, lock, display, render (optional bool — only given flags change)
 
     Returns:
-        str: JSON with old name, new name, and updated path.
+        str: JSON with the flags set; for a selector, {id, path, ok} per node.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("node/rename", params.model_dump())
+        data = await client.request("node/flags", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -525,7 +722,7 @@ async def td_connect_nodes(params: ConnectNodesInput, ctx: Context) -> str:
     use bridge operators (e.g. CHOPtoTOP, TOPtoCHOP).
 
     Args:
-        params: source_path (str), target_path (str),
+        params: source_path (str) or source_id (int), target_path (str) or target_id (int),
                 source_index (int, default 0), target_index (int, default 0)
 
     Returns:
@@ -533,7 +730,7 @@ async def td_connect_nodes(params: ConnectNodesInput, ctx: Context) -> str:
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("node/connect", params.model_dump())
+        data = await client.request("node/connect", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -553,14 +750,14 @@ async def td_disconnect(params: DisconnectInput, ctx: Context) -> str:
     """Disconnect a node's input or output connector.
 
     Args:
-        params: path (str), connector_type ('input' or 'output'), index (int)
+        params: path (str) or id (int), connector_type ('input' or 'output'), index (int)
 
     Returns:
         str: JSON with success flag.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("node/disconnect", params.model_dump())
+        data = await client.request("node/disconnect", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -583,14 +780,14 @@ async def td_get_connections(params: NodePathInput, ctx: Context) -> str:
     useful for understanding the signal flow in a network.
 
     Args:
-        params: path (str)
+        params: path (str) or id (int)
 
     Returns:
-        str: JSON with 'inputs' and 'outputs' arrays showing connected node paths and indices.
+        str: JSON with 'inputs' and 'outputs' arrays showing connected node paths, ids and indices.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("node/connections", {"path": params.path})
+        data = await client.request("node/connections", params.model_dump(exclude={'response_format'}, exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -613,18 +810,25 @@ async def td_get_connections(params: NodePathInput, ctx: Context) -> str:
 async def td_get_content(params: GetContentInput, ctx: Context) -> str:
     """Read text or table content from a DAT node (Text DAT, Table DAT, Script DAT, etc.).
 
-    For table DATs: returns a 2D array of cell values.
-    For text DATs: returns the raw text string.
+    For table DATs: returns a 2D array of cell values, windowed by row_offset /
+    row_limit (default 1000 rows) and col_offset / col_limit; row_step samples
+    every Nth row. For text DATs: returns the whole text exactly, or with
+    line_offset / line_limit a range of lines (line endings kept). Use
+    count_only to check the size first, or header_only to read just a
+    table's column names.
 
     Args:
-        params: path (str) — path to a DAT node
+        params: path (str) or id (int) — a DAT node; row_offset, row_limit, row_step,
+                col_offset, col_limit, line_offset, line_limit, header_only, count_only
 
     Returns:
-        str: JSON with format ('text' or 'table') and the content data.
+        str: JSON with format ('text' or 'table'), the size (numRows/numCols or
+             length/total_lines), the content data, and has_more when windowed.
+             Text responses carry a 'hash' to use as base_hash for td_patch_content.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("node/content", params.model_dump())
+        data = await client.request("node/content", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -644,16 +848,58 @@ async def td_set_content(params: SetContentInput, ctx: Context) -> str:
     """Write text or table content to a DAT node.
 
     Provide either 'text' (for Text/Script DATs) or 'table' (2D array for Table DATs).
+    For large tables prefer the row-level modes, which only touch what changes:
+    - 'append_rows' / 'replace_rows' (rows, start_row)
+    - 'set_cells' (cells: [{row, col, value}])
+    - 'delete_rows' (row_indices)
+    - 'diff' (table — the full desired table; only changed rows/cells are written)
 
     Args:
-        params: path (str), text (optional str), table (optional 2D list of strings)
+        params: path (str) or id (int), mode (str, default 'replace'), text (optional str),
+                table (optional 2D list of strings), rows, start_row, cells, row_indices
 
     Returns:
-        str: JSON with success flag and content length.
+        str: JSON with success flag and content length, or for row-level modes the
+             resulting table size plus counts of rows/cells written.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("node/content/set", params.model_dump(exclude_none=True))
+        data = await client.request("node/content/set", params.model_dump(mode='json', exclude_none=True))
+        return json.dumps(data, indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
+@mcp.tool(
+    name="td_patch_content",
+    annotations={
+        "title": "Patch DAT Text",
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": False,
+    }
+)
+async def td_patch_content(params: PatchContentInput, ctx: Context) -> str:
+    """Edit part of a text DAT (Python extension, GLSL shader, script) without
+    resending the whole text.
+
+    Read the DAT with td_get_content first (a line range is enough) and pass its
+    'hash' as base_hash. Then send either a unified diff or line-range edits.
+    The patch is rejected, and nothing changes, if the DAT was modified since
+    that hash or a hunk's context does not match.
+
+    Args:
+        params: path (str) or id (int), base_hash (str), and either
+                diff (unified diff str) or edits ([{line_offset, line_count, text}])
+
+    Returns:
+        str: JSON with the new 'hash' (use it as base_hash for the next patch),
+             line count and lines_delta — or an error with current_hash.
+    """
+    try:
+        client = _get_client(ctx)
+        data = await client.request("node/content/patch", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -723,7 +969,7 @@ async def td_screenshot(params: ScreenshotInput, ctx: Context) -> str:
     (render TOPs, null TOPs, composite TOPs, etc.) to see its current output.
 
     Args:
-        params: path (str) — path to a TOP node
+        params: path (str) or id (int) — a TOP node
 
     Returns:
         str: JSON with success, width, height, format, data_base64, and size_bytes.
@@ -731,7 +977,7 @@ async def td_screenshot(params: ScreenshotInput, ctx: Context) -> str:
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("screenshot", params.model_dump())
+        data = await client.request("screenshot", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -754,21 +1000,48 @@ async def td_screenshot(params: ScreenshotInput, ctx: Context) -> str:
 async def td_chop_data(params: CHOPDataInput, ctx: Context) -> str:
     """Read channel values from a CHOP node.
 
-    Returns sample values for each channel. Large datasets are automatically
-    downsampled to ~1000 samples. Use the 'channels' filter for specific channels
-    and 'range' for sample subsets.
+    Returns sample values for each channel. Channels longer than max_points
+    (default 1000) are downsampled; the default 'minmax' method keeps every
+    bucket's min and max, so peaks and transients survive. Use the 'channels'
+    filter (names or patterns) for specific channels and 'range' for sample subsets.
+
+    With format 'binary' TD sends the selected block as raw float32 instead of
+    JSON and nothing is downsampled. The block comes back base64-encoded with
+    its shape, so it is capped at CHOP_TOOL_MAX_VALUES (16384) values — larger
+    selections are refused before TD copies anything. For the overall shape of
+    big CHOPs use the JSON downsampling or the td://<path>?view=chop resource.
 
     Args:
-        params: path (str), channels (optional list), range (optional [start, end])
+        params: path (str) or id (int), channels (optional list), range (optional [start, end]),
+                format ('json' | 'binary'), max_points (int),
+                downsample ('minmax' | 'lttb' | 'mean' | 'stride')
 
     Returns:
         str: JSON with numChans, numSamples, rate, and channels dict
-             (each channel has 'values' array and 'downsampled' flag).
+             (each channel has 'values' array and 'downsampled' flag; downsampled
+             channels add 'indices' — the sample index of each value — 'method'
+             and 'original_length', the number of samples in the selected range).
+             Binary: channels (names), shape [channels, samples], start/end,
+             dtype 'float32', byteorder 'little' and data_base64.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("chop/data", params.model_dump(exclude_none=True))
+        body = params.model_dump(mode='json', exclude_none=True)
+        if params.format == CHOPDataFormat.BINARY:
+            body['max_values'] = CHOP_TOOL_MAX_VALUES
+        data = await client.request("chop/data", body)
+        if 'binary' in data:
+            raw = data['binary']
+            data, offset = chop_block_header(raw)
+            data['byteorder'] = 'little'
+            data['data_base64'] = base64.b64encode(memoryview(raw)[offset:]).decode('ascii')
         return json.dumps(data, indent=2)
+    except TouchDesignerAPIError as e:
+        if 'max_values' in e.details:
+            ref = (params.path or '').lstrip('/')
+            return (f"Error: {str(e)}\n\nUse format 'json' for a downsampled view"
+                    + (f", or read the td://{ref}?view=chop resource for per-channel stats." if ref else "."))
+        return _handle_error(e)
     except Exception as e:
         return _handle_error(e)
 
@@ -790,7 +1063,7 @@ async def td_sop_data(params: SOPDataInput, ctx: Context) -> str:
     point cloud data. Limited to 'limit' points/prims by default.
 
     Args:
-        params: path (str), include_points (bool), include_prims (bool), limit (int)
+        params: path (str) or id (int), include_points (bool), include_prims (bool), limit (int)
 
     Returns:
         str: JSON with numPoints, numPrims, numVertices, and optional
@@ -798,7 +1071,7 @@ async def td_sop_data(params: SOPDataInput, ctx: Context) -> str:
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("sop/data", params.model_dump())
+        data = await client.request("sop/data", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -822,17 +1095,18 @@ async def td_cooking_info(params: CookingInfoInput, ctx: Context) -> str:
     """Get cooking performance data: cook times per node, sorted by slowest.
 
     Use this to identify performance bottlenecks in a TD network.
-    Set recurse=True to scan an entire sub-network.
+    Set recurse=True to scan an entire sub-network. When more nodes than limit
+    were found, next_cursor pages through the same ranking.
 
     Args:
-        params: path (str), recurse (bool), sort_by (str), limit (int)
+        params: path (str) or id (int), recurse (bool), sort_by (str), limit (int), cursor (str)
 
     Returns:
         str: JSON with fps, realTime, frame, and nodes array sorted by cook time.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("cooking", params.model_dump())
+        data = await client.request("cooking", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -855,21 +1129,76 @@ async def td_cooking_info(params: CookingInfoInput, ctx: Context) -> str:
 async def td_search_nodes(params: SearchNodesInput, ctx: Context) -> str:
     """Search for nodes by name, type, or family (case-insensitive, substring match).
 
-    Recursively searches from the given path. Use search_type to narrow:
+    Recursively searches from the given path. Answered from a scene index that
+    TouchDesigner keeps up to date, so it stays fast on very large projects.
+    Use search_type to narrow:
     - 'name': match node names
     - 'type': match operator types (e.g. 'noiseTOP')
     - 'family': match families (e.g. 'TOP', 'CHOP')
     - 'all': match any field
 
+    Use match to go beyond substrings — results are then ranked TD-side and only
+    the best `limit` come back, each with a 0-100 'score':
+    - 'fuzzy': typo-tolerant and camelCase/snake_case aware
+      ('nbm' or 'nosie_bg' both find noise_bg_main2)
+    - 'regex': Python regular expression, e.g. '^noise\\d+$'
+
+    Args:
+        params: query (str), path (str) or id (int), search_type (str), limit (int),
+                match ('substring' | 'regex' | 'fuzzy'), min_score (float), case_sensitive (bool),
+                cursor (str — next_cursor of the previous page, substring only),
+                fields (optional list of str — e.g. ['path', 'type'] for a cheap result)
+
+    Returns:
+        str: JSON with matching nodes array; a full page also has next_cursor.
+             Ranked searches return nodes best first plus matched / scanned counts.
+    """
+    try:
+        client = _get_client(ctx)
+        data = await client.request("search", params.model_dump(exclude_none=True))
+        return json.dumps(data, indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
+@mcp.tool(
+    name="td_query",
+    annotations={
+        "title": "Query Node Graph",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+async def td_query(params: QueryInput, ctx: Context) -> str:
+    """Answer questions about the node graph declaratively — instead of writing a
+    td_exec_python script. Runs natively inside TouchDesigner.
+
+    Filter by family, type, path_glob, name_glob and 'where' conditions on any
+    field (including parameter values as 'par.<name>'); project columns with
+    'select'; optionally group_by + aggregate (count/sum/avg/min/max); sort with
+    order_by ('-field' for descending); window with limit/offset.
+
+    Example — TOPs under /project1 wider than 1920, slowest first:
+        {"path": "/project1", "family": "TOP",
+         "where": [{"field": "width", "op": ">", "value": 1920}],
+         "select": ["path", "width", "cookTime"], "order_by": ["-cookTime"]}
+
+    Example — total cook time per family:
+        {"group_by": ["family"], "aggregate": [{"fn": "sum", "field": "cookTime"}]}
+
     Args:
-        params: query (str), path (str), search_type (str), limit (int)
+        params: path (str) or id (int), recurse, family, type, path_glob, name_glob,
+                where, select, group_by, aggregate, order_by, limit, offset
 
     Returns:
-        str: JSON with matching nodes array.
+        str: JSON with 'columns' and compact typed 'rows' (one list per row),
+             plus total, matched, scanned and has_more.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("search", params.model_dump())
+        data = await client.request("query", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -894,15 +1223,73 @@ async def td_get_errors(params: GetErrorsInput, ctx: Context) -> str:
 
     Use this to diagnose broken networks or verify a node chain is healthy.
 
+    After an edit, prefer `since`: TD tracks error state incrementally (nodes
+    the API touched and their outputs are re-checked on the next frames, the
+    rest by a background pass), so asking "what changed since seq N" costs
+    O(changes) instead of a walk of the project. A full check returns
+    'changes_seq' to start from; each since-call returns 'next' for the
+    following one.
+
     Args:
-        params: path (str, default '/'), recurse (bool, default True)
+        params: path (str, default '/') or id (int), recurse (bool, default True),
+                limit (int, optional page size), cursor (str — next_cursor of the previous page),
+                since (int — transitions after this seq), include_current (bool)
 
     Returns:
-        str: JSON with issues array (each has path, errors, warnings).
+        str: JSON with issues array (each has path, errors, warnings);
+             a full page also has next_cursor. With since: events (raised / changed /
+             cleared / removed), next, nodes_with_errors / nodes_with_warnings and
+             baseline_complete.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("node/errors", params.model_dump())
+        if params.since is not None:
+            body = {"after": params.since, "include_current": params.include_current}
+            if params.id is not None:
+                body["id"] = params.id
+            else:
+                body["path"] = params.path
+            if params.limit is not None:
+                body["limit"] = params.limit
+            data = await client.request("errors/changes", body)
+            return json.dumps(data, indent=2)
+        data = await client.request("node/errors", params.model_dump(exclude={'since', 'include_current'}, exclude_none=True))
+        return json.dumps(data, indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
+@mcp.tool(
+    name="td_logs",
+    annotations={
+        "title": "Tail TouchDesigner Logs",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+async def td_logs(params: LogsInput, ctx: Context) -> str:
+    """Read TouchDesigner's script output: prints, tracebacks and logging records.
+
+    Everything written to stdout/stderr inside TD (Execute DATs, extensions,
+    callbacks — not only td_exec_python) is kept in a ring buffer of recent
+    lines, each with a sequence number, level ('info' for stdout, 'error' for
+    stderr, logging levels otherwise) and source (the DAT that printed).
+    Lines written from background threads have no frame, and printed ones
+    no source. To tail, pass the 'next' of the previous call as 'after' — only new lines
+    come back.
+
+    Args:
+        params: after (int), limit (int), min_level (str), source (glob), contains (str)
+
+    Returns:
+        str: JSON with entries (seq, time, frame, level, source, text), next,
+             latest, has_more, and dropped (lines that left the buffer unread).
+    """
+    try:
+        client = _get_client(ctx)
+        data = await client.request("logs", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -983,14 +1370,14 @@ async def td_pulse_param(params: PulseParamInput, ctx: Context) -> str:
     Many TD operators have pulse parameters that trigger one-shot actions.
 
     Args:
-        params: path (str), param (str) — the parameter name to pulse
+        params: path (str) or id (int), param (str) — the parameter name to pulse
 
     Returns:
         str: JSON with success flag.
     """
     try:
         client = _get_client(ctx)
-        data = await client.request("pulse", params.model_dump())
+        data = await client.request("pulse", params.model_dump(exclude_none=True))
         return json.dumps(data, indent=2)
     except Exception as e:
         return _handle_error(e)
@@ -1053,13 +1440,274 @@ async def td_python_classes(ctx: Context) -> str:
         return _handle_error(e)
 
 
+# ═══════════════════════════════════════════════════════════════
+# TOOLS — Background Jobs
+# ═══════════════════════════════════════════════════════════════
+
+_JOB_ACTIVE_STATES = ('queued', 'running')
+
+
+@mcp.tool(
+    name="td_job_submit",
+    annotations={
+        "title": "Submit Background Job",
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": False,
+    }
+)
+async def td_job_submit(params: JobSubmitInput, ctx: Context) -> str:
+    """Run a long operation inside TouchDesigner as a frame-sliced background job.
+
+    Instead of running to completion inside one request (which freezes TD for
+    its whole duration), the job is advanced a few milliseconds per frame.
+    Prefer this over the regular tools on very large projects:
+    - 'errors' / 'cooking' / 'search' / 'families' / 'query' / 'census': recursive scans
+    - 'export': serialize a whole subtree, optionally with parameters
+    - 'build': create many nodes (with params) and wire them in one go
+    - 'wait': check conditions every frame (td_wait does this and waits for you)
+
+    Then use td_job_status to wait for and collect the result. Nodes deleted
+    while a scan runs are left out and counted in the result's 'skipped'.
+
+    Args:
+        params: kind (str), params (dict) — the job's parameters
+
+    Returns:
+        str: JSON with job_id and initial state.
+    """
+    try:
+        client = _get_client(ctx)
+        data = await client.request("jobs/submit", params.model_dump())
+        return json.dumps(data, indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
+@mcp.tool(
+    name="td_job_status",
+    annotations={
+        "title": "Get Background Job Status / Result",
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": False,
+    }
+)
+async def td_job_status(params: JobStatusInput, ctx: Context) -> str:
+    """Check on a background job, optionally waiting for it, and collect its result.
+
+    With wait_seconds > 0 this waits (polling TD with backoff) until the job
+    finishes or the wait runs out. A finished job's result is returned and the
+    job is forgotten, unless collect=False. Omit job_id to list all jobs.
+
+    Args:
+        params: job_id (optional int), wait_seconds (float), collect (bool)
+
+    Returns:
+        str: JSON with state ('queued', 'running', 'done', 'error', 'cancelled'),
+             progress (steps, cpu_ms, frames) and 'result' once done.
+    """
+    try:
+        client = _get_client(ctx)
+        if params.job_id is None:
+            data = await client.request("jobs/status", {})
+            return json.dumps(data, indent=2)
+
+        body = {"job_id": params.job_id}
+        data = await client.poll(
+            "jobs/status", body,
+            until=lambda r: r.get('state') not in _JOB_ACTIVE_STATES,
+            timeout=params.wait_seconds,
+        )
+        if params.collect and data.get('state') not in _JOB_ACTIVE_STATES:
+            data = await client.request("jobs/result", body)
+        return json.dumps(data, indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
+@mcp.tool(
+    name="td_job_cancel",
+    annotations={
+        "title": "Cancel Background Job",
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+async def td_job_cancel(params: JobCancelInput, ctx: Context) -> str:
+    """Cancel a queued or running background job. Work already done is kept
+    (e.g. nodes a 'build' job has created are not removed).
+
+    Args:
+        params: job_id (int)
+
+    Returns:
+        str: JSON with the job's final state.
+    """
+    try:
+        client = _get_client(ctx)
+        data = await client.request("jobs/cancel", params.model_dump())
+        return json.dumps(data, indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
+@mcp.tool(
+    name="td_wait",
+    annotations={
+        "title": "Wait For Condition",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+async def td_wait(params: WaitInput, ctx: Context) -> str:
+    """Wait until conditions hold inside TouchDesigner, checked once per frame.
+
+    Use instead of calling td_get_errors / td_cooking_info / td_timeline in a
+    loop — e.g. after changing a shader, loading a movie or starting playback:
+    - {"type": "no_errors", "path": "/project1/glsl1"}
+    - {"type": "cooked", "path": "/project1/movie1", "after_frame": 1200}
+    - {"type": "param", "path": "/project1/movie1", "par": "play", "value": true}
+    - {"type": "frame", "frame": 600}
+    - {"type": "expr", "expr": "op('/project1/movie1').numImages > 0"}
+
+    Args:
+        params: conditions (list), mode ('all' | 'any'), timeout (seconds)
+
+    Returns:
+        str: JSON with satisfied, timed_out, frames_waited, elapsed_s and the
+             last observed value of each condition.
+    """
+    try:
+        client = _get_client(ctx)
+        data = await client.request("wait", params.model_dump(exclude_none=True))
+        if 'job_id' not in data:
+            return json.dumps(data, indent=2)
+
+        body = {"job_id": data['job_id']}
+        data = await client.poll(
+            "jobs/status", body,
+            until=lambda r: r.get('state') not in _JOB_ACTIVE_STATES,
+            timeout=params.timeout + 2.0,
+            interval=0.05,
+            max_interval=0.5,
+        )
+        if data.get('state') in _JOB_ACTIVE_STATES:
+            # TD stopped advancing the wait (e.g. it is not cooking) — don't leave it behind
+            data = await client.request("jobs/cancel", body)
+            return json.dumps({'satisfied': False, 'timed_out': True, 'job': data}, indent=2)
+        data = await client.request("jobs/result", body)
+        return json.dumps(data.get('result', data), indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
+# ═══════════════════════════════════════════════════════════════
+# TOOLS — Diagnostics
+# ═══════════════════════════════════════════════════════════════
+
+@mcp.tool(
+    name="td_diagnostics",
+    annotations={
+        "title": "TD Bridge Diagnostics",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": False,
+    }
+)
+async def td_diagnostics(params: DiagnosticsInput, ctx: Context) -> str:
+    """Get request diagnostics from the TouchDesigner side of the bridge.
+
+    Reports, per API route: call count, error count, average/max handler time,
+    average JSON serialize time, and average/max response size. Also returns
+    the most recent request records and a log of slow requests (with the TD
+    frame number and a digest of the request body).
+
+    Use this when tools feel slow or TouchDesigner hitches during agent work.
+
+    Args:
+        params: recent (int) — number of recent request records, reset (bool)
+
+    Returns:
+        str: JSON with 'routes' stats, 'recent' records, and 'slow' request log.
+    """
+    try:
+        client = _get_client(ctx)
+        data = await client.request("diagnostics", params.model_dump())
+        return json.dumps(data, indent=2)
+    except Exception as e:
+        return _handle_error(e)
+
+
+# ═══════════════════════════════════════════════════════════════
+# RESOURCES — td:// operators, DAT content, CHOP summaries
+# ═══════════════════════════════════════════════════════════════
+# FastMCP's resource templates match one path segment per placeholder,
+# while TD paths are nested, so td:// URIs are handled by the low-level
+# read / subscribe handlers here and anything else goes to FastMCP.
+# FastMCP keeps its low-level server in _mcp_server (mcp 1.x); everything
+# below goes through that server's public API.
+
+_server = mcp._mcp_server
+
+
+@_server.list_resource_templates()
+async def _list_resource_templates():
+    return await mcp.list_resource_templates() + RESOURCE_TEMPLATES
+
+
+@_server.read_resource()
+async def _read_resource(uri):
+    if not str(uri).startswith(SCHEME):
+        return await mcp.read_resource(uri)
+    client = _server.request_context.lifespan_context["td_client"]
+    return [ReadResourceContents(content=await read_resource(client, str(uri)), mime_type="application/json")]
+
+
+@_server.subscribe_resource()
+async def _subscribe_resource(uri):
+    context = _server.request_context
+    await context.lifespan_context["subscriptions"].subscribe(str(uri), context.session)
+
+
+@_server.unsubscribe_resource()
+async def _unsubscribe_resource(uri):
+    context = _server.request_context
+    context.lifespan_context["subscriptions"].unsubscribe(str(uri), context.session)
+
+
+def _initialization_options():
+    """
+    Initialization options advertising resources/subscribe. The low-level
+    server reports subscribe=False whatever handlers are registered (mcp
+    1.x, checked against 1.30), so the flag is set on the options it builds.
+    """
+    options = _server.create_initialization_options()
+    if options.capabilities.resources is not None:
+        options.capabilities.resources.subscribe = True
+    return options
+
+
+async def _run_stdio():
+    """FastMCP's stdio loop, with the initialization options above."""
+    async with stdio_server() as (read_stream, write_stream):
+        await _server.run(read_stream, write_stream, _initialization_options())
+
+
 # ═══════════════════════════════════════════════════════════════
 # Entry Point
 # ═══════════════════════════════════════════════════════════════
 
 def main():
     """Run the MCP server with stdio transport."""
-    mcp.run()
+    anyio.run(_run_stdio)
 
 
 if __name__ == "__main__":
@@ -6,11 +6,15 @@ TouchDesigner. Handles connection pooling, retries, health checks,
 and error normalization.
 """
 
+import array
+import asyncio
 import httpx
 import json
+import sys
 import time
 import logging
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
 
 logger = logging.getLogger("td_mcp.client")
 
@@ -44,6 +48,7 @@ class TDClient:
         port: int = 9981,
         timeout: float = 15.0,
         max_retries: int = 2,
+        etag_cache_size: int = 256,
     ):
         self.base_url = f"http://{host}:{port}"
         self.timeout = timeout
@@ -52,6 +57,9 @@ class TDClient:
         self._last_health_check: float = 0
         self._health_cache_ttl: float = 5.0
         self._is_connected: bool = False
+        # (endpoint, body) → (ETag, response bytes), revalidated with If-None-Match
+        self._etag_cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._etag_cache_size = etag_cache_size
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create the HTTP client."""
@@ -160,23 +168,112 @@ class TDClient:
 
         raise TouchDesignerConnectionError(f"All retry attempts failed: {last_error}")
 
+    async def poll(
+        self,
+        endpoint: str,
+        body: Optional[Dict],
+        until: Callable[[Dict[str, Any]], bool],
+        timeout: float,
+        interval: float = 0.1,
+        max_interval: float = 1.0,
+    ) -> Dict[str, Any]:
+        """
+        Repeat a request until `until(result)` is true or `timeout` seconds pass.
+        The delay between requests doubles from `interval` up to `max_interval`.
+
+        Returns:
+            The last response received (check it — the timeout may have hit first).
+        """
+        deadline = time.monotonic() + timeout
+        delay = interval
+        while True:
+            result = await self.request(endpoint, body)
+            remaining = deadline - time.monotonic()
+            if until(result) or remaining <= 0:
+                return result
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_interval)
+
     async def _raw_request(self, endpoint: str, body: Optional[Dict] = None) -> Dict[str, Any]:
-        """Execute a single HTTP request."""
+        """
+        Execute a single HTTP request.
+
+        Responses that carry an ETag are cached; the next identical request
+        sends If-None-Match and a 304 from TD is answered from the cache.
+        """
         client = await self._get_client()
+        body = body if body is not None else {}
 
-        if body is not None:
-            response = await client.post(endpoint, json=body)
-        else:
-            response = await client.post(endpoint, json={})
+        key = endpoint + "\0" + json.dumps(body, sort_keys=True, default=str)
+        cached = self._etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+
+        response = await client.post(endpoint, json=body, headers=headers)
+
+        if response.status_code == 304 and cached:
+            self._etag_cache.move_to_end(key)
+            return json.loads(cached[1])
 
         response.raise_for_status()
 
         if response.headers.get('content-type', '').startswith('application/json'):
+            etag = response.headers.get('etag')
+            if etag:
+                self._etag_cache[key] = (etag, response.content)
+                self._etag_cache.move_to_end(key)
+                while len(self._etag_cache) > self._etag_cache_size:
+                    self._etag_cache.popitem(last=False)
+            elif cached:
+                del self._etag_cache[key]
             return response.json()
+        elif response.headers.get('content-type', '').startswith('application/octet-stream'):
+            return {"binary": response.content}
         else:
             return {"raw": response.text}
 
 
+CHOP_BINARY_MAGIC = b"TDCH"
+
+
+def chop_block_header(data: bytes) -> Tuple[Dict[str, Any], int]:
+    """Header of a binary chop/data response and the byte offset of its samples."""
+    if data[:4] != CHOP_BINARY_MAGIC:
+        raise TouchDesignerAPIError("Not a binary CHOP block (bad magic)")
+    header_len = int.from_bytes(data[4:8], "little")
+    return json.loads(data[8:8 + header_len]), 8 + header_len
+
+
+def decode_chop_block(data: bytes) -> Dict[str, Any]:
+    """
+    Decode a binary chop/data response (format 'binary').
+
+    Layout: b'TDCH', uint32 LE header length, JSON header (padded to 4 bytes),
+    then channels × samples float32 LE. The samples are not parsed or copied:
+    'values' is a flat float memoryview over the payload and 'channels' maps
+    each name to its row (a slice of that view).
+    """
+    header, offset = chop_block_header(data)
+    payload = memoryview(data)[offset:]
+    if sys.byteorder == "little":
+        values = payload.cast("f")
+    else:
+        swapped = array.array("f", payload)
+        swapped.byteswap()
+        values = memoryview(swapped)
+
+    num_chans, num_samples = header["shape"]
+    if len(values) != num_chans * num_samples:
+        raise TouchDesignerAPIError(
+            f"Binary CHOP block is truncated: {len(values)} values for shape {header['shape']}"
+        )
+    header["values"] = values
+    header["channels"] = {
+        name: values[i * num_samples:(i + 1) * num_samples]
+        for i, name in enumerate(header["channels"])
+    }
+    return header
+
+
 # Module-level singleton for convenience
 _default_client: Optional[TDClient] = None
 
@@ -0,0 +1,18 @@
+"""
+TouchDesigner MCP Execute DAT Callbacks
+========================================
+Paste this into an Execute DAT inside the 'mcp_server' COMP, next to the
+WebServer DAT, with the Frame Start toggle On.
+
+It forwards every frame start to the callbacks DAT, which uses it to
+advance background jobs a bounded slice at a time.
+
+Compatible with TouchDesigner 2025.30000+
+"""
+
+CALLBACKS_DAT = 'callbacks'
+
+
+def onFrameStart(frame):
+    op(CALLBACKS_DAT).module.onFrameStart(frame)
+    return
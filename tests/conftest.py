@@ -0,0 +1,32 @@
+"""
+Shared fixtures.
+
+The TD-side router (td_component/mcp_webserver_callbacks.py) is a plain
+module: it only reaches for TD's globals (op, absTime, ...) inside
+handlers, so its helpers can be loaded and tested without TouchDesigner.
+"""
+
+import importlib.util
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+CALLBACKS_PATH = ROOT / "td_component" / "mcp_webserver_callbacks.py"
+
+
+@pytest.fixture(scope="session")
+def callbacks():
+    """The callbacks module, without the stdout/stderr tee it installs on import."""
+    stdout, stderr = sys.stdout, sys.stderr
+    handlers = list(logging.getLogger().handlers)
+    spec = importlib.util.spec_from_file_location("mcp_webserver_callbacks", CALLBACKS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+        logging.getLogger().handlers[:] = handlers
+    return module
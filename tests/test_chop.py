@@ -0,0 +1,60 @@
+"""CHOP channel selection and summaries."""
+
+import fnmatch
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+
+class Chop:
+    """Just enough of a CHOP: named channels over one float32 array."""
+
+    def __init__(self, channels):
+        self.id = 11
+        self.path = "/project1/chop1"
+        self.isCHOP = True
+        self.cookFrame = 1
+        self.rate = 60
+        self._names = list(channels)
+        self._array = np.array([channels[n] for n in self._names], dtype=np.float32).reshape(len(self._names), -1)
+        self.numChans, self.numSamples = self._array.shape
+
+    def chans(self, *patterns):
+        chans = [SimpleNamespace(name=n, index=i, numpyArray=lambda i=i: self._array[i])
+                 for i, n in enumerate(self._names)]
+        if not patterns:
+            return chans
+        picked = []
+        for pattern in " ".join(patterns).split():
+            picked += [c for c in chans if fnmatch.fnmatchcase(c.name, pattern) and c not in picked]
+        return picked
+
+    def numpyArray(self):
+        return self._array
+
+
+@pytest.fixture
+def chop(callbacks, monkeypatch):
+    node = Chop({"tx": [1, 5, 3], "ty": [-2, 0, 2], "rz": [4, 4, 4]})
+    monkeypatch.setattr(callbacks, "_resolve_op", lambda body, *args, **kwargs: (node, node.path))
+    monkeypatch.setattr(callbacks, "_chop_summaries", callbacks.OrderedDict())
+    return node
+
+
+def test_summary_statistics(callbacks, chop):
+    summary = callbacks._chop_summary(chop)
+    assert summary["tx"] == {"min": 1.0, "max": 5.0, "mean": 3.0, "first": 1.0, "last": 3.0}
+    assert summary["ty"]["mean"] == 0.0
+    assert list(summary) == ["tx", "ty", "rz"]
+
+
+def test_summary_of_an_empty_chop(callbacks, chop):
+    empty = Chop({"tx": []})
+    assert callbacks._chop_summary(empty)["tx"]["min"] is None
+
+
+@pytest.mark.parametrize("summary", [True, False])
+def test_channel_patterns_select_in_both_paths(callbacks, chop, summary):
+    result = callbacks.handle_chop_data({"path": chop.path, "channels": ["t*"], "summary": summary})
+    assert list(result["channels"]) == ["tx", "ty"]
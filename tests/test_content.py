@@ -0,0 +1,33 @@
+"""Text DAT reads: whole text and line ranges come back byte for byte."""
+
+from types import SimpleNamespace
+
+import pytest
+
+
+def dat(text):
+    return SimpleNamespace(text=text, path="/project1/text1", id=7)
+
+
+@pytest.mark.parametrize("text", ["", "a", "a\nb\n", "a\r\nb\r\nc", "a\r\nb\nc\r\n"])
+def test_whole_text_is_exact(callbacks, text):
+    assert callbacks._text_content(dat(text), {})["text"] == text
+
+
+@pytest.mark.parametrize("text", ["a\r\nb\r\nc\r\n", "a\nb\nc", "a\r\nb\nc\r\n"])
+def test_line_ranges_join_back_to_the_text(callbacks, text):
+    parts = [callbacks._text_content(dat(text), {"line_offset": i, "line_limit": 1}) for i in range(3)]
+    assert "".join(p["text"] for p in parts) == text
+    assert [p["has_more"] for p in parts] == [True, True, False]
+
+
+def test_line_limit_alone_is_a_range(callbacks):
+    result = callbacks._text_content(dat("a\nb\nc\n"), {"line_limit": 2})
+    assert result["text"] == "a\nb\n"
+    assert result["total_lines"] == 3
+
+
+def test_model_does_not_window_text_by_default():
+    from td_mcp.models import GetContentInput
+    body = GetContentInput(path="/project1/text1").model_dump(exclude_none=True)
+    assert "line_offset" not in body and "line_limit" not in body
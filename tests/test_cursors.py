@@ -0,0 +1,41 @@
+"""Cursor encode/decode round trips and rejections."""
+
+
+def test_first_page_has_no_cursor(callbacks):
+    assert callbacks._cursor_decode("errors", {"path": "/project1"}) == (None, None)
+
+
+def test_round_trip(callbacks):
+    body = {"path": "/project1", "limit": 10}
+    token = callbacks._cursor_encode("errors", body, {"p": [[1, 42]]})
+    state, error = callbacks._cursor_decode("errors", dict(body, cursor=token))
+    assert error is None
+    assert state["p"] == [[1, 42]]
+
+
+def test_paging_keys_do_not_change_the_query(callbacks):
+    token = callbacks._cursor_encode("search", {"query": "noise", "limit": 10}, {"m": "w", "p": []})
+    state, error = callbacks._cursor_decode("search", {"query": "noise", "limit": 50, "cursor": token})
+    assert error is None
+    assert state["m"] == "w"
+
+
+def test_cursor_from_another_kind_is_rejected(callbacks):
+    token = callbacks._cursor_encode("errors", {}, {"p": []})
+    state, error = callbacks._cursor_decode("search", {"cursor": token})
+    assert state is None
+    assert "does not belong" in error["error"]
+
+
+def test_cursor_from_other_parameters_is_rejected(callbacks):
+    token = callbacks._cursor_encode("search", {"query": "noise"}, {"m": "p", "a": "/a"})
+    state, error = callbacks._cursor_decode("search", {"query": "level", "cursor": token})
+    assert state is None
+    assert "different request parameters" in error["error"]
+
+
+def test_malformed_cursor_is_rejected(callbacks):
+    for token in ("not base64 !", "e30", "WzFd"):   # garbage, {}, [1]
+        state, error = callbacks._cursor_decode("errors", {"cursor": token})
+        assert state is None
+        assert error["error"]
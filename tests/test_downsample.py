@@ -0,0 +1,73 @@
+"""CHOP downsamplers: shapes, positions and what each one preserves."""
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def block():
+    rng = np.random.default_rng(7)
+    data = rng.normal(size=(3, 1000)).astype(np.float32)
+    data[1, 617] = 50.0     # a spike only minmax is guaranteed to keep
+    return data
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb", "mean", "stride"])
+def test_output_fits_the_budget(callbacks, block, method):
+    positions, values = callbacks.CHOP_DOWNSAMPLERS[method](block, 100)
+    assert values.shape[0] == block.shape[0]
+    assert values.shape[1] <= 100
+    assert np.asarray(positions).shape[-1] == values.shape[1]
+
+
+def test_minmax_keeps_extremes_in_time_order(callbacks, block):
+    positions, values = callbacks._downsample_minmax(block, 100)
+    assert np.array_equal(values.max(axis=1), block.max(axis=1))
+    assert np.array_equal(values.min(axis=1), block.min(axis=1))
+    assert (np.diff(positions, axis=1) > 0).all()
+    assert np.array_equal(np.take_along_axis(block, positions, axis=1), values)
+
+
+def test_minmax_handles_a_partial_last_bucket(callbacks):
+    block = np.arange(7, dtype=np.float32)[None, :]
+    positions, values = callbacks._downsample_minmax(block, 4)
+    assert positions.max() == 6
+    assert values[0, -1] == 6
+
+
+@pytest.mark.parametrize("n, points", [(7, 6), (10, 6), (981, 100), (1000, 100)])
+def test_minmax_never_repeats_an_index(callbacks, n, points):
+    # 7 samples in buckets of 3 (and 981 in buckets of 20) leave a last
+    # bucket of one sample; the flat channel has min == max in every bucket
+    block = np.stack([np.arange(n, dtype=np.float32), np.zeros(n, dtype=np.float32)])
+    positions, values = callbacks._downsample_minmax(block, points)
+    assert (np.diff(positions, axis=1) > 0).all()
+    assert positions[:, -1].tolist() == [n - 1, n - 1]
+
+
+def test_positions_are_integer_sample_indices(callbacks, block):
+    for method, downsample in callbacks.CHOP_DOWNSAMPLERS.items():
+        positions, _ = downsample(block, 100)
+        assert np.issubdtype(np.asarray(positions).dtype, np.integer), method
+
+
+def test_lttb_keeps_endpoints(callbacks, block):
+    positions, values = callbacks._downsample_lttb(block, 50)
+    assert (positions[:, 0] == 0).all()
+    assert (positions[:, -1] == block.shape[1] - 1).all()
+    assert (np.diff(positions, axis=1) > 0).all()
+    assert np.array_equal(np.take_along_axis(block, positions, axis=1), values)
+
+
+def test_mean_of_a_constant_is_that_constant(callbacks):
+    positions, values = callbacks._downsample_mean(np.full((2, 999), 3.0), 10)
+    assert values.shape == (2, 10)
+    assert np.allclose(values, 3.0)
+    assert positions[0] >= 0 and positions[-1] <= 998
+    assert (np.diff(positions) > 0).all()
+
+
+def test_stride(callbacks):
+    positions, values = callbacks._downsample_stride(np.arange(10.0)[None, :], 4)
+    assert list(positions) == [0, 3, 6, 9]
+    assert values.tolist() == [[0.0, 3.0, 6.0, 9.0]]
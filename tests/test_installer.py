@@ -0,0 +1,24 @@
+"""setup_mcp_in_td.py must carry the current TD-side scripts."""
+
+import ast
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def embedded(name):
+    tree = ast.parse((ROOT / "setup_mcp_in_td.py").read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == name for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise AssertionError(f"{name} not found in setup_mcp_in_td.py")
+
+
+@pytest.mark.parametrize("name, filename", [
+    ("CALLBACKS_CODE", "mcp_webserver_callbacks.py"),
+    ("EXECUTE_CODE", "mcp_execute_callbacks.py"),
+])
+def test_embedded_scripts_match_td_component(name, filename):
+    assert embedded(name) == (ROOT / "td_component" / filename).read_text(encoding="utf-8")
@@ -0,0 +1,14 @@
+"""Job bookkeeping: lookups by id."""
+
+import pytest
+
+
+@pytest.mark.parametrize("handler", ["handle_jobs_status", "handle_jobs_result", "handle_jobs_cancel"])
+@pytest.mark.parametrize("job_id", ["abc", "1.5", [1], 987654])
+def test_unknown_or_malformed_job_ids(callbacks, handler, job_id):
+    assert getattr(callbacks, handler)({"job_id": job_id}) == {"error": f"Job not found: {job_id}"}
+
+
+@pytest.mark.parametrize("handler", ["handle_jobs_result", "handle_jobs_cancel"])
+def test_missing_job_id(callbacks, handler):
+    assert getattr(callbacks, handler)({}) == {"error": "Job not found: None"}
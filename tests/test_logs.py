@@ -0,0 +1,28 @@
+"""Log capture installs over whatever stdout/stderr it finds."""
+
+import io
+import sys
+
+
+class OtherWrapper(io.StringIO):
+    """Another tool's stream wrapper that happens to use the same attribute name."""
+
+    def __init__(self, inner):
+        super().__init__()
+        self._stream = inner
+
+
+def test_reinstall_unwraps_only_its_own_tee(callbacks, monkeypatch):
+    inner = io.StringIO()
+    other = OtherWrapper(inner)
+    monkeypatch.setattr(sys, "stdout", other)
+    monkeypatch.setattr(sys, "stderr", io.StringIO())
+    try:
+        callbacks._install_log_capture()
+        first = sys.stdout
+        assert first._stream is other
+        callbacks._install_log_capture()
+        assert sys.stdout._stream is other
+    finally:
+        for handler in [h for h in callbacks.logging.getLogger().handlers if getattr(h, "_td_mcp_tee", False)]:
+            callbacks.logging.getLogger().removeHandler(handler)
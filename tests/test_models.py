@@ -0,0 +1,13 @@
+"""Input models must accept exactly what the TD side understands."""
+
+from td_mcp import models
+
+
+def test_field_selectors_match_the_td_side(callbacks):
+    assert models.NODE_FIELDS == callbacks.NODE_FIELDS == tuple(callbacks.OP_FIELDS) + ("parameters",)
+    assert models.DETAIL_FIELDS == callbacks.DETAIL_FIELDS
+    assert models.PARAM_FIELDS == callbacks.PARAM_FIELDS
+
+
+def test_job_kinds_match_the_td_side(callbacks):
+    assert set(models.JOB_KINDS) == set(callbacks.JOB_KINDS)
@@ -0,0 +1,37 @@
+"""Predicates and aggregates of the declarative node query."""
+
+import pytest
+
+
+@pytest.mark.parametrize("op, a, b, expected", [
+    ("==", "noiseTOP", "noiseTOP", True),
+    ("!=", 1, 2, True),
+    (">", 5, 3, True),
+    (">", None, 3, False),
+    ("<=", 3, 3, True),
+    ("<", None, 3, False),
+    ("in", "TOP", ["TOP", "CHOP"], True),
+    ("not_in", "SOP", ["TOP", "CHOP"], True),
+    ("contains", "/project1/noise1", "noise", True),
+    ("contains", None, "noise", False),
+    ("startswith", "/project1/a", "/project1", True),
+    ("startswith", 7, "7", False),
+    ("glob", "noise12", "noise*", True),
+    ("glob", None, "*", False),
+    ("exists", "x", None, True),
+    ("exists", None, True, False),
+    ("exists", None, False, True),
+])
+def test_query_ops(callbacks, op, a, b, expected):
+    assert callbacks.QUERY_OPS[op](a, b) is expected
+
+
+def test_aggregates_skip_missing_values(callbacks):
+    vals = [1, 2.5, None, "x", 4]
+    agg = callbacks.QUERY_AGGREGATES
+    assert agg["count"](vals) == 5
+    assert agg["sum"](vals) == 7.5
+    assert agg["avg"](vals) == 2.5
+    assert agg["min"]([None, 3, 1]) == 1
+    assert agg["max"]([None]) is None
+    assert agg["avg"]([]) is None
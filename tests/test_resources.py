@@ -0,0 +1,51 @@
+"""Resource subscriptions: TD-side version polling and the advertised capability."""
+
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def versions(callbacks, monkeypatch):
+    """handle_resource_versions over a fake 'node' view; returns the list of checked paths."""
+    seen = []
+
+    def tagger(res):
+        seen.append(res["path"])
+        return res["path"] + "@1"
+    monkeypatch.setitem(callbacks.RESOURCE_VIEWS, "node", tagger)
+    monkeypatch.setattr(callbacks, "absTime", SimpleNamespace(frame=1), raising=False)
+    monkeypatch.setitem(callbacks._resource_sweep, "next", 0)
+    return seen
+
+
+def test_everything_is_checked_within_the_budget(callbacks, versions):
+    resources = [{"key": k, "path": k} for k in ("/a", "/b", "/c")]
+    result = callbacks.handle_resource_versions({"resources": resources})
+    assert (result["checked"], result["total"]) == (3, 3)
+    assert set(result["changed"]) == {"/a", "/b", "/c"}
+
+
+def test_an_exhausted_budget_carries_on_next_poll(callbacks, versions, monkeypatch):
+    monkeypatch.setattr(callbacks, "RESOURCE_VERSION_MS", 0.0)
+    resources = [{"key": k, "path": k} for k in ("/a", "/b", "/c")]
+    for _ in range(4):
+        assert callbacks.handle_resource_versions({"resources": resources})["checked"] == 1
+    assert versions == ["/a", "/b", "/c", "/a"]
+
+
+def test_unchanged_versions_are_not_reported(callbacks, versions):
+    first = callbacks.handle_resource_versions({"resources": [{"key": "/a", "path": "/a"}]})
+    again = callbacks.handle_resource_versions(
+        {"resources": [{"key": "/a", "path": "/a", "version": first["changed"]["/a"]}]})
+    assert again["changed"] == {}
+
+
+def test_unknown_view_is_an_error(callbacks, versions):
+    result = callbacks.handle_resource_versions({"resources": [{"path": "/a", "view": "nope"}]})
+    assert "Unknown resource view" in result["error"]
+
+
+def test_server_advertises_resource_subscriptions():
+    from td_mcp.server import _initialization_options
+    assert _initialization_options().capabilities.resources.subscribe is True
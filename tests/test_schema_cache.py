@@ -0,0 +1,28 @@
+"""On-disk parameter schema cache."""
+
+from td_mcp.schema_cache import ParamSchemaCache
+
+
+def test_merge_fills_static_fields_without_overriding_values():
+    parameters = {"seed": {"value": 3, "mode": "CONSTANT"}, "custom": {"value": 1, "label": "Mine"}}
+    schema = {"seed": {"label": "Seed", "default": 1, "value": 99}, "custom": {"label": "Shared"}}
+    merged = ParamSchemaCache.merge(parameters, schema)
+    assert merged["seed"] == {"value": 3, "mode": "CONSTANT", "label": "Seed", "default": 1}
+    assert merged["custom"]["label"] == "Mine"
+    assert parameters["seed"] == {"value": 3, "mode": "CONSTANT"}
+
+
+def test_merge_keeps_parameters_missing_from_the_schema():
+    assert ParamSchemaCache.merge({"new": {"value": 0}}, {}) == {"new": {"value": 0}}
+
+
+def test_put_then_get_from_disk(tmp_path):
+    ParamSchemaCache(tmp_path).put("noiseTOP@2025.30000", {"seed": {"label": "Seed"}})
+    assert ParamSchemaCache(tmp_path).get("noiseTOP@2025.30000") == {"seed": {"label": "Seed"}}
+
+
+def test_unknown_or_corrupt_entries_are_misses(tmp_path):
+    cache = ParamSchemaCache(tmp_path)
+    assert cache.get("levelTOP@1") is None
+    cache._file("levelTOP@1").write_text("{not json")
+    assert cache.get("levelTOP@1") is None
@@ -0,0 +1,68 @@
+"""Ranked (regex / fuzzy) search over the scene index."""
+
+import pytest
+
+INDEX_TABLES = ("_index_entries", "_index_tokens", "_index_trigrams", "_index_names",
+                "_index_types", "_index_families", "_index_children")
+
+
+class Node:
+    """Just enough of an operator for the scene index."""
+
+    def __init__(self, op_id, name, parent=None, op_type="noiseTOP"):
+        self.id = op_id
+        self.name = name
+        self.path = (parent.path.rstrip("/") if parent else "") + "/" + name
+        self.type = op_type
+        self.family = op_type[-3:] if not op_type.endswith("COMP") else "COMP"
+        self._parent = parent
+
+    def parent(self):
+        return self._parent
+
+
+@pytest.fixture
+def index(callbacks, monkeypatch):
+    """An empty scene index marked ready; returns id -> Node for the ops added to it."""
+    for table in INDEX_TABLES:
+        monkeypatch.setattr(callbacks, table, {})
+    nodes = {}
+    monkeypatch.setattr(callbacks, "_index_ready", lambda: True)
+    monkeypatch.setattr(callbacks, "_index_live", nodes.get)
+    monkeypatch.setattr(callbacks, "_serialize_op", lambda n, fields=None: {"path": n.path})
+
+    def add(node):
+        nodes[node.id] = node
+        callbacks._index_add(node)
+        return node
+    return add
+
+
+def run(task):
+    try:
+        while True:
+            next(task)
+    except StopIteration as stop:
+        return stop.value
+
+
+def test_fuzzy_search_ranks_from_the_index(callbacks, index):
+    root = index(Node(1, "project1", op_type="baseCOMP"))
+    for i, name in enumerate(["noise1", "noise_bg", "level1"], start=2):
+        index(Node(i, name, root))
+    result = run(callbacks._ranked_search_task({"match": "fuzzy"}, root, "noise", "name", 10, None))
+    assert [n["path"] for n in result["nodes"]][:2] == ["/project1/noise1", "/project1/noise_bg"]
+
+
+def test_index_changes_between_steps(callbacks, index):
+    root = index(Node(1, "project1", op_type="baseCOMP"))
+    for i in range(2, 12):
+        index(Node(i, f"noise{i}", root))
+    task = callbacks._ranked_search_task({"match": "fuzzy"}, root, "noise", "all", 50, None)
+    next(task)
+    # What the index sweep does between two job steps
+    for i in range(12, 20):
+        index(Node(i, f"level{i}", root, op_type="levelTOP"))
+    callbacks._index_remove(3)
+    result = run(task)
+    assert result["count"] >= 9
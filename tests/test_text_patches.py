@@ -0,0 +1,76 @@
+"""Unified diffs and line-range edits applied to DAT text."""
+
+import pytest
+
+
+def lines(text):
+    return text.splitlines(keepends=True)
+
+
+def test_line_edits_replace_insert_and_delete(callbacks):
+    out = callbacks._apply_line_edits(lines("a\nb\nc\nd\n"), [
+        {"line_offset": 0, "line_count": 0, "text": "top"},
+        {"line_offset": 1, "line_count": 1, "text": "B"},
+        {"line_offset": 3, "line_count": 1, "text": ""},
+    ])
+    assert "".join(out) == "top\na\nB\nc\n"
+
+
+def test_line_edits_are_relative_to_the_original_lines(callbacks):
+    edits = [{"line_offset": 2, "line_count": 1, "text": "C"},
+             {"line_offset": 0, "line_count": 1, "text": "A1\nA2"}]
+    assert "".join(callbacks._apply_line_edits(lines("a\nb\nc\n"), edits)) == "A1\nA2\nb\nC\n"
+
+
+@pytest.mark.parametrize("edits", [
+    [{"line_offset": 0, "line_count": 2, "text": ""}, {"line_offset": 1, "line_count": 1, "text": ""}],
+    [{"line_offset": 2, "line_count": 5, "text": ""}],
+    [{"line_count": 1, "text": ""}],
+])
+def test_bad_line_edits_raise(callbacks, edits):
+    with pytest.raises(ValueError):
+        callbacks._apply_line_edits(lines("a\nb\nc\n"), edits)
+
+
+def test_unified_diff(callbacks):
+    diff = "--- a\n+++ b\n@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n@@ -5,0 +6,1 @@\n+f\n"
+    out = callbacks._apply_unified_diff(lines("a\nb\nc\nd\ne\n"), diff)
+    assert "".join(out) == "a\nB\nc\nd\ne\nf\n"
+
+
+def test_unified_diff_context_must_match(callbacks):
+    with pytest.raises(ValueError, match="does not apply"):
+        callbacks._apply_unified_diff(lines("a\nb\n"), "@@ -1,2 +1,2 @@\n a\n-x\n+y\n")
+
+
+def test_diff_without_hunks_raises(callbacks):
+    with pytest.raises(ValueError, match="no hunks"):
+        callbacks._apply_unified_diff(lines("a\n"), "just text\n")
+
+
+@pytest.mark.parametrize("text", ["", "x", "a\nb\nc", "a\nb\nc\n", "a\r\nb\r\nc\r\n", "a\r\nb\nc", "\n\n"])
+def test_patch_without_edits_is_byte_identical(callbacks, text):
+    assert callbacks._patch_text(text, edits=[])[0] == text
+    if text:
+        assert callbacks._patch_text(text, diff="@@ -1,0 +1,0 @@\n")[0] == text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("a\r\nb\r\nc\r\n", "a\r\nB1\r\nB2\r\nc\r\n"),
+    ("a\r\nb\r\nc", "a\r\nB1\r\nB2\r\nc"),
+    ("a\nb\nc", "a\nB1\nB2\nc"),
+])
+def test_patch_keeps_line_endings_and_trailing_newline(callbacks, text, expected):
+    new_text, before, after = callbacks._patch_text(text, edits=[{"line_offset": 1, "line_count": 1, "text": "B1\nB2"}])
+    assert new_text == expected
+    assert (before, after) == (3, 4)
+
+
+def test_diff_context_ignores_crlf(callbacks):
+    new_text, _, _ = callbacks._patch_text("a\r\nb\r\n", diff="@@ -2,1 +2,2 @@\n b\n+c\n")
+    assert new_text == "a\r\nb\r\nc\r\n"
+
+
+def test_appending_after_a_last_line_without_newline(callbacks):
+    new_text, _, _ = callbacks._patch_text("a\nb", edits=[{"line_offset": 2, "line_count": 0, "text": "c"}])
+    assert new_text == "a\nb\nc"